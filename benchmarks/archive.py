@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Packs the raw outputs of a campaign (the LSF reports `<jobid>` and `<jobid>.err` of finished jobs, `jobs-*` and
+`batch-*`) into a single compressed file `<raw dir>.pack`, which is cheap to transfer and to read on network file
+systems compared to thousands of small files. `EulerRunner` reads reports straight from the archive of its raw
+directory if they are not on disk (anymore).
+
+The members are concatenated into chunks of up to CHUNK_SIZE bytes, each compressed separately with zlib, such that a
+member is read by decompressing a single chunk. Layout of the file:
+
+    MAGIC
+    chunk 0, ..., chunk k   zlib streams
+    index                   zlib compressed json {"chunks": [[offset, length], ...], "members": {name: [chunk, start,
+                            size]}}
+    trailer                 offset and length of the index (uint64, little endian), MAGIC
+
+Packing again appends the new members in new chunks followed by a new index, the previous index stays in place. If
+packing is interrupted, the archive is read up to the last complete trailer. Binary timings (`*.npy`) stay files, they
+are memory-mapped by `plot.load_timings`.
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import re
+import struct
+import typing
+import zlib
+
+MAGIC = b'DSOPACK1'
+TRAILER = struct.Struct('<QQ8s')
+CHUNK_SIZE = 4 << 20
+COMPRESSION_LEVEL = 6
+
+# Files that are rewritten while a campaign runs, they are packed again whenever their content changed
+MUTABLE = re.compile(r'(jobs|batch)-.*')
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def archive_path(raw_dir: str) -> str:
+    return raw_dir.rstrip('/') + '.pack'
+
+
+class Archive:
+    """
+    Random access to the members of an archive, the most recently decompressed chunk is cached.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, 'rb')
+        self.end, index = self._read_index()
+        self.chunks: typing.List[typing.List[int]] = index['chunks']
+        self.members: typing.Dict[str, typing.List[int]] = index['members']
+        self._cached: typing.Tuple[int, bytes] = (-1, b'')
+
+    def _read_index(self) -> typing.Tuple[int, dict]:
+        """
+        End of the last complete trailer and the index it points to.
+        """
+        size = self._f.seek(0, io.SEEK_END)
+        self._f.seek(0)
+        if self._f.read(len(MAGIC)) != MAGIC:
+            raise ArchiveError(f'{self.path} is not an archive')
+
+        ends = [size]
+        if not self._valid_trailer(size):
+            # Interrupted while appending, fall back to the last trailer before
+            self._f.seek(0)
+            data = self._f.read()
+            ends = []
+            position = data.rfind(MAGIC)
+            while position > 0:
+                ends.append(position + len(MAGIC))
+                position = data.rfind(MAGIC, 0, position)
+
+        for end in ends:
+            if self._valid_trailer(end):
+                self._f.seek(end - TRAILER.size)
+                offset, length, _ = TRAILER.unpack(self._f.read(TRAILER.size))
+                self._f.seek(offset)
+                return end, json.loads(zlib.decompress(self._f.read(length)))
+
+        raise ArchiveError(f'{self.path} has no complete index')
+
+    def _valid_trailer(self, end: int) -> bool:
+        if end < len(MAGIC) + TRAILER.size:
+            return False
+
+        self._f.seek(end - TRAILER.size)
+        offset, length, magic = TRAILER.unpack(self._f.read(TRAILER.size))
+        if magic != MAGIC or offset + length != end - TRAILER.size:
+            return False
+
+        self._f.seek(offset)
+        try:
+            json.loads(zlib.decompress(self._f.read(length)))
+        except (zlib.error, ValueError):
+            return False
+
+        return True
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.members
+
+    def names(self) -> typing.List[str]:
+        return sorted(self.members)
+
+    def read(self, name: str) -> bytes:
+        if name not in self.members:
+            raise FileNotFoundError(f'{name} is not in {self.path}')
+
+        chunk, start, size = self.members[name]
+        if self._cached[0] != chunk:
+            offset, length = self.chunks[chunk]
+            self._f.seek(offset)
+            self._cached = (chunk, zlib.decompress(self._f.read(length)))
+
+        return self._cached[1][start:start + size]
+
+    def open(self, name: str) -> typing.TextIO:
+        return io.StringIO(self.read(name).decode())
+
+
+def packable(raw_dir: str) -> typing.List[str]:
+    """
+    Names of the files in `raw_dir` that can be packed: the reports and error logs of finished jobs (LSF writes the
+    report once a job finished), the job lists and the batch files.
+    """
+    names = []
+    for path in sorted(glob.glob(f'{raw_dir}/jobs-*')):
+        names.append(os.path.basename(path))
+        with open(path) as f:
+            for job_id in f.read().splitlines():
+                if os.path.isfile(f'{raw_dir}/{job_id}'):
+                    names.append(job_id)
+                    if os.path.isfile(f'{raw_dir}/{job_id}.err'):
+                        names.append(f'{job_id}.err')
+
+    names.extend(os.path.basename(path) for path in sorted(glob.glob(f'{raw_dir}/batch-*')))
+    return names
+
+
+def pack(raw_dir: str, remove: bool = False) -> typing.Tuple[int, int]:
+    """
+    Adds the finished outputs in `raw_dir` that are not packed yet to its archive (see `archive_path`), optionally
+    removing the packed files. Returns the number of added members and the size of the archive in bytes.
+    """
+    path = archive_path(raw_dir)
+    chunks, members, end = [], {}, None
+    if os.path.isfile(path):
+        with Archive(path) as existing:
+            names = [n for n in packable(raw_dir)
+                     if n not in existing or (MUTABLE.fullmatch(n) and read_file(raw_dir, n) != existing.read(n))]
+            chunks, members, end = existing.chunks, existing.members, existing.end
+    else:
+        names = packable(raw_dir)
+
+    mode = 'r+b' if end is not None else 'wb'
+    with open(path, mode) as f:
+        if end is None:
+            f.write(MAGIC)
+        else:
+            # Drop what an interrupted run appended after the last complete index
+            f.seek(end)
+            f.truncate()
+
+        buffer, buffered = io.BytesIO(), []
+
+        def flush():
+            if not buffered:
+                return
+            data = zlib.compress(buffer.getvalue(), COMPRESSION_LEVEL)
+            chunks.append([f.tell(), len(data)])
+            f.write(data)
+            for name, start, size in buffered:
+                members[name] = [len(chunks) - 1, start, size]
+            buffer.seek(0)
+            buffer.truncate()
+            buffered.clear()
+
+        for name in names:
+            data = read_file(raw_dir, name)
+            buffered.append((name, buffer.tell(), len(data)))
+            buffer.write(data)
+            if buffer.tell() >= CHUNK_SIZE:
+                flush()
+        flush()
+
+        index = zlib.compress(json.dumps({'chunks': chunks, 'members': members}).encode(), COMPRESSION_LEVEL)
+        offset = f.tell()
+        f.write(index)
+        f.write(TRAILER.pack(offset, len(index), MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+
+    if remove:
+        # Job lists are still appended to while a campaign runs
+        for name in names:
+            if not name.startswith('jobs-'):
+                os.remove(f'{raw_dir}/{name}')
+
+    return len(names), size
+
+
+def read_file(raw_dir: str, name: str) -> bytes:
+    with open(f'{raw_dir}/{name}', 'rb') as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack finished raw job outputs into <raw dir>.pack')
+    parser.add_argument('raw_dirs', nargs='+', help='Raw result directories, e.g. results/tmp/raw')
+    parser.add_argument('--remove', action='store_true', default=False, help='Remove the packed files')
+    args = parser.parse_args()
+
+    for raw_dir in args.raw_dirs:
+        added, size = pack(raw_dir, remove=args.remove)
+        print(f'{archive_path(raw_dir)}: added {added} files ({size // 1024} KiB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,35 @@
 #!/usr/bin/env python3
 
 import argparse
+import dataclasses
+import json
 import shutil
 
 from scheduler import \
         allgather, \
+        allgather_sparse, \
         allreduce, \
         allreduce_ring, \
+        dtypes, \
         grabenseifner_allgather, \
-        grabenseifner_subgroup_2, \
-        grabenseifner_subgroup_4, \
-        grabenseifner_subgroup_8, \
+        grabenseifner_allgather_segmented, \
+        grabenseifner_subgroup, \
         logger, \
+        one_per_node, \
+        packed, \
         inclusive, \
+        kernels, \
+        native_sweep, \
+        scaling_sweep, \
+        tuned, \
         Configuration, \
         EulerRunner, \
         DryRun,\
         Scheduler
 
 from config import results_path
+from ordering import load_prior, pilot_order, uncertainty_order
+import tuner
 
 implementations = [
     allgather,
@@ -28,6 +39,7 @@ implementations = [
     # allreduce_butterfly,
     # allreduce_butterfly_segmented,
     # allgather_async,
+    # allgather_sparse,
     # bruck_async,
     # allreduce_rabenseifner,
     # rabenseifner_gather,
@@ -39,12 +51,24 @@ implementations = [
     grabenseifner_allgather,
     grabenseifner_allgather_segmented,
     # grabenseifner_subgroup_1,
-    grabenseifner_subgroup_2,
-    grabenseifner_subgroup_4,
-    grabenseifner_subgroup_8,
+    grabenseifner_subgroup.with_params(n_groups=2),
+    grabenseifner_subgroup.with_params(n_groups=4),
+    grabenseifner_subgroup.with_params(n_groups=8),
     # grabenseifner_subgroup_16
 ]
 
+placements = [
+    one_per_node,
+    # packed,
+]
+
+# Fraction of non-zero entries in the input vectors, our real inputs are 1-5% dense
+densities = [
+    1.0,
+    # 0.05,
+    # 0.01,
+]
+
 repetitions = 25
 job_repetitions = 17
 
@@ -57,42 +81,273 @@ configs.extend([
         repetitions=repetitions,
         job_repetition=job_repetition,
         implementation=implementation,
+        placement=placement,
+        density=density,
     )
     for n in inclusive(1000, 8000, 1000)
     for nodes in [8, 16]
     for job_repetition in range(job_repetitions)
     for implementation in implementations
+    for placement in placements
+    for density in densities
 ])
 
 verify_configs = [
-    Configuration(n=2**n, m=2**n, nodes=2**p, implementation=implementation, verify=True) for n in inclusive(4, 10)
-    for p in inclusive(2, 5) for implementation in implementations
+    Configuration(n=2**n, m=2**n, nodes=2**p, implementation=implementation, verify=True, density=density)
+    for n in inclusive(4, 10) for p in inclusive(2, 5) for implementation in implementations for density in densities
+] + [
+    # The full comparison gathers every result on root, production sizes are only checked with checksums
+    Configuration(n=n, m=n, nodes=nodes, implementation=implementation, checksum=True, density=density, dtype=dtype)
+    for n in inclusive(1000, 8000, 1000) for nodes in [8, 16] for implementation in implementations
+    for density in densities for dtype in implementation.dtypes()
+] + [
+    # The sparse allgather is always checked, at the densities of our real inputs as well
+    Configuration(n=2**n, m=2**n, nodes=2**p, implementation=allgather_sparse, verify=True, density=density)
+    for n in inclusive(4, 10) for p in inclusive(2, 5) for density in sorted(set(densities) | {0.05, 0.01})
+    if allgather_sparse not in implementations
+]
+
+
+# Reduced precision of the implementations supporting it, against float64 (see plot.py `plot_precision`)
+precision_configs = [
+    Configuration(
+        n=n,
+        m=n,
+        nodes=nodes,
+        repetitions=repetitions,
+        job_repetition=job_repetition,
+        implementation=implementation,
+        dtype=dtype,
+    )
+    for n in inclusive(1000, 8000, 1000)
+    for nodes in [8, 16]
+    for job_repetition in range(5)
+    for implementation in implementations
+    for dtype in dtypes
+    if dtype in implementation.dtypes() and len(implementation.dtypes()) > 1
+]
+
+# Sweep over the native algorithms to generate a dynamic rules file (see coll_rules.py)
+sweep_segment_sizes = [0, 8192, 65536, 1 << 20]
+
+sweep_configs = [
+    Configuration(
+        n=2**n,
+        m=2**n,
+        nodes=nodes,
+        repetitions=10,
+        job_repetition=job_repetition,
+        implementation=implementation,
+    )
+    for n in inclusive(4, 13)
+    for nodes in [8, 16, 32, 48]
+    for job_repetition in range(3)
+    for implementation in native_sweep(sweep_segment_sizes)
+]
+
+
+# Strong and weak scaling sweeps (see scheduler.scaling_modes), analyzed in scaling.py
+scaling_nodes = [2, 4, 8, 16, 32, 48]
+scaling_configs = [
+    Configuration(
+        n=n,
+        m=n,
+        nodes=nodes,
+        repetitions=repetitions,
+        job_repetition=job_repetition,
+        implementation=implementation,
+    )
+    for mode, base_n in [('strong', 16000), ('work', 4000), ('memory', 2000)]
+    for n, nodes in scaling_sweep(base_n, scaling_nodes, mode)
+    for job_repetition in range(5)
+    for implementation in implementations
+]
+
+# Local outer product kernels in isolation (see kernels.py), a single process with up to 4 threads and a full node of
+# single-threaded processes competing for the memory bandwidth
+kernel_configs = [
+    Configuration(
+        n=n,
+        m=n,
+        nodes=nodes,
+        repetitions=repetitions,
+        job_repetition=job_repetition,
+        implementation=implementation.with_params(threads=threads),
+        placement=placement,
+    )
+    for n in [250, 500, *inclusive(1000, 8000, 1000), 12000, 16000]
+    for nodes, placement, threads in [(1, one_per_node, 1), (1, one_per_node, 2), (1, one_per_node, 4), (4, packed, 1)]
+    for job_repetition in range(3)
+    for implementation in kernels
 ]
 
 
+def optimal(configs, path: str):
+    """
+    Runs every configuration with the parameters recorded as optimal for its implementation, N and number of processes
+    in `path` (written by `tuner.py`), configurations without an optimum are kept as they are.
+    """
+    optima = tuner.optima(path)
+
+    result = []
+    for config in configs:
+        params = optima.get((config.implementation.name, config.n, config.nodes), {})
+        result.append(dataclasses.replace(config, implementation=config.implementation.with_params(**params)))
+
+    return result
+
+
+def recommended(configs, path: str):
+    """
+    Replaces the repetitions and job repetitions of every configuration with the recommendation in `path` (written by
+    `process.py variance`), configurations without a recommendation are kept as they are.
+    """
+    with open(path) as f:
+        recommendations = {
+            (r['implementation'], tuple(sorted(r.get('params', {}).items())), r['N'], r['numprocs'],
+             r.get('placement', '1ppn'), float(r.get('density', 1.0)), r.get('dtype', 'float64')): r
+            for r in json.load(f)
+        }
+
+    result = []
+    templates = {}
+    for config in configs:
+        key = (config.implementation.name, config.implementation.params, config.n, config.nodes, str(config.placement),
+               config.density, config.dtype)
+        if key not in recommendations:
+            result.append(config)
+            continue
+
+        # Configurations only differing in their job repetition share a template
+        templates.setdefault(dataclasses.replace(config, job_repetition=0), key)
+
+    for template, key in templates.items():
+        r = recommendations[key]
+        result.extend(
+            dataclasses.replace(template, repetitions=r['repetitions'], job_repetition=job_repetition)
+            for job_repetition in range(r['job_repetitions']))
+
+    return result
+
+
 def main():
     parser = argparse.ArgumentParser(description='Run some benchmarks')
     parser.add_argument('-m', '--mode', type=str, default="dry-run", help="One of {dry-run, euler, euler-files}")
     parser.add_argument('-c', '--clean', action="store_true", default=False, help="Clean results directory first")
     parser.add_argument('--check', '--verify', action="store_true", default=False, help="Check results for correctness")
+    parser.add_argument('--output-format',
+                        type=str,
+                        default="json",
+                        choices=['json', 'npy'],
+                        help="Output format of the per-rank timings, npy writes a binary file next to each job report")
+    parser.add_argument('--sweep',
+                        action="store_true",
+                        default=False,
+                        help="Sweep the native algorithms (convert with `process.py rules`)")
+    parser.add_argument('--scaling',
+                        action="store_true",
+                        default=False,
+                        help="Run the strong and weak scaling sweeps (analyzed in `process.py plot`)")
+    parser.add_argument('--kernels',
+                        action="store_true",
+                        default=False,
+                        help="Time the local outer product kernels (analyzed in `process.py plot`)")
+    parser.add_argument('--rules',
+                        type=str,
+                        default=None,
+                        help="Also run the allreduce and allgather baselines with the native algorithms of this dynamic "
+                        "rules file")
+    parser.add_argument('--optima',
+                        type=str,
+                        default=None,
+                        help="Run the implementations with the parameters recorded as optimal in this file (see "
+                        "`tuner.py`)")
+    parser.add_argument('--recommended',
+                        type=str,
+                        default=None,
+                        help="Use the repetitions and job repetitions recommended in this file (see `process.py variance`)")
+    parser.add_argument('--trace',
+                        action="store_true",
+                        default=False,
+                        help="Record clock-synchronized per-rank timestamps (convert with `process.py trace`)")
+    parser.add_argument('--precision',
+                        action="store_true",
+                        default=False,
+                        help="Compare the reduced precisions to float64 (analyzed in `process.py plot`)")
+    parser.add_argument('--batch',
+                        action="store_true",
+                        default=False,
+                        help="Run the configurations of a job in a single MPI session per set of mpirun options")
+    parser.add_argument('--order',
+                        type=str,
+                        default='sorted',
+                        choices=['sorted', 'uncertainty'],
+                        help="Submission order of the jobs, uncertainty first submits a pilot round interleaved across "
+                        "node counts and then the jobs with the most uncertain rankings of the prior results")
+    parser.add_argument('--prior',
+                        type=str,
+                        default=f'{results_path}/parsed/*.json',
+                        help="Parsed results (glob pattern) the uncertainty order is estimated from")
+    parser.add_argument('--pilot',
+                        action="store_true",
+                        default=False,
+                        help="Only submit the first job repetition of every number of nodes and placement")
+    parser.add_argument('--resume',
+                        action="store_true",
+                        default=False,
+                        help="Skip the jobs submitted before (with a batch file in the raw directory), e.g. by --pilot")
     args = parser.parse_args()
 
     if args.clean:
         logger.info(f"cleaning results directory ({results_path})")
         shutil.rmtree(results_path)
 
+    order = None
+    if args.pilot:
+        order = pilot_order
+    elif args.order == 'uncertainty':
+        order = uncertainty_order(load_prior(args.prior))
+
     mode = args.mode
     if mode == "dry-run":
-        scheduler = Scheduler(DryRun())
+        scheduler = Scheduler(DryRun(), order=order, resume=args.resume)
     elif mode == "euler":
-        scheduler = Scheduler(EulerRunner(results_dir=results_path))
+        scheduler = Scheduler(EulerRunner(results_dir=results_path, batch=args.batch), order=order, resume=args.resume)
     elif mode == "euler-files":
-        scheduler = Scheduler(EulerRunner(results_dir=results_path, submit=False))
+        scheduler = Scheduler(EulerRunner(results_dir=results_path, submit=False, batch=args.batch),
+                              order=order,
+                              resume=args.resume)
     else:
         parser.print_help()
         return
 
-    scheduler.register(config=configs if not args.check else verify_configs)
+    selected_configs = configs if not args.check else verify_configs
+    if args.sweep:
+        selected_configs = sweep_configs
+    if args.scaling:
+        selected_configs = scaling_configs
+    if args.precision:
+        selected_configs = precision_configs
+    if args.kernels:
+        selected_configs = kernel_configs
+
+    if args.rules is not None:
+        baselines = [c for c in selected_configs if c.implementation.name in ['allreduce', 'allgather']]
+        selected_configs = selected_configs + [
+            dataclasses.replace(c, implementation=impl)
+            for c in baselines
+            for impl in tuned(args.rules)
+            if impl.name.startswith(c.implementation.name)
+        ]
+    if args.optima is not None:
+        selected_configs = optimal(selected_configs, args.optima)
+    if args.recommended is not None:
+        selected_configs = recommended(selected_configs, args.recommended)
+
+    selected_configs = [
+        dataclasses.replace(c, output_format=args.output_format, trace=args.trace) for c in selected_configs
+    ]
+    scheduler.register(config=selected_configs)
 
     scheduler.run_grouped()
 
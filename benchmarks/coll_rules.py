@@ -0,0 +1,141 @@
+"""
+Turns the results of a sweep over the native Open MPI algorithms (`benchmark.py --sweep`) into a dynamic rules file for
+the tuned collectives component, which can be passed to mpirun with
+
+    --mca coll_tuned_use_dynamic_rules 1 --mca coll_tuned_dynamic_rules_filename <file>
+
+The file selects the fastest measured algorithm (and segment size) per communicator size and message size.
+"""
+
+import collections
+import dataclasses
+import json
+import re
+import statistics
+import typing
+
+from metrics import VALUE_SIZES
+from scheduler import Implementation, native_allgather, native_allreduce
+
+# Collective IDs of the rules file, see COLLTYPE_T in ompi/mca/coll/base/coll_base_functions.h
+COLLECTIVE_IDS = {
+    'allgather': 0,
+    'allreduce': 2,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class Rule:
+    message_size: int  # in bytes, the rule applies from this message size up to the next rule
+    algorithm: int
+    segment_size: int = 0  # 0 for the default
+
+    def line(self) -> str:
+        # message size, algorithm, topology fan in/out (default), segment size
+        return f'{self.message_size} {self.algorithm} 0 {self.segment_size}'
+
+
+def native_implementation(name: str) -> typing.Optional[Implementation]:
+    """
+    The native implementation a result was measured with, or None if it is not a native algorithm.
+    """
+    segment_size = None
+    match = re.fullmatch(r'(.*)-seg(\d+)', name)
+    if match is not None:
+        name, segment_size = match.group(1), int(match.group(2))
+
+    for impl in native_allreduce + native_allgather:
+        if impl.name == name:
+            return dataclasses.replace(impl, segment_size=segment_size)
+
+    return None
+
+
+def message_size(collective: str, record: dict) -> int:
+    """
+    Message size (in bytes) as Open MPI computes it to look up the rules: the reduced buffer for allreduce, the gathered
+    buffer for allgather. Of the two allgathers of a run, the one of A is used. Reduced precisions communicate smaller
+    elements (see `metrics.VALUE_SIZES`).
+    """
+    value_size = VALUE_SIZES[record.get('dtype', 'float64')]
+    if collective == 'allreduce':
+        return record['N'] * record['M'] * value_size
+
+    return record['numprocs'] * record['N'] * value_size
+
+
+def fastest(records: typing.Iterable[dict]) -> typing.Dict[str, typing.Dict[int, typing.List[Rule]]]:
+    """
+    Fastest algorithm per collective, communicator size and message size, by the median runtime across all iterations
+    but the first (warmup) one. Rules of a communicator size are sorted by message size and merged if consecutive
+    message sizes use the same algorithm.
+    """
+    runtimes = collections.defaultdict(list)
+    for record in records:
+        impl = native_implementation(record['name'])
+        if impl is None or record['iteration'] == 0:
+            continue
+
+        collective = impl.collective()
+        key = (collective, record['numprocs'], message_size(collective, record), impl.collective_algorithm())
+        runtimes[key + (impl.segment_size or 0,)].append(record['runtime'])
+
+    best: typing.Dict[tuple, typing.Tuple[float, Rule]] = {}
+    for (collective, comm_size, size, algorithm, segment_size), values in runtimes.items():
+        median = statistics.median(values)
+        key = (collective, comm_size, size)
+        if key not in best or median < best[key][0]:
+            best[key] = (median, Rule(size, algorithm, segment_size))
+
+    rules = collections.defaultdict(lambda: collections.defaultdict(list))
+    for (collective, comm_size, size) in sorted(best):
+        rule = best[(collective, comm_size, size)][1]
+        previous = rules[collective][comm_size]
+        if previous and (previous[-1].algorithm, previous[-1].segment_size) == (rule.algorithm, rule.segment_size):
+            continue
+
+        previous.append(rule)
+
+    for comm_sizes in rules.values():
+        for comm_rules in comm_sizes.values():
+            # Smaller messages than measured use the rule of the smallest measured size
+            comm_rules[0] = dataclasses.replace(comm_rules[0], message_size=0)
+
+    return {collective: dict(comm_sizes) for collective, comm_sizes in rules.items()}
+
+
+def write_rules(rules: typing.Dict[str, typing.Dict[int, typing.List[Rule]]], f: typing.TextIO):
+    """
+    Open MPI reads the file number by number and skips everything else, so the comments must not contain digits.
+    """
+    f.write(f'{len(rules)} # number of collectives\n')
+    for collective in sorted(rules, key=COLLECTIVE_IDS.get):
+        comm_sizes = rules[collective]
+        f.write(f'{COLLECTIVE_IDS[collective]} # collective ID ({collective})\n')
+        f.write(f'{len(comm_sizes)} # number of communicator sizes\n')
+
+        for comm_size in sorted(comm_sizes):
+            f.write(f'{comm_size} # communicator size\n')
+            f.write(f'{len(comm_sizes[comm_size])} # number of message sizes\n')
+            for rule in comm_sizes[comm_size]:
+                f.write(f'{rule.line()}\n')
+
+
+def convert(input_files: typing.List[str], output_file: str) -> int:
+    """
+    Writes the rules of all sweep results in the (json lines) input files into `output_file`, returns the number of
+    rules.
+    """
+
+    def records():
+        for input_file in input_files:
+            with open(input_file) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    rules = fastest(records())
+    with open(output_file, 'w') as o:
+        write_rules(rules, o)
+
+    return sum(len(r) for comm_sizes in rules.values() for r in comm_sizes.values())
@@ -0,0 +1,123 @@
+"""
+Validates the communication volume measured by the PMPI profiler (`comm` in the output of builds with DSOP_PROFILER,
+see notes/Output_Format.md) against the theoretical volume of every implementation in `metrics.communicated_bytes`.
+
+The profiler counts the payload passed to every MPI call. Point-to-point sends are sent as is, the bytes a collective
+sends on the wire are estimated with the same bandwidth-optimal algorithms the theoretical model assumes (`WIRE`).
+Receives and waits do not send anything. Collectives on subcommunicators are recorded as `<MPI function>@<size>` and
+estimated with the size of the subcommunicator.
+"""
+
+import ast
+import typing
+
+import numpy as np
+import pandas as pd
+
+import metrics
+import steady_state
+
+# Bytes sent per byte of payload of an MPI call with p processes
+WIRE: typing.Dict[str, typing.Callable[[int], float]] = {
+    'MPI_Send': lambda p: 1,
+    'MPI_Ssend': lambda p: 1,
+    'MPI_Isend': lambda p: 1,
+    'MPI_Sendrecv': lambda p: 1,
+    'MPI_Allreduce': lambda p: 2 * (p - 1) / p,  # reduce-scatter and allgather
+    'MPI_Allgather': lambda p: p - 1,  # the own contribution is forwarded to all others
+    'MPI_Iallgather': lambda p: p - 1,
+    'MPI_Allgatherv': lambda p: p - 1,
+    'MPI_Bcast': lambda p: (p - 1) / p,  # every process but root receives the buffer once
+}
+
+# Columns identifying a configuration, `validate` adds the parameters of the implementation
+CONFIG_COLUMNS = ['implementation', 'N', 'M', 'numprocs', 'density', 'dtype']
+
+# Relative deviation from the theoretical volume above which a configuration is flagged. The model of sparse inputs uses
+# the nominal density, which the generated vectors only match up to a few percent for small N.
+TOLERANCE = 0.1
+
+
+def comm_columns(df: pd.DataFrame) -> typing.List[str]:
+    """
+    Columns of the per-rank payloads, `comm.<MPI function>.bytes` after flattening the json records.
+    """
+    return [c for c in df.columns if c.startswith('comm.') and c.endswith('.bytes')]
+
+
+def rank_bytes(record: pd.Series, columns: typing.List[str]) -> typing.Optional[np.ndarray]:
+    """
+    Estimated bytes sent per rank of a single iteration, None if it was not profiled (or made no MPI calls).
+    """
+    p = int(record['numprocs'])
+    sent = None
+    for column in columns:
+        payload = record[column]
+        if isinstance(payload, str):  # lists are serialized when read from the aggregated csv
+            payload = ast.literal_eval(payload)
+        if not isinstance(payload, list):  # function not called in this iteration
+            continue
+
+        call, _, comm_size = column[len('comm.'):-len('.bytes')].partition('@')
+        factor = WIRE[call](int(comm_size) if comm_size else p) if call in WIRE else 0
+        sent = (0 if sent is None else sent) + factor * np.asarray(payload, dtype=float)
+
+    return sent
+
+
+def validate(df: pd.DataFrame, tolerance: float = TOLERANCE) -> pd.DataFrame:
+    """
+    Measured (mean and max over ranks) and theoretical bytes sent per process of every profiled configuration in `df`,
+    `deviation` is measured_mean / expected - 1 and `flagged` is set if its magnitude exceeds `tolerance`.
+    Implementations without a volume model have no expected volume and are never flagged.
+    """
+    columns = comm_columns(df)
+    params = steady_state.param_columns(df)
+    rows = []
+    for _, record in df.iterrows():
+        sent = rank_bytes(record, columns)
+        if sent is None:
+            continue
+
+        rows.append({
+            **{c: record[c] for c in CONFIG_COLUMNS + params if c in record.index},
+            'measured_mean': sent.mean(),
+            'measured_max': sent.max(),
+        })
+
+    if not rows:
+        return pd.DataFrame(columns=CONFIG_COLUMNS + params + ['measured_mean', 'measured_max', 'expected', 'deviation',
+                                                               'flagged'])
+
+    measured = pd.DataFrame(rows)
+    if 'density' not in measured.columns:
+        measured['density'] = 1.0
+    if 'dtype' not in measured.columns:
+        measured['dtype'] = 'float64'
+    measured['dtype'] = measured['dtype'].fillna('float64')
+    # The volume is the same in every iteration, the median only guards against partially written records
+    measured = measured.groupby(CONFIG_COLUMNS + params, as_index=False,
+                                dropna=False)[['measured_mean', 'measured_max']].median()
+
+    measured['expected'] = [
+        metrics.communicated_bytes(config['implementation'], config['N'], config['M'], config['numprocs'],
+                                   config['density'], {c[len('params.'):]: int(config[c]) for c in params
+                                                       if pd.notna(config[c])}, metrics.VALUE_SIZES[config['dtype']])
+        for _, config in measured.iterrows()
+    ]
+    measured['expected'] = measured['expected'].astype(float)
+    measured['deviation'] = np.where(measured['expected'] > 0, measured['measured_mean'] / measured['expected'] - 1,
+                                     np.where(measured['measured_mean'] > 0, np.inf, 0.0))
+    measured.loc[measured['expected'].isna(), 'deviation'] = np.nan
+    measured['flagged'] = measured['deviation'].abs() > tolerance
+
+    return measured
+
+
+def convert(df: pd.DataFrame, output_file: str, tolerance: float = TOLERANCE) -> pd.DataFrame:
+    """
+    Writes the validation of all profiled results into `output_file` (csv), returns the flagged configurations.
+    """
+    validated = validate(df, tolerance)
+    validated.to_csv(output_file, index=False)
+    return validated[validated['flagged']]
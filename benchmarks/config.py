@@ -1,2 +1,9 @@
 binary_path = 'code/build_output/main'
+kernel_binary_path = 'code/build_output/kernel_bench'  # see kernels.py
 results_path = 'results/tmp'
+
+# Peak bandwidths (bytes/s) the achieved bandwidths are compared against (see metrics.py), from the specs of the Euler
+# III nodes (notes/euler_specs.md). Replace them with calibrated values (e.g. osu_bw between two nodes, STREAM triad
+# on a node) where available.
+LINK_BANDWIDTH = 10e9 / 8  # 10G Ethernet per node
+MEMORY_BANDWIDTH = 2 * 2133e6 * 8  # dual channel DDR4-2133
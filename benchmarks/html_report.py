@@ -0,0 +1,268 @@
+"""
+Writes a single self-contained HTML file to browse the results, instead of one static figure per combination of
+parameters.
+
+The runtimes are summarized into a compact json cube embedded into the page: the median of every repetition (job) is
+taken as a single observation like in `PlotManager.plot_for_report`, and the cube holds percentiles of these medians per
+implementation, N and number of processes. Parameters, reduced precisions, placements and densities of an
+implementation are separate implementations in the report (see `implementation_labels`). The charts are drawn
+client-side (plain JavaScript and SVG, no external dependencies), with filters for all four dimensions.
+"""
+
+import html
+import json
+import typing
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['implementation', 'N', 'numprocs']
+PERCENTILES = [10, 25, 50, 75, 90, 95, 99]
+
+# Significant digits of the runtimes in the cube
+PRECISION = 5
+
+
+def implementation_labels(df: pd.DataFrame) -> pd.Series:
+    """
+    Implementation of every record with its parameters, and its precision, placement and density other than float64,
+    1ppn and 1.0, e.g. `kernel-avx2[threads=2]` or `allreduce [float32, 4ppn, density=0.05]`.
+    """
+    columns = ['implementation'] + sorted(c for c in df.columns if c.startswith('params.'))
+    columns += [c for c in ['dtype', 'placement', 'density'] if c in df.columns]
+
+    def label(values: tuple) -> str:
+        config = dict(zip(columns, values))
+        params = [
+            f'{c[len("params."):]}={int(v)}' for c, v in config.items() if c.startswith('params.') and pd.notna(v)
+        ]
+        out = config['implementation'] + (f'[{",".join(params)}]' if params else '')
+
+        tags = []
+        if pd.notna(config.get('dtype', 'float64')) and config.get('dtype', 'float64') != 'float64':
+            tags.append(config['dtype'])
+        if pd.notna(config.get('placement', '1ppn')) and config.get('placement', '1ppn') != '1ppn':
+            tags.append(config['placement'])
+        if pd.notna(config.get('density', 1.0)) and config.get('density', 1.0) != 1.0:
+            tags.append(f'density={config["density"]:g}')
+
+        return out + (f' [{", ".join(tags)}]' if tags else '')
+
+    # Only label every combination once
+    unique = df[columns].drop_duplicates()
+    unique['label'] = [label(values) for values in unique.itertuples(index=False)]
+    labels = df[columns].merge(unique, how='left', on=columns)['label']
+    labels.index = df.index
+
+    return labels
+
+
+def cube(df: pd.DataFrame, percentiles: typing.List[int] = PERCENTILES) -> dict:
+    """
+    Summary statistics of the (steady) iterations in `df`. `runtime` is a flat list in row-major order of the dimensions
+    (implementation, N, numprocs, percentile), `runs` in order of (implementation, N, numprocs). Missing combinations are
+    null.
+    """
+    df = df.assign(implementation=implementation_labels(df))
+    repetitions = df.groupby(DIMENSIONS + ['repetition'])['runtime'].median().reset_index()
+    grouped = repetitions.groupby(DIMENSIONS)['runtime']
+    summary = grouped.apply(lambda r: np.percentile(r, percentiles)).to_dict()
+    runs = grouped.size().to_dict()
+
+    dims = {d: sorted(df[d].unique().tolist()) for d in DIMENSIONS}
+    dims = {d: [v.item() if isinstance(v, np.generic) else v for v in values] for d, values in dims.items()}
+
+    runtime, counts = [], []
+    for key in pd.MultiIndex.from_product([dims[d] for d in DIMENSIONS]):
+        values = summary.get(key)
+        counts.append(int(runs[key]) if key in runs else None)
+        if values is None:
+            runtime.extend([None] * len(percentiles))
+        else:
+            runtime.extend(float(f'{v:.{PRECISION}g}') for v in values)
+
+    dims['percentile'] = list(percentiles)
+    return {'dims': dims, 'runtime': runtime, 'runs': counts}
+
+
+def render(data: dict, title: str = 'Benchmark results') -> str:
+    # Escape closing tags, the json is embedded into a script element
+    embedded = json.dumps(data, separators=(',', ':')).replace('</', '<\\/')
+    return TEMPLATE.replace('{{title}}', html.escape(title)).replace('{{data}}', embedded)
+
+
+def write(df: pd.DataFrame, output_file: str, title: str = 'Benchmark results') -> int:
+    """
+    Writes the report of all (steady) iterations in `df`, returns its size in bytes.
+    """
+    page = render(cube(df), title)
+    with open(output_file, 'w') as f:
+        f.write(page)
+
+    return len(page)
+
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{{title}}</title>
+<style>
+  body { font-family: sans-serif; margin: 1em 2em; }
+  fieldset { display: inline-block; vertical-align: top; margin: 0 1em 1em 0; max-height: 12em; overflow-y: auto; }
+  label { display: block; white-space: nowrap; }
+  .chart { display: inline-block; margin: 0 1em 1em 0; }
+  .chart h3 { margin: 0; font-size: 1em; text-align: center; }
+  svg text { font-size: 11px; }
+  .grid { stroke: #eee; }
+</style>
+</head>
+<body>
+<h1>{{title}}</h1>
+<div id="controls">
+  <fieldset><legend>Axes</legend>
+    <label>x axis <select id="x"><option value="N">N</option><option value="numprocs">numprocs</option></select></label>
+    <label>percentile <select id="percentile"></select></label>
+    <label><input type="checkbox" id="logy"> log scale</label>
+  </fieldset>
+  <fieldset id="implementation"><legend>implementation</legend></fieldset>
+  <fieldset id="N"><legend>N</legend></fieldset>
+  <fieldset id="numprocs"><legend>numprocs</legend></fieldset>
+</div>
+<div id="charts"></div>
+<script id="data" type="application/json">{{data}}</script>
+<script>
+"use strict";
+const data = JSON.parse(document.getElementById("data").textContent);
+const dims = data.dims;
+const names = ["implementation", "N", "numprocs", "percentile"];
+const colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22",
+                "#17becf"];
+const svgNs = "http://www.w3.org/2000/svg";
+
+function value(impl, n, numprocs, percentile) {
+  const idx = [impl, n, numprocs, percentile];
+  let flat = 0;
+  for (let d = 0; d < names.length; d++) {
+    flat = flat * dims[names[d]].length + idx[d];
+  }
+  return data.runtime[flat];
+}
+
+function runs(impl, n, numprocs) {
+  return data.runs[(impl * dims.N.length + n) * dims.numprocs.length + numprocs];
+}
+
+function checkboxes(dim) {
+  const fieldset = document.getElementById(dim);
+  dims[dim].forEach((v, i) => {
+    const label = document.createElement("label");
+    label.innerHTML = `<input type="checkbox" data-index="${i}" checked> ${v}`;
+    fieldset.appendChild(label);
+  });
+}
+
+function selected(dim) {
+  return Array.from(document.querySelectorAll(`#${dim} input:checked`)).map(e => +e.dataset.index);
+}
+
+function el(name, attrs, parent) {
+  const e = document.createElementNS(svgNs, name);
+  for (const [k, v] of Object.entries(attrs)) {
+    e.setAttribute(k, v);
+  }
+  parent.appendChild(e);
+  return e;
+}
+
+function chart(title, xs, series, logy) {
+  const width = 460, height = 300, margin = {left: 60, right: 10, top: 10, bottom: 40};
+  const div = document.createElement("div");
+  div.className = "chart";
+  div.innerHTML = `<h3>${title}</h3>`;
+  const svg = el("svg", {width: width, height: height}, div);
+
+  const all = series.flatMap(s => s.values.filter(v => v !== null));
+  if (all.length === 0) {
+    el("text", {x: width / 2, y: height / 2, "text-anchor": "middle"}, svg).textContent = "no data";
+    return div;
+  }
+  const f = logy ? Math.log10 : (v => v);
+  let lo = f(Math.min(...all)), hi = f(Math.max(...all));
+  if (!logy) lo = 0;
+  if (hi === lo) hi = lo + 1;
+
+  const px = i => margin.left + (xs.length === 1 ? 0.5 : i / (xs.length - 1)) * (width - margin.left - margin.right);
+  const py = v => height - margin.bottom - (f(v) - lo) / (hi - lo) * (height - margin.top - margin.bottom);
+
+  for (let t = 0; t <= 4; t++) {
+    const v = logy ? Math.pow(10, lo + t * (hi - lo) / 4) : lo + t * (hi - lo) / 4;
+    const y = py(v);
+    el("line", {x1: margin.left, x2: width - margin.right, y1: y, y2: y, class: "grid"}, svg);
+    el("text", {x: margin.left - 4, y: y + 4, "text-anchor": "end"}, svg).textContent = v.toPrecision(3);
+  }
+  xs.forEach((x, i) => {
+    el("text", {x: px(i), y: height - margin.bottom + 15, "text-anchor": "middle"}, svg).textContent = x;
+  });
+  el("text", {x: 12, y: height / 2, transform: `rotate(-90 12 ${height / 2})`, "text-anchor": "middle"}, svg)
+      .textContent = "Runtime (s)";
+
+  series.forEach(s => {
+    let path = "";
+    s.values.forEach((v, i) => {
+      if (v === null) return;
+      path += `${path === "" ? "M" : "L"}${px(i)},${py(v)}`;
+      const point = el("circle", {cx: px(i), cy: py(v), r: 3, fill: s.color}, svg);
+      el("title", {}, point).textContent = `${s.name}, ${xs[i]}: ${v} s (${s.runs[i]} runs)`;
+    });
+    el("path", {d: path, fill: "none", stroke: s.color, "stroke-width": 1.5}, svg);
+  });
+  return div;
+}
+
+function legend(impls) {
+  const div = document.createElement("div");
+  div.innerHTML = impls.map(i => `<span style="color: ${colors[i % colors.length]}">&#9679;</span> ` +
+                            `${dims.implementation[i]}`).join(" &nbsp; ");
+  return div;
+}
+
+function update() {
+  const xDim = document.getElementById("x").value;
+  const fDim = xDim === "N" ? "numprocs" : "N";
+  const percentile = +document.getElementById("percentile").value;
+  const logy = document.getElementById("logy").checked;
+  const impls = selected("implementation");
+  const xs = selected(xDim);
+
+  const charts = document.getElementById("charts");
+  charts.innerHTML = "";
+  charts.appendChild(legend(impls));
+  selected(fDim).forEach(f => {
+    const series = impls.map(impl => {
+      const index = x => xDim === "N" ? [impl, x, f] : [impl, f, x];
+      return {
+        name: dims.implementation[impl],
+        color: colors[impl % colors.length],
+        values: xs.map(x => value(...index(x), percentile)),
+        runs: xs.map(x => runs(...index(x))),
+      };
+    });
+    charts.appendChild(chart(`${fDim} = ${dims[fDim][f]}`, xs.map(x => dims[xDim][x]), series, logy));
+  });
+}
+
+dims.percentile.forEach((p, i) => {
+  const option = document.createElement("option");
+  option.value = i;
+  option.textContent = p;
+  option.selected = p === 50;
+  document.getElementById("percentile").appendChild(option);
+});
+["implementation", "N", "numprocs"].forEach(checkboxes);
+document.getElementById("controls").addEventListener("change", update);
+update();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,61 @@
+"""
+Local outer product kernels timed in isolation by `kernel_bench` (`benchmark.py --kernels`, see code/include/kernels.hpp),
+recorded as the implementations `kernel-<name>` with the number of threads in `params.threads`.
+
+The fastest single-threaded kernel bounds how fast the local updates of an implementation can be. The time it would
+take for the updates of an implementation relative to the runtime of the implementation is the share of the runtime
+that is inherently spent computing: close to 1 the implementation is compute-bound, and its `runtime_compute` beyond
+this share is overhead of its own kernel (e.g. cache misses of scattered updates).
+"""
+
+import numpy as np
+import pandas as pd
+
+PREFIX = 'kernel-'
+
+RATE_COLUMNS = ['implementation', 'N', 'M', 'threads', 'ranks_per_node']
+
+
+def is_kernel(df: pd.DataFrame) -> pd.Series:
+    return df['implementation'].str.startswith(PREFIX)
+
+
+def rates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    GFLOP/s of every kernel in `df` (with the metrics of `metrics.add_metrics`) per size, number of threads and ranks
+    per node, the median of the per-repetition medians.
+    """
+    data = df[is_kernel(df)].copy()
+    data['threads'] = data['params.threads'].fillna(1).astype(int) if 'params.threads' in data.columns else 1
+    data['ranks_per_node'] = data['ranks_per_node'].fillna(1).astype(int) if 'ranks_per_node' in data.columns else 1
+
+    per_repetition = data.groupby(RATE_COLUMNS + ['repetition'])['gflops'].median()
+    return per_repetition.groupby(RATE_COLUMNS).median().reset_index()
+
+
+def best_rate(kernel_rates: pd.DataFrame, n: np.ndarray, m: np.ndarray) -> np.ndarray:
+    """
+    GFLOP/s of the fastest single-threaded kernel for updates of n x m matrices, interpolated over the number of
+    entries between the measured sizes (and constant beyond them). NaN without single-threaded measurements.
+    """
+    single = kernel_rates[kernel_rates['threads'] == 1]
+    entries = np.asarray(n, dtype=float) * np.asarray(m, dtype=float)
+    if single.empty:
+        return np.full(entries.shape, np.nan)
+
+    best = single.assign(entries=single['N'] * single['M']).groupby('entries')['gflops'].max()
+    return np.interp(entries, best.index.to_numpy(dtype=float), best.to_numpy(dtype=float))
+
+
+def compute_bound(df: pd.DataFrame, kernel_rates: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds to every iteration of the implementations in `df` (with the metrics of `metrics.add_metrics`):
+
+    - kernel_fraction: time the fastest kernel takes for the local updates relative to the runtime
+    - kernel_efficiency: achieved GFLOP/s in the compute time relative to the fastest kernel
+    """
+    df = df.copy()
+    rate = best_rate(kernel_rates, df['N'], df['M']) * 1e9
+    df['kernel_fraction'] = 2 * df['updates'] / rate / df['runtime']
+    df['kernel_efficiency'] = df['gflops'] * 1e9 / rate
+    return df
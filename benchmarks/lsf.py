@@ -0,0 +1,106 @@
+import collections
+import typing
+
+
+class ReportError(Exception):
+    pass
+
+
+class LsfReport:
+    """
+    Single-pass parser for the job reports LSF writes for each submitted job (`bsub -o`).
+
+    The header (subject and resource usage summary) is parsed when constructing the report. The output of the job is
+    only read by iterating over `lines()`, which continues on the same file object, such that a report never has to be
+    held in memory completely.
+    """
+
+    OUTPUT_START = 'The output (if any) follows:\n'
+    OUTPUT_END = 'PS:\n'
+
+    # Number of lines between the job output and the markers surrounding it
+    PADDING_START = 1
+    PADDING_END = 2
+
+    FIELDS = {
+        'Turnaround time': 'turnaround_time',
+        'Run time': 'runtime',
+        'Total Requested Memory': 'mem_requested',
+        'Max Memory': 'mem_max',
+    }
+
+    def __init__(self, job_id: str, f: typing.TextIO):
+        self.job_id = job_id
+        self.subject = ''
+        self.fields: typing.Dict[str, str] = {}
+        self._f = f
+        self._line_nr = 0
+        self._has_output = False
+
+        self._parse_header()
+
+    def _parse_header(self):
+        for line in self._f:
+            self._line_nr += 1
+
+            if self._line_nr == 2:
+                self.subject = line.strip()
+
+            if line == self.OUTPUT_START:
+                self._has_output = True
+                return
+
+            key, sep, value = line.partition(':')
+            if not sep:
+                continue
+
+            key = key.strip()
+            if key not in self.FIELDS:
+                continue
+
+            if key in self.fields:
+                raise ReportError(f'[{self.job_id}] expected a single line for key {key}')
+
+            self.fields[key] = value.split()[0] if value.split() else ''
+
+    def field(self, key: str) -> str:
+        if key not in self.fields:
+            raise ReportError(f'[{self.job_id}] key {key} not found in report')
+
+        return self.fields[key]
+
+    def job_data(self) -> dict:
+        max_mem = self.field('Max Memory')
+
+        return {
+            'id': self.job_id,
+            'turnaround_time': int(self.field('Turnaround time')),
+            'runtime': int(self.field('Run time')),
+            'mem_requested': float(self.field('Total Requested Memory')),
+            'mem_max': 0 if max_mem == '-' else float(max_mem),
+        }
+
+    def lines(self) -> typing.Iterator[typing.Tuple[int, str]]:
+        """
+        Yields the output lines of the job together with their (1-indexed) line number in the report.
+
+        Lines are held back until it is clear they are not part of the padding before the end of the output.
+        """
+        if not self._has_output:
+            return
+
+        pending = collections.deque()
+        skip = self.PADDING_START
+        for line in self._f:
+            self._line_nr += 1
+
+            if skip > 0:
+                skip -= 1
+                continue
+
+            if line == self.OUTPUT_END:
+                break
+
+            pending.append((self._line_nr, line))
+            if len(pending) > self.PADDING_END:
+                yield pending.popleft()
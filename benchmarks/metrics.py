@@ -0,0 +1,131 @@
+"""
+Derived metrics of every iteration: bytes each process sends according to the communication volume of its
+implementation, the achieved network bandwidth (bytes / MPI time), the achieved FLOP rate of the local outer products
+(flops / compute time) and their efficiency relative to the bandwidths in `config.py`.
+
+All volumes are per process and in elements for N = len(a), M = len(b) and p processes, assuming
+bandwidth-optimal collectives (ring / Rabenseifner) for the native MPI calls:
+
+- allreduce:      2 (p - 1) / p * N * M  (reduce-scatter and allgather of the whole result)
+- butterfly:      log2(p) * N * M        (recursive doubling exchanges the whole result in every round)
+- allgather:      (p - 1) * (N + M)      (every process computes the whole result)
+- g-rabenseifner: (p - 1) * (N + M) + (p - 1) / p * N * M  (allgather of the vectors, then of the result rows)
+- subgroup:       (p - 1) * (N + M) + (s - 1) / s * N * M  (result rows are only exchanged in subgroups of size s)
+"""
+
+import math
+import re
+import typing
+
+import numpy as np
+import pandas as pd
+
+from config import LINK_BANDWIDTH, MEMORY_BANDWIDTH
+
+DOUBLE_SIZE = 8
+# Bytes of a communicated element by precision (see `scheduler.dtypes`)
+VALUE_SIZES = {'float64': DOUBLE_SIZE, 'float32': 4, 'mixed': 4}
+# Bytes of a non-zero entry in compressed form (value and 32 bit index)
+SPARSE_ENTRY_SIZE = 12
+# Every update of the result reads and writes a double
+UPDATE_SIZE = 2 * DOUBLE_SIZE
+
+
+def n_groups(name: str, params: typing.Dict[str, int] = None) -> int:
+    if params and params.get('n_groups'):
+        return int(params['n_groups'])
+
+    match = re.search(r'subgroup-(\d+)$', name)
+    return int(match.group(1)) if match else 1
+
+
+def communicated_bytes(name: str, n: int, m: int, p: int, density: float = 1.0,
+                       params: typing.Dict[str, int] = None, value_size: int = DOUBLE_SIZE) -> typing.Optional[float]:
+    """
+    Bytes sent per process, None for implementations without a volume model.
+    """
+    if p < 2:
+        return 0.0
+
+    result = n * m
+    vectors = (p - 1) * (n + m)
+    if name.startswith('allreduce-butterfly'):
+        elements = math.log2(p) * result
+    elif name.startswith('allreduce'):
+        elements = 2 * (p - 1) / p * result
+    elif name == 'allgather-sparse':
+        # Compressed entries are only sent if they are smaller than the dense vectors
+        return vectors * min(density * SPARSE_ENTRY_SIZE, DOUBLE_SIZE)
+    elif name.startswith('allgather') or name == 'bruck-async':
+        elements = vectors
+    elif name == 'rabenseifner-gather':
+        # Every process sends its share of A and its B to all others before exchanging the result rows
+        elements = (p - 1) * (n / p + m) + (p - 1) / p * result
+    elif name.startswith('g-rabenseifner-subgroup'):
+        size = p / min(n_groups(name, params), p)
+        elements = vectors + (size - 1) / size * result
+    elif name.startswith('g-rabenseifner'):
+        elements = vectors + (p - 1) / p * result
+    elif name.startswith('kernel-'):
+        # Kernels only update the local matrix (see kernels.py)
+        elements = 0
+    else:
+        return None
+
+    return elements * value_size
+
+
+def local_updates(name: str, n: int, m: int, p: int, params: typing.Dict[str, int] = None) -> typing.Optional[float]:
+    """
+    Multiply-adds of the outer products per process, None for implementations without a model.
+    """
+    result = n * m
+    if name.startswith('allgather') or name == 'bruck-async':
+        return p * result
+    if name.startswith('g-rabenseifner-subgroup'):
+        # The rows of the result are split among the processes of a subgroup
+        size = p / min(n_groups(name, params), p)
+        return p * result / size
+    if name.startswith('allreduce') or name.startswith('g-rabenseifner') or name == 'rabenseifner-gather' \
+            or name.startswith('kernel-'):
+        return result
+
+    return None
+
+
+def add_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the metrics to every iteration of `df` (runtimes in seconds, see `plot.load_results`):
+
+    - bytes: bytes sent per process
+    - updates: multiply-adds of the outer products per process
+    - network_gbps: achieved bandwidth in GB/s of the slowest process (bytes / MPI time)
+    - gflops: achieved GFLOP/s of the slowest process (2 flops per multiply-add / compute time)
+    - link_efficiency, memory_efficiency: fraction of the bandwidth of a process' share of the link and of the memory
+      bandwidth of its node
+    """
+    density = df['density'].to_numpy() if 'density' in df.columns else [1.0] * len(df)
+    groups = df['params.n_groups'].to_numpy() if 'params.n_groups' in df.columns else [np.nan] * len(df)
+    ranks_per_node = df['ranks_per_node'].fillna(1) if 'ranks_per_node' in df.columns else 1
+    dtypes = df['dtype'].fillna('float64').to_numpy() if 'dtype' in df.columns else ['float64'] * len(df)
+
+    sent, updates = [], []
+    for impl, n, m, p, d, g, dtype in zip(df['implementation'], df['N'], df['M'], df['numprocs'], density, groups,
+                                          dtypes):
+        params = None if pd.isna(g) else {'n_groups': g}
+        sent.append(communicated_bytes(impl, n, m, p, d, params, VALUE_SIZES[dtype]))
+        updates.append(local_updates(impl, n, m, p, params))
+
+    df = df.copy()
+    df['bytes'] = pd.Series(sent, index=df.index, dtype=float)
+    df['updates'] = updates = pd.Series(updates, index=df.index, dtype=float)
+
+    runtime_mpi = (df['runtime'] - df['runtime_compute']).where(lambda t: t > 0)
+    runtime_compute = df['runtime_compute'].where(lambda t: t > 0)
+
+    df['network_gbps'] = df['bytes'] / runtime_mpi / 1e9
+    df['gflops'] = 2 * updates / runtime_compute / 1e9
+    df['link_efficiency'] = df['bytes'] / runtime_mpi / (LINK_BANDWIDTH / ranks_per_node)
+    df['memory_efficiency'] = UPDATE_SIZE * updates / runtime_compute / (MEMORY_BANDWIDTH / ranks_per_node)
+
+    return df
@@ -0,0 +1,222 @@
+"""
+Submission order of the groups (jobs) of a campaign, such that a campaign cut short (e.g. when the allocation runs out)
+already answers the most important questions: which implementation is the fastest for every size and number of
+processes.
+
+Groups are ordered by `Scheduler.grouping_key`, groups only differing in their job repetition form a class. The first
+job repetition of every class is the pilot round, submitted first and interleaved across node counts (smallest,
+largest, second smallest, ...), such that any prefix of the campaign covers the whole range of node counts. The
+remaining groups are ordered greedily by their expected information gain per cost:
+
+- Every configuration is estimated by the mean and variance of its per-job median runtimes in prior results (parsed
+  records of a pilot or of a previous campaign). Configurations with a single job use the median relative spread of
+  the others.
+- The ranking of two implementations of the same comparison (size, number of processes, density, precision and
+  placement) is wrong with probability `misranking`, the normal tail of the difference of their means.
+- The gain of a group is the expected reduction of the misranking probabilities by one more job of its
+  configurations, its cost the estimated core time. After a group is picked, its configurations count as measured
+  once more, such that the next jobs go to the next most uncertain comparisons. Ties go to the least measured class.
+
+Without prior results every gain is zero, and the order falls back to round-robin over the classes. This module runs
+with `benchmark.py` on the cluster, so it only uses the standard library of Python 3.6.
+"""
+
+import collections
+import glob
+import json
+import math
+import statistics
+import typing
+
+from scheduler import Configuration
+
+DEFAULT_SPREAD = 0.05  # relative standard deviation of the job medians without repeated jobs in the prior
+
+ConfigKey = typing.Tuple
+GroupKey = typing.Tuple
+
+
+class Estimate(typing.NamedTuple):
+    mean: float  # of the per-job median runtimes
+    variance: typing.Optional[float]  # of a single per-job median, None with a single job
+    jobs: int
+
+
+def config_key(name: str, params: typing.Dict[str, int], n: int, m: int, numprocs: int, density: float,
+               dtype: str, placement: str) -> ConfigKey:
+    """
+    Key of a configuration, the same for a `Configuration` and its records. Job repetitions share the key, the first
+    two entries identify the implementation and the rest the comparison (see `comparison`).
+    """
+    return (name, tuple(sorted((params or {}).items())), int(n), int(m), int(numprocs), float(density), dtype,
+            placement)
+
+
+def configuration_key(config: Configuration) -> ConfigKey:
+    return config_key(config.implementation.name, dict(config.implementation.params), config.n, config.m, config.nodes,
+                      config.density, config.dtype, str(config.placement))
+
+
+def record_key(record: dict) -> ConfigKey:
+    return config_key(record['name'], record.get('params'), record['N'], record['M'], record['numprocs'],
+                      record.get('density', 1.0), record.get('dtype', 'float64'), record.get('placement') or '1ppn')
+
+
+def comparison(key: ConfigKey) -> ConfigKey:
+    return key[2:]
+
+
+def estimates(records: typing.Iterable[dict]) -> typing.Dict[ConfigKey, Estimate]:
+    """
+    Estimates of the configurations in `records` (json lines of `main`), from the median runtime of every job.
+    """
+    runtimes = collections.defaultdict(list)
+    for record in records:
+        runtimes[record_key(record), record['repetition']].append(record['runtime'])
+
+    medians = collections.defaultdict(list)
+    for (key, _), values in runtimes.items():
+        medians[key].append(statistics.median(values))
+
+    result = {}
+    for key, values in medians.items():
+        variance = statistics.variance(values) if len(values) > 1 else None
+        result[key] = Estimate(statistics.mean(values), variance, len(values))
+
+    # Single jobs spread like the others
+    spreads = [math.sqrt(e.variance) / e.mean for e in result.values() if e.variance is not None and e.mean > 0]
+    spread = statistics.median(spreads) if spreads else DEFAULT_SPREAD
+    for key, e in result.items():
+        if e.variance is None:
+            result[key] = e._replace(variance=(spread * e.mean)**2)
+
+    return result
+
+
+def load_prior(pattern: str) -> typing.Dict[ConfigKey, Estimate]:
+    """
+    Estimates from the parsed results matching `pattern` (e.g. `<results dir>/parsed/*.json`), empty without any.
+    """
+    def records():
+        for path in sorted(glob.glob(pattern)):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    return estimates(records())
+
+
+def misranking(a: Estimate, jobs_a: int, b: Estimate, jobs_b: int) -> float:
+    """
+    Probability that the order of the means of `a` and `b` over `jobs_a` and `jobs_b` jobs is the wrong one.
+    """
+    deviation = math.sqrt(a.variance / jobs_a + b.variance / jobs_b)
+    if deviation == 0:
+        return 0.0 if a.mean != b.mean else 0.5
+
+    return 0.5 * math.erfc(abs(a.mean - b.mean) / deviation / math.sqrt(2))
+
+
+class Planner:
+    """
+    Greedy order of groups (see module documentation), with the jobs of every configuration counted from the prior.
+    """
+
+    def __init__(self, prior: typing.Dict[ConfigKey, Estimate]):
+        self.prior = prior
+        self.jobs = {key: e.jobs for key, e in prior.items()}
+        self.rivals = collections.defaultdict(list)
+        for key in prior:
+            self.rivals[comparison(key)].append(key)
+
+        means = sorted(e.mean for e in prior.values())
+        self.default_runtime = statistics.median(means) if means else 1.0
+
+    def gain(self, key: ConfigKey) -> float:
+        """
+        Expected reduction of the misranking probabilities of `key` by one more job of it.
+        """
+        if key not in self.prior:
+            return 0.0
+
+        e, jobs = self.prior[key], self.jobs[key]
+        total = 0.0
+        for other in self.rivals[comparison(key)]:
+            if other != key:
+                o = self.prior[other]
+                total += misranking(e, jobs, o, self.jobs[other]) - misranking(e, jobs + 1, o, self.jobs[other])
+
+        return total
+
+    def cost(self, config: Configuration) -> float:
+        key = configuration_key(config)
+        runtime = self.prior[key].mean if key in self.prior else self.default_runtime
+        return config.nodes * config.repetitions * runtime
+
+    def priority(self, configs: typing.List[Configuration]) -> float:
+        return sum(self.gain(configuration_key(c)) for c in configs) / sum(self.cost(c) for c in configs)
+
+    def submitted(self, configs: typing.List[Configuration]):
+        for c in configs:
+            key = configuration_key(c)
+            if key in self.jobs:
+                self.jobs[key] += 1
+
+    def order(self, groups: typing.Dict[GroupKey, typing.List[Configuration]]) -> typing.List[GroupKey]:
+        pilot = pilot_order(groups)
+        rank = {key[:-1]: i for i, key in enumerate(pilot)}
+        for key in pilot:
+            self.submitted(groups[key])
+
+        rest = set(groups) - set(pilot)
+        picked = collections.Counter()
+        priorities = {key: self.priority(groups[key]) for key in rest}
+        result = list(pilot)
+        while rest:
+            best = max(rest, key=lambda k: (priorities[k], -picked[k[:-1]], -rank[k[:-1]], -k[-1]))
+            rest.remove(best)
+            result.append(best)
+            picked[best[:-1]] += 1
+
+            # Only the groups of the same class share configurations
+            self.submitted(groups[best])
+            for key in rest:
+                if key[:-1] == best[:-1]:
+                    priorities[key] = self.priority(groups[key])
+
+        return result
+
+
+def interleaved(items: list) -> list:
+    """
+    Alternates between the ends of `items`: first, last, second, second to last, ...
+    """
+    result = []
+    low, high = 0, len(items) - 1
+    while low <= high:
+        result.append(items[low])
+        if low != high:
+            result.append(items[high])
+        low, high = low + 1, high - 1
+
+    return result
+
+
+def uncertainty_order(prior: typing.Dict[ConfigKey, Estimate]):
+    """
+    Order of `Scheduler.run_grouped` by expected information gain with the estimates in `prior`.
+    """
+    return lambda groups: Planner(prior).order(groups)
+
+
+def pilot_order(groups: typing.Dict[GroupKey, typing.List[Configuration]]) -> typing.List[GroupKey]:
+    """
+    Order of `Scheduler.run_grouped` only submitting the pilot round, the first job repetition of every class.
+    """
+    first = {}
+    for key in sorted(groups):
+        first.setdefault(key[:-1], key)
+
+    return [first[cls] for cls in interleaved(sorted(first))]
+
@@ -1,4 +1,6 @@
 import dataclasses
+import fnmatch
+import functools
 import json
 import pathlib
 from typing import List
@@ -16,6 +18,16 @@ from itertools import product
 
 from matplotlib.axes import Axes
 
+from config import LINK_BANDWIDTH, MEMORY_BANDWIDTH
+
+import html_report
+import kernels
+import metrics
+import resources
+import scaling
+import steady_state
+from result_index import ResultIndex
+
 agg_func = np.median
 
 IMPL_NAMES = {
@@ -29,6 +41,88 @@ def impl_labels(impls: List[str]):
     return list(map(get_impl_label, impls))
 
 
+# Per-rank timings of an iteration, in the order they are stored in binary output files (`--output-format npy`)
+TIMING_KEYS = ['runtimes', 'runtimes_mpi', 'runtimes_compute']
+
+
+@functools.lru_cache(maxsize=128)
+def load_timings(path: str) -> np.ndarray:
+    """
+    Memory-maps a binary timings file of shape (iterations, timing keys, processes) without reading it.
+    """
+    return np.load(path, mmap_mode='r')
+
+
+def rank_timings(record: pd.Series, key: str) -> np.ndarray:
+    """
+    Per-rank timings `key` (one of TIMING_KEYS) of a single iteration, either stored in the record itself or in the
+    binary file it references.
+    """
+    runtimes_file = record.get('runtimes_file')
+    if isinstance(runtimes_file, str):
+        return load_timings(runtimes_file)[record['iteration'], TIMING_KEYS.index(key)]
+
+    timings = record[key]
+    if isinstance(timings, str):  # lists are serialized when read from the aggregated csv
+        timings = ast.literal_eval(timings)
+
+    return np.asarray(timings, dtype=np.int64)
+
+
+def phase_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Columns of the per-rank phase durations, `phases.<name>` after flattening the json records.
+    """
+    return [c for c in df.columns if c.startswith('phases.')]
+
+
+def slowest_rank_phases(record: pd.Series, columns: List[str]) -> pd.Series:
+    """
+    Phase durations (in seconds) of the slowest process of a single iteration, such that they add up to `runtime`
+    together with the time spent outside of any phase.
+    """
+    slowest = int(np.argmax(rank_timings(record, 'runtimes')))
+
+    durations = {}
+    for column in columns:
+        timings = record[column]
+        if isinstance(timings, str):
+            timings = ast.literal_eval(timings)
+        if not isinstance(timings, list):  # phase not used by this implementation
+            continue
+
+        durations[column[len('phases.'):]] = timings[slowest] / 1_000_000
+
+    return pd.Series(durations, dtype=float)
+
+
+def placement_labels(df: pd.DataFrame) -> pd.Series:
+    """
+    Label of the process placement of every record (see `scheduler.Placement`). Records without one were measured with
+    a single rank per node.
+    """
+    ranks_per_node = df['ranks_per_node'] if 'ranks_per_node' in df.columns else pd.Series(1, index=df.index)
+    default = ranks_per_node.fillna(1).astype(int).astype(str) + 'ppn'
+
+    if 'placement' not in df.columns:
+        return default
+
+    return df['placement'].where(df['placement'].notna() & (df['placement'] != ''), default)
+
+
+def subgroup_labels(df: pd.DataFrame) -> pd.Series:
+    """
+    Implementation of every record, with runs of g-rabenseifner-subgroup with the parameter n_groups labelled like the
+    variants fixing the number of groups by their name (`g-rabenseifner-subgroup-<n_groups>`).
+    """
+    if 'params.n_groups' not in df.columns:
+        return df['implementation']
+
+    subgroup = (df['implementation'] == 'g-rabenseifner-subgroup') & df['params.n_groups'].notna()
+    labels = 'g-rabenseifner-subgroup-' + df['params.n_groups'].fillna(0).astype(int).astype(str)
+    return df['implementation'].where(~subgroup, labels)
+
+
 def get_agg_func(func_key: str, percentile=99.):
     if func_key == 'mean':
         return np.mean
@@ -43,16 +137,36 @@ def get_agg_func(func_key: str, percentile=99.):
     else:
         return np.mean
 
+# Figures rendered as static files by default (relative to the output directory, shell-style patterns), everything
+# else is only browsed in the html report
+REPORT_FIGURES = [
+    'report/analysis/cmp',
+    'report/cmp_numprocs_16_32_48*',
+    'report/speedup_plot_N_numprocs_16_32_48__baseline_allreduce_percentile_50_*',
+    'report/runtime_numprocs_16_32_48_N_percentile_50_*',
+    'phases/*',
+    'placement_*',
+    'efficiency/*',
+    'scaling/strong_*',
+    'scaling/memory_*',
+    'resources/*',
+    'precision/*',
+    'kernels/*',
+]
+
+
 @dataclasses.dataclass
 class PlotManager:
     output_dir: str
     prefix: str = None
+    figures: List[str] = None  # patterns of the figures to save (see REPORT_FIGURES), None saves all
 
     def plot_for_report(self, df: pd.DataFrame, func_key='median'):
         print("Plotting for report")
 
         agg_func = get_agg_func(func_key)
 
+        df = df.assign(implementation=subgroup_labels(df))
         selected_impls = ['allgather', 'allreduce', 'allreduce-ring', 'g-rabenseifner-allgather']
         all_impls = ['allgather', 'allreduce', 'allreduce-ring', 'g-rabenseifner-allgather', "g-rabenseifner-subgroup-2", "g-rabenseifner-subgroup-4", "g-rabenseifner-subgroup-8"]
 
@@ -77,8 +191,9 @@ class PlotManager:
         )
         df = df.reset_index()
 
-        self.plot_report_boxviolin('box', True, df, processes, impls, 95)
-        self.plot_report_boxviolin('violin', False, df, processes, impls, 95)
+        index = ResultIndex(df)
+        self.plot_report_boxviolin('box', True, df, processes, impls, 95, index)
+        self.plot_report_boxviolin('violin', False, df, processes, impls, 95, index)
 
         fig, (ax_left, ax_right) = plt.subplots(ncols=2, sharey=True, figsize=(24, 9))
         self.plot_report_boxviolin_comparison(True, df, ax_left, 8000, 48, impls, 95)
@@ -375,8 +490,7 @@ class PlotManager:
             #     el = filtered[filtered['iteration'] == it].iloc[0][key]
             #     transformed_el = list(map(int, ast.literal_eval( el )))
             #     l.append(transformed_el)
-            l = [list(map(int, ast.literal_eval(filtered[filtered['iteration'] == it].iloc[0][key]))) for it in
-                 iterations]
+            l = [rank_timings(filtered[filtered['iteration'] == it].iloc[0], key).tolist() for it in iterations]
             # l = [filtered[filtered['iteration'] == it][key] for it in iterations]
             quantiles = [violin_quantiles] * len(xticks)
 
@@ -452,7 +566,10 @@ class PlotManager:
         ax.set_title('')
 
     def plot_report_boxviolin(self, name: str, boxplot: bool, df: pd.DataFrame, num_processes: List[int],
-                              impls: List[str], percentile=95):
+                              impls: List[str], percentile=95, index: ResultIndex = None):
+        if index is None:
+            index = ResultIndex(df)
+
         perc_high = percentile / 100
         perc_low = 1 - perc_high
         violin_quantiles = [perc_low, perc_high]
@@ -466,13 +583,13 @@ class PlotManager:
 
         for i, numprocs in enumerate(num_processes):
             for j, impl in enumerate(impls):
-                data = df[(df['implementation'] == impl) & (df['numprocs'] == numprocs)]
                 if boxplot:
+                    data = index.frame(implementation=impl, numprocs=numprocs)
                     data.boxplot(column='runtime', by=['N'], ax=axes[i, j], whis=box_whiskers, notch=False,
                                  showfliers=False)
                 else:
-                    xticks = data['N'].unique().tolist()
-                    l = [data[data['N'] == x]['runtime'].to_list() for x in xticks]
+                    xticks = index.unique('N', implementation=impl, numprocs=numprocs)
+                    l = [index.values('runtime', implementation=impl, numprocs=numprocs, N=x) for x in xticks]
                     quantiles = [violin_quantiles] * len(xticks)
                     axes[i, j].violinplot(l, positions=xticks, quantiles=quantiles, showmedians=True, showextrema=False,
                                           widths=[xticks[-1] / len(xticks) * 0.5] * len(xticks))
@@ -793,32 +910,30 @@ class PlotManager:
             runtime=pd.NamedAgg(column="runtime", aggfunc=agg_func)
         )
         data = data.reset_index()
+        if log:
+            data['runtime'] = np.log(data['runtime'])
+        index = ResultIndex(data)
+
+        value_range = (np.min(df['runtime']), np.max(df['runtime']))
+        if log:
+            value_range = (np.min(np.log(df['runtime'])), np.max(np.log(df['runtime'])))
 
         # make a plot per node configuration and one per algorithm
         keys = [('numprocs', 'implementation'), ('implementation', 'numprocs')]
         for key in keys:
-            for key_val in data[key[0]].unique():
-                plt_data = data[data[key[0]] == key_val]
-                rows = plt_data[key[1]].unique().tolist()
-                cols = plt_data['N'].unique().tolist()
-                rows.sort()
-                cols.sort()
+            for key_val in index.unique(key[0]):
+                rows = index.unique(key[1], **{key[0]: key_val})
+                cols = index.unique('N', **{key[0]: key_val})
                 n_rows = len(rows)
                 n_cols = len(cols)
-                value_range = (np.min(df['runtime']), np.max(df['runtime']))
-                if log:
-                    value_range = (np.min(np.log(df['runtime'])), np.max(np.log(df['runtime'])))
-                    plt_data = plt_data.apply(lambda x: np.log(x) if x.name == 'runtime' else x)
 
                 fig, axes = plt.subplots(nrows=n_rows, ncols=n_cols, sharex=True, sharey=True, figsize=(24, 13),
                                          squeeze=False)
 
                 for i, val_i in enumerate(rows):
                     for j, val_j in enumerate(cols):
-                        filtered_data = plt_data[
-                            (plt_data[key[0]] == key_val) & (plt_data[key[1]] == val_i) & (
-                                    plt_data['N'] == val_j)]
-                        axes[i, j].hist(x=filtered_data['runtime'], bins=n_bins, color="skyblue", range=value_range)
+                        runtimes = index.values('runtime', **{key[0]: key_val, key[1]: val_i, 'N': val_j})
+                        axes[i, j].hist(x=runtimes, bins=n_bins, color="skyblue", range=value_range)
 
                 # set plot labels
                 for i, val_i in enumerate(rows):
@@ -930,6 +1045,35 @@ class PlotManager:
 
         return percentile
 
+    def plot_precision(self, df: pd.DataFrame, func_key: str = 'median'):
+        """
+        Speedup of the reduced precisions over float64 of every implementation across input sizes, one figure per
+        number of processes.
+        """
+        print("Plotting precision comparison")
+        self.prefix = 'precision'
+        func = get_agg_func(func_key)
+
+        for num_procs, data in df.groupby('numprocs'):
+            runtimes = data.pivot_table(index=['implementation', 'N'], columns='dtype', values='runtime', aggfunc=func)
+            reduced = [dtype for dtype in runtimes.columns if dtype != 'float64']
+            if 'float64' not in runtimes.columns or not reduced:
+                continue
+
+            fig, ax = plt.subplots()
+            color_dict = self.map_colors(sorted(runtimes.index.get_level_values('implementation').unique()))
+            for dtype, linestyle in zip(reduced, ['-', '--', ':']):
+                speedup = (runtimes['float64'] / runtimes[dtype]).dropna()
+                for impl, impl_speedup in speedup.groupby(level='implementation'):
+                    ax.plot(impl_speedup.index.get_level_values('N'), impl_speedup, marker='o', linestyle=linestyle,
+                            color=color_dict[impl], label=f'{get_impl_label(impl)} ({dtype})')
+
+            ax.axhline(1, color='gray', linewidth=1)
+            ax.set(xlabel='N', ylabel='Speedup over float64')
+            ax.legend()
+            fig.suptitle(f'Reduced precision ({num_procs} processes, {func_key})')
+            self.plot_and_save(f'speedup_{num_procs}')
+
     def plot_and_save_with_log(self, name: str, width: float = 10, height: float = 5, subplot_adjust: bool = False):
         self.plot_and_save(name, width, height, subplot_adjust, False)
         plt.yscale('log')
@@ -945,6 +1089,12 @@ class PlotManager:
         else:
             plt.tight_layout()
         # plt.legend(bbox_to_anchor=(1, 1))
+        path = name if self.prefix is None else f'{self.prefix}/{name}'
+        if self.figures is not None and not any(fnmatch.fnmatch(path, f) for f in self.figures):
+            if close:
+                plt.close()
+            return
+
         output_dir = self.output_dir if self.prefix is None else f'{self.output_dir}/{self.prefix}'
         pathlib.Path(output_dir).mkdir(parents=True, exist_ok=True)
         plt.savefig(f'{output_dir}/{name}.png')
@@ -1133,6 +1283,240 @@ class PlotManager:
         # self.plot_mem_usage(df)
         # self.plot_iterations(df)
 
+    def plot_phase_breakdown(self, df: pd.DataFrame, func_key: str = 'median'):
+        """
+        Stacked bars of the runtime of the slowest process split into the phases of the implementation, one figure per
+        implementation with a subplot per number of processes.
+        """
+        columns = phase_columns(df)
+        if not columns:
+            return
+
+        self.prefix = 'phases'
+
+        print("Plotting phase breakdown")
+        func = get_agg_func(func_key)
+
+        for impl, impl_df in df.groupby('implementation'):
+            phases = impl_df.apply(lambda record: slowest_rank_phases(record, columns), axis=1)
+            phases = phases.dropna(axis=1, how='all')
+            if phases.shape[1] == 0:
+                continue
+
+            phases['other'] = (impl_df['runtime'] - phases.sum(axis=1)).clip(lower=0)
+            phases['N'] = impl_df['N']
+            phases['numprocs'] = impl_df['numprocs']
+
+            num_procs = sorted(phases['numprocs'].unique())
+            fig, axs = plt.subplots(1, len(num_procs), sharey=True, squeeze=False)
+            for ax, p in zip(axs[0], num_procs):
+                phases[phases['numprocs'] == p].drop(columns='numprocs').groupby('N').agg(func).plot(
+                    kind='bar',
+                    stacked=True,
+                    ax=ax,
+                    title=f'{p} processes',
+                    xlabel='N',
+                    ylabel='Runtime (s)',
+                )
+
+            fig.suptitle(f'Phase breakdown of {get_impl_label(impl)} ({func_key})')
+            self.plot_and_save(f'phases_{impl}', width=5 * len(num_procs))
+
+    def plot_efficiency(self, df: pd.DataFrame, func_key: str = 'median'):
+        """
+        Achieved network bandwidth and FLOP rate across input sizes (see metrics.py), one figure per number of processes
+        with the bound of the link and of the memory bandwidth as dashed lines.
+        """
+        if 'network_gbps' not in df.columns:
+            return
+
+        print("Plotting efficiency")
+        self.prefix = 'efficiency'
+        func = get_agg_func(func_key)
+        bounds = {
+            'network_gbps': ('Network bandwidth (GB/s)', LINK_BANDWIDTH / 1e9),
+            'gflops': ('Outer product (GFLOP/s)', 2 * MEMORY_BANDWIDTH / metrics.UPDATE_SIZE / 1e9),
+        }
+
+        for num_procs, data in df.groupby('numprocs'):
+            fig, axs = plt.subplots(1, len(bounds), squeeze=False)
+            for ax, (column, (label, bound)) in zip(axs[0], bounds.items()):
+                pivot = data.pivot_table(index='N', columns='implementation', values=column, aggfunc=func)
+                if pivot.empty:
+                    continue
+
+                pivot.plot(ax=ax, kind='line', xlabel='N', ylabel=label, marker='o', logy=True)
+                ax.axhline(bound, color='black', linestyle='--', label='peak')
+
+            fig.suptitle(f'Achieved bandwidth and FLOP rate ({num_procs} processes, {func_key})')
+            self.plot_and_save(f'efficiency_{num_procs}', width=12)
+
+    def plot_kernels(self, kernel_df: pd.DataFrame, df: pd.DataFrame, func_key: str = 'median'):
+        """
+        FLOP rate of the local outer product kernels across input sizes, one figure per number of threads and ranks per
+        node, and the share of the runtime of every implementation the fastest kernel needs for its local updates (see
+        kernels.py), one figure per number of processes.
+        """
+        rates = kernels.rates(kernel_df)
+        if rates.empty:
+            return
+
+        print("Plotting kernels")
+        self.prefix = 'kernels'
+        pathlib.Path(f'{self.output_dir}/{self.prefix}').mkdir(parents=True, exist_ok=True)
+        rates.to_csv(f'{self.output_dir}/{self.prefix}/rates.csv', index=False)
+
+        for (threads, ranks_per_node), data in rates.groupby(['threads', 'ranks_per_node']):
+            data.pivot_table(index='N', columns='implementation', values='gflops').plot(
+                kind='line', xlabel='N', ylabel='GFLOP/s', marker='o', logx=True,
+                title=f'Outer product kernels ({threads} threads, {ranks_per_node} ranks per node)')
+            ax = plt.gca()
+            ax.axhline(2 * MEMORY_BANDWIDTH / metrics.UPDATE_SIZE / ranks_per_node / 1e9, color='black',
+                       linestyle='--', label='memory bound')
+            self.plot_and_save(f'gflops_{threads}t_{ranks_per_node}ppn')
+
+        bound = kernels.compute_bound(df, rates)
+        func = get_agg_func(func_key)
+        for num_procs, data in bound.groupby('numprocs'):
+            pivot = data.pivot_table(index='N', columns='implementation', values='kernel_fraction', aggfunc=func)
+            if pivot.dropna(how='all').empty:
+                continue
+
+            pivot.plot(kind='line', xlabel='N', ylabel='Share of the runtime', ylim=(0, 1), marker='o',
+                       title=f'Runtime of the fastest kernel ({num_procs} processes, {func_key})')
+            self.plot_and_save(f'compute_bound_{num_procs}')
+
+    def plot_scaling(self, df: pd.DataFrame):
+        """
+        Runtime (with the fitted model), parallel efficiency and Karp-Flatt metric of every scaling series (see
+        scaling.py), one figure per scaling mode and base size with a line per implementation.
+        """
+        data = scaling.series(df)
+        if data.empty:
+            return
+
+        print("Plotting scaling")
+        self.prefix = 'scaling'
+        pathlib.Path(f'{self.output_dir}/{self.prefix}').mkdir(parents=True, exist_ok=True)
+        data.to_csv(f'{self.output_dir}/{self.prefix}/scaling.csv', index=False)
+        fitted = scaling.fits(data)
+        fitted.to_csv(f'{self.output_dir}/{self.prefix}/fits.csv', index=False)
+
+        for (mode, base_n), mode_data in data.groupby(['mode', 'base_N']):
+            fig, (ax_runtime, ax_efficiency, ax_karp_flatt) = plt.subplots(1, 3)
+            color_dict = self.map_colors(sorted(mode_data['implementation'].unique()))
+
+            for impl, points in mode_data.groupby('implementation'):
+                color = color_dict[impl]
+                ax_runtime.plot(points['numprocs'], points['runtime'], 'o', color=color, label=get_impl_label(impl))
+                ax_efficiency.plot(points['numprocs'], points['efficiency'], marker='o', color=color)
+                ax_karp_flatt.plot(points['numprocs'], points['karp_flatt'], marker='o', color=color)
+
+                if points.shape[0] >= 3:
+                    base_numprocs = points['base_numprocs'].iloc[0]
+                    numprocs = np.linspace(points['numprocs'].min(), points['numprocs'].max(), 50)
+                    ax_runtime.plot(numprocs, scaling.predict(scaling.fit(points), numprocs / base_numprocs), '--',
+                                    color=color)
+
+            ax_runtime.set(xlabel='Number of processes', ylabel='Runtime (s)', title='Runtime (dashed: fit)')
+            ax_efficiency.set(xlabel='Number of processes', ylabel='Parallel efficiency', title='Efficiency')
+            ax_efficiency.axhline(1, color='black', linestyle='--')
+            ax_karp_flatt.set(xlabel='Number of processes', ylabel='Serial fraction', title='Karp-Flatt metric')
+            ax_runtime.legend()
+
+            fig.suptitle(f'{mode} scaling from N = M = {base_n}')
+            self.plot_and_save(f'{mode}_{base_n}', width=18)
+
+    def plot_rank_memory(self, df: pd.DataFrame, func_key: str = 'median'):
+        """
+        Peak RSS of the largest rank across input sizes (see resources.py), one figure per number of processes. The
+        per-rank estimate from the LSF job maximum is shown dashed where available.
+        """
+        if df['rss_max'].isna().all():
+            return
+
+        print("Plotting memory per rank")
+        self.prefix = 'resources'
+        func = get_agg_func(func_key)
+
+        for num_procs, data in df[df['rss_max'].notna()].groupby('numprocs'):
+            fig, ax = plt.subplots()
+            color_dict = self.map_colors(sorted(data['implementation'].unique()))
+            measured = data.pivot_table(index='N', columns='implementation', values='rss_max', aggfunc=func)
+            for impl in measured.columns:
+                ax.plot(measured.index, measured[impl], marker='o', color=color_dict[impl], label=get_impl_label(impl))
+
+            if 'job.mem_max_avg' in data.columns and data['job.mem_max_avg'].gt(0).any():
+                estimated = data.pivot_table(index='N', columns='implementation', values='job.mem_max_avg', aggfunc=func)
+                for impl in estimated.columns:
+                    ax.plot(estimated.index, estimated[impl], linestyle='--', color=color_dict[impl])
+
+            ax.set(xlabel='N', ylabel='Peak RSS per rank (GB)')
+            ax.legend()
+            fig.suptitle(f'Memory of the largest rank ({num_procs} processes, dashed: LSF maximum / processes)')
+            self.plot_and_save(f'memory_{num_procs}')
+
+    def plot_interference(self, df: pd.DataFrame):
+        """
+        Runtime against the involuntary context switches and the CPU fraction of the slowest rank of every iteration
+        (see resources.py), one figure per number of processes. Slow iterations with many switches or a low CPU fraction
+        were disturbed by the OS rather than by the network.
+        """
+        if df['cpu_fraction'].isna().all():
+            return
+
+        print("Plotting interference")
+        self.prefix = 'resources'
+
+        for num_procs, data in df[df['cpu_fraction'].notna()].groupby('numprocs'):
+            fig, (ax_switches, ax_cpu) = plt.subplots(1, 2, sharey=True)
+            color_dict = self.map_colors(sorted(data['implementation'].unique()))
+            for impl, impl_data in data.groupby('implementation'):
+                relative = impl_data['runtime'] / impl_data.groupby('N')['runtime'].transform('median')
+                ax_switches.scatter(impl_data['ctx_involuntary'], relative, s=4, color=color_dict[impl],
+                                    label=get_impl_label(impl))
+                ax_cpu.scatter(impl_data['cpu_fraction'], relative, s=4, color=color_dict[impl])
+
+            ax_switches.set(xlabel='Involuntary context switches', ylabel='Runtime / median runtime of N')
+            ax_switches.set_xscale('symlog')
+            ax_cpu.set(xlabel='CPU time / runtime')
+            ax_switches.legend()
+            fig.suptitle(f'Interference of the slowest rank ({num_procs} processes)')
+            self.plot_and_save(f'interference_{num_procs}', width=12)
+
+    def plot_placement_comparison(self, df: pd.DataFrame, func_key: str = 'median'):
+        """
+        Runtime across input sizes with a subplot per placement, one figure per number of processes.
+        """
+        print("Plotting placement comparison")
+        func = get_agg_func(func_key)
+        placements = sorted(df['placement'].unique())
+
+        for num_procs, data in df.groupby('numprocs'):
+            fig, axs = plt.subplots(1, len(placements), sharey=True, squeeze=False)
+            for ax, placement in zip(axs[0], placements):
+                placement_data = data[data['placement'] == placement]
+                if placement_data.shape[0] == 0:
+                    ax.set_title(f'{placement} (no data)')
+                    continue
+
+                placement_data.pivot_table(
+                    index='N',
+                    columns='implementation',
+                    values='runtime',
+                    aggfunc=func,
+                ).plot(
+                    ax=ax,
+                    title=placement,
+                    kind='line',
+                    xlabel='N',
+                    ylabel='Runtime (s)',
+                    marker='o',
+                )
+
+            fig.suptitle(f'Runtime by placement ({num_procs} processes, {func_key})')
+            self.plot_and_save(f'placement_{num_procs}', width=6 * len(placements))
+
     def plot_job_stats(self, df: pd.DataFrame):
         self.prefix = 'job'
 
@@ -1159,11 +1543,11 @@ class PlotManager:
             self.plot_and_save(f"queueing_hist_{x_data[0]}")
 
 
-def plot(input_files: List[str], input_dir: str, output_dir: str):
-    sns.set()
-
-    pm = PlotManager(output_dir=output_dir)
-
+def load_results(input_files: List[str], input_dir: str) -> pd.DataFrame:
+    """
+    All results of the parsed (json lines) input files as a flat data frame, runtimes in seconds. The result is cached
+    in `{input_dir}/aggregated.csv`.
+    """
     aggregated_file = f"{input_dir}/aggregated.csv"
     if os.path.isfile(aggregated_file):
         df = pd.read_csv(aggregated_file)
@@ -1182,16 +1566,69 @@ def plot(input_files: List[str], input_dir: str, output_dir: str):
     df['runtime_compute'] /= 1_000_000
     df['runtime'] /= 1_000_000
     df['fraction'] = df['runtime_compute'] / df['runtime']
-    # Drop the first iteration because it is a warmup iteration
-    df = df[df['iteration'] > 0]
+    df['placement'] = placement_labels(df)
+    df['density'] = df['density'].fillna(1.0) if 'density' in df.columns else 1.0
+    df['dtype'] = df['dtype'].fillna('float64') if 'dtype' in df.columns else 'float64'
+
+    return df
+
+
+def plot(input_files: List[str], input_dir: str, output_dir: str, figures: List[str] = REPORT_FIGURES):
+    """
+    Writes the html report and the static `figures` (None for all) into `output_dir`.
+    """
+    sns.set()
+
+    pm = PlotManager(output_dir=output_dir, figures=figures)
+
+    df = metrics.add_metrics(load_results(input_files, input_dir))
+    df = resources.add_resource_usage(df, lambda record: rank_timings(record, 'runtimes'))
 
+    # Drop the warmup iterations of every run
+    df = steady_state.annotate(df)
+    warmup = steady_state.summary(df)
+    warmup.to_csv(f'{output_dir}/warmup.csv', index=False)
+    print(f"Warmup: at most {warmup['warmup_p90'].max():.0f} iterations in 90% of the runs of every configuration "
+          f"(see {output_dir}/warmup.csv)")
+    df = df[df['steady']]
+
+    size = html_report.write(df, f'{output_dir}/report.html')
+    print(f"Wrote {output_dir}/report.html ({size // 1024} KiB)")
 
     # size_df = df.groupby(["N", "implementation", "numprocs", "repetition"]).size()
     # size_df = size_df.reset_index()
     # n_runs = size_df.groupby(["N", "implementation", "numprocs"]).size()
     # print(n_runs)
 
-    pm.plot_for_report(df)
+    if kernels.is_kernel(df).any():
+        # Kernels are no implementations, they only bound the local updates of the others
+        pm.plot_kernels(df[kernels.is_kernel(df)], df[~kernels.is_kernel(df)])
+        df = df[~kernels.is_kernel(df)]
+
+    if df['dtype'].nunique() > 1:
+        # Only the comparison mixes precisions, all other plots show float64
+        pm.plot_precision(df)
+        df = df[df['dtype'] == 'float64']
+
+    placements = sorted(df['placement'].unique())
+    if len(placements) > 1:
+        # Placements are not comparable within the same plot, only the comparison plot mixes them
+        pm.plot_placement_comparison(df)
+        for placement in placements:
+            placement_pm = PlotManager(output_dir=f'{output_dir}/placement/{placement}', figures=figures)
+            placement_pm.plot_for_report(df[df['placement'] == placement])
+            placement_pm.plot_phase_breakdown(df[df['placement'] == placement])
+            placement_pm.plot_efficiency(df[df['placement'] == placement])
+            placement_pm.plot_scaling(df[df['placement'] == placement])
+            placement_pm.plot_rank_memory(df[df['placement'] == placement])
+            placement_pm.plot_interference(df[df['placement'] == placement])
+    else:
+        pm.plot_for_report(df)
+        pm.plot_phase_breakdown(df)
+        pm.plot_efficiency(df)
+        pm.plot_scaling(df)
+        pm.plot_rank_memory(df)
+        pm.plot_interference(df)
 
 
     # pm.plot_all(df, prefix="all")
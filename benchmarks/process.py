@@ -5,72 +5,119 @@ import argparse
 import pathlib
 import os
 
-from scheduler import EulerRunner
 from config import results_path
 
 import plot
-
-folder_offsets = {  # sorry but i have no easier Idea to collect them easily
-    "mixed/dave": 0 * 17,
-    "mixed/dave2": (4 * 17) + (0 * 15),
-    "mixed/elwin": 1 * 17,
-    "mixed/elwin2": (4 * 17) + (1 * 15),
-    "mixed/noe": 2 * 17,
-    "mixed/noe2": (4 * 17) + (2 * 15),
-    "mixed/patrick": 3 * 17,
-    "mixed/patrick2": (4 * 17) + (3 * 15),
-    "mixed/roysc": 0,
-    "mixed/roysc2": (4 * 17),
-    "raw": 0,
-}
+import registry
+import timeline
+import coll_rules
+import comm_profile
+import html_report
+import steady_state
+import variance
 
 
 def main():
     parser = argparse.ArgumentParser(description='Collect all raw benchmark files')
-    parser.add_argument('action', choices=['all', 'collect', 'plot'], default='all', nargs='?')
+    parser.add_argument('action', choices=['all', 'collect', 'plot', 'report', 'trace', 'rules', 'variance', 'comm'], default='all', nargs='?')
     parser.add_argument('-a',
                         '--aggregate',
                         type=str,
-                        default="raw",
-                        help="Directory unaggregated results from multiple benchmarks")
+                        action='append',
+                        default=None,
+                        help="Directory with one subdirectory of raw results per campaign, can be repeated (default: raw)")
+    parser.add_argument('--rebuild',
+                        action="store_true",
+                        default=False,
+                        help="Forget all collected campaigns and collect everything again (collect action)")
     parser.add_argument('-d',
                         '--dir',
                         type=str,
                         default=results_path,
                         help="Directory containing results (both in and output")
+    parser.add_argument('-o',
+                        '--output',
+                        type=str,
+                        default=None,
+                        help="Output file of the report (default: <dir>/report.html), trace (default: <dir>/trace.json), rules (default: <dir>/coll_rules.conf), variance (default: <dir>/repetitions.json) and comm (default: <dir>/comm_volume.csv) actions")
+    parser.add_argument('--all-figures',
+                        action="store_true",
+                        default=False,
+                        help="Save every figure as a static file, not only the ones in plot.REPORT_FIGURES (plot action)")
+    parser.add_argument('--ci-width',
+                        type=float,
+                        default=0.02,
+                        help="Target width of the 95%% confidence interval of the mean runtime, relative to the mean (variance action)")
+    parser.add_argument('--job-cost',
+                        type=float,
+                        default=10,
+                        help="Startup cost of a job in number of iterations (variance action)")
+    parser.add_argument('--tolerance',
+                        type=float,
+                        default=comm_profile.TOLERANCE,
+                        help="Relative deviation from the theoretical communication volume to flag (comm action)")
     args = parser.parse_args()
 
     if args.action in ['all', 'collect']:
         folders = ['raw']
-        if args.aggregate != "raw":
-            subfolders = os.listdir(f"{args.dir}/{args.aggregate}")
-            folders = [f"{args.aggregate}/{f}" for f in subfolders]
+        if args.aggregate is not None:
+            folders = [
+                f"{aggregate}/{f}" for aggregate in args.aggregate for f in sorted(os.listdir(f"{args.dir}/{aggregate}"))
+                if not f.startswith('.')
+            ]
 
-        # Delete all current aggregated files
-        try:
-            parsed_dir = f"{args.dir}/parsed/"
-            files = [f for f in os.listdir(parsed_dir)]
-            for file in files:
-                os.remove(f"{parsed_dir}{file}")
-        except OSError as e:
-            print(f"Error when deleting aggregated files: {e}")
-
-        # jesus what have I done...
+        results = registry.Registry(args.dir, rebuild=args.rebuild)
         for folder in folders:
-            if folder.startswith('.'):
-                continue
-            for file in glob.glob(f'{args.dir}/{folder}/jobs-*'):
-                filename = pathlib.Path(file).name
-                repetition = int(filename.strip('jobs-'))
-                EulerRunner(results_dir=args.dir, raw_dir=folder).collect(repetition,
-                                                                          repetition_offset=folder_offsets[folder])
+            new, duplicates = results.collect(folder)
+            print(f"{folder}: collected {new} new records, dropped {duplicates} duplicates")
+        results.save()
 
     if args.action in ['all', 'plot']:
         input_dir = f"{args.dir}/parsed"
         input_files = glob.glob(f'{args.dir}/parsed/*.json')
         output_dir = f'{args.dir}/plots'
         pathlib.Path(output_dir).mkdir(exist_ok=True)
-        plot.plot(input_files=input_files, input_dir=input_dir, output_dir=output_dir)
+        figures = None if args.all_figures else plot.REPORT_FIGURES
+        plot.plot(input_files=input_files, input_dir=input_dir, output_dir=output_dir, figures=figures)
+
+    if args.action == 'report':
+        input_dir = f"{args.dir}/parsed"
+        input_files = glob.glob(f'{args.dir}/parsed/*.json')
+        output_file = args.output if args.output is not None else f'{args.dir}/report.html'
+        df = steady_state.trim(plot.load_results(input_files, input_dir))
+        size = html_report.write(df, output_file)
+        print(f"Wrote {output_file} ({size // 1024} KiB)")
+
+    if args.action == 'trace':
+        input_files = glob.glob(f'{args.dir}/parsed/*.json')
+        output_file = args.output if args.output is not None else f'{args.dir}/trace.json'
+        num_events = timeline.convert(input_files, output_file)
+        print(f"Wrote {num_events} trace events to {output_file}, open it in https://ui.perfetto.dev")
+
+    if args.action == 'rules':
+        input_files = glob.glob(f'{args.dir}/parsed/*.json')
+        output_file = args.output if args.output is not None else f'{args.dir}/coll_rules.conf'
+        num_rules = coll_rules.convert(input_files, output_file)
+        print(f"Wrote {num_rules} rules to {output_file}, use it with `benchmark.py --rules {output_file}`")
+
+    if args.action == 'variance':
+        input_dir = f"{args.dir}/parsed"
+        input_files = glob.glob(f'{args.dir}/parsed/*.json')
+        output_file = args.output if args.output is not None else f'{args.dir}/repetitions.json'
+        num_configs = variance.convert(input_files, input_dir, output_file, args.ci_width, args.job_cost)
+        print(f"Wrote recommendations for {num_configs} configurations to {output_file}, use them with "
+              f"`benchmark.py --recommended {output_file}`")
+
+    if args.action == 'comm':
+        input_dir = f"{args.dir}/parsed"
+        input_files = glob.glob(f'{args.dir}/parsed/*.json')
+        output_file = args.output if args.output is not None else f'{args.dir}/comm_volume.csv'
+        flagged = comm_profile.convert(plot.load_results(input_files, input_dir), output_file, args.tolerance)
+        print(f"Wrote measured and theoretical communication volumes to {output_file}")
+        for _, row in flagged.iterrows():
+            print(f"\033[31m{row['implementation']} N={row['N']} M={row['M']} numprocs={row['numprocs']}: "
+                  f"{row['measured_mean']:.0f} bytes sent per process, expected {row['expected']:.0f} "
+                  f"({row['deviation']:+.1%})\033[0m")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,129 @@
+"""
+Registry of all campaigns (raw result directories of `EulerRunner`, e.g. `raw` or one per teammate) that were collected
+into the parsed results, stored in `<results dir>/registry.json`.
+
+Every job repetition of a campaign (`<campaign>/jobs-<repetition>`) is assigned a globally unique repetition the first
+time it is seen, such that campaigns with overlapping repetition numbers can be merged. Jobs whose reports were
+collected once are skipped afterwards, so collecting again only parses new reports. Records are deduplicated by a hash
+of their job, configuration and iteration, which drops the records LSF emits twice for retried jobs (`bsub -r`) and
+campaign directories that were copied into the results more than once.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import typing
+
+from scheduler import EulerRunner
+
+REGISTRY_FILE = 'registry.json'
+
+# Fields of a record that identify its configuration, everything else is measured
+CONFIG_FIELDS = ['name', 'N', 'M', 'density', 'numprocs', 'placement', 'params', 'repetition', 'num_iterations']
+
+
+def record_key(job_id: str, record: dict) -> str:
+    """
+    Content hash of the job, configuration and iteration of a record (before its repetition is replaced).
+    """
+    content = {field: record.get(field) for field in CONFIG_FIELDS}
+    if record.get('dtype', 'float64') != 'float64':
+        # Only set for reduced precisions, such that the keys of float64 records did not change
+        content['dtype'] = record['dtype']
+    content['job'] = job_id
+    content['iteration'] = record.get('iteration')
+    serialized = json.dumps(content, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(serialized.encode()).hexdigest()[:16]
+
+
+class Registry:
+    def __init__(self, results_dir: str, rebuild: bool = False):
+        self.results_dir = results_dir
+        self.path = f'{results_dir}/{REGISTRY_FILE}'
+        self.parsed_dir = f'{results_dir}/parsed'
+
+        state = {}
+        if os.path.isfile(self.path) and not rebuild:
+            with open(self.path) as f:
+                state = json.load(f)
+        else:
+            # Parsed results without a registry cannot be told apart from new ones, collect everything again
+            for file in glob.glob(f'{self.parsed_dir}/*'):
+                os.remove(file)
+
+        self.next_repetition: int = state.get('next_repetition', 0)
+        # Per campaign: global repetition of every job repetition and the collected jobs
+        self.campaigns: typing.Dict[str, dict] = state.get('campaigns', {})
+        self.seen: typing.Set[str] = set(state.get('records', []))
+
+    def save(self):
+        state = {
+            'next_repetition': self.next_repetition,
+            'campaigns': self.campaigns,
+            'records': sorted(self.seen),
+        }
+
+        # Replace atomically, an interrupted collection must not lose the registry of the previous ones
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    def campaign(self, name: str) -> dict:
+        return self.campaigns.setdefault(name, {'repetitions': {}, 'jobs': []})
+
+    def repetition(self, name: str, repetition: int) -> int:
+        """
+        Global repetition of the job repetition `repetition` of campaign `name`, assigned on first use.
+        """
+        repetitions = self.campaign(name)['repetitions']
+        if str(repetition) not in repetitions:
+            repetitions[str(repetition)] = self.next_repetition
+            self.next_repetition += 1
+
+        return repetitions[str(repetition)]
+
+    def collect(self, name: str) -> typing.Tuple[int, int]:
+        """
+        Appends the records of all jobs of campaign `name` (relative to the results directory) that were not collected
+        yet to the parsed results. Returns the number of new and of duplicate records.
+        """
+        runner = EulerRunner(results_dir=self.results_dir, raw_dir=name)
+        campaign = self.campaign(name)
+        collected = set(campaign['jobs'])
+
+        new, duplicates = 0, 0
+        for job_repetition in runner.job_repetitions():
+            repetition = self.repetition(name, job_repetition)
+            with open(f'{self.parsed_dir}/{repetition}.json', 'a') as o:
+                for job_id, records in runner.job_records(job_repetition, skip=collected):
+                    if records is None:
+                        continue
+
+                    for record in records:
+                        key = record_key(job_id, record)
+                        if key in self.seen:
+                            duplicates += 1
+                            continue
+
+                        self.seen.add(key)
+                        record['repetition'] = repetition
+                        record['campaign'] = name
+                        o.write(json.dumps(record, separators=(',', ':')) + '\n')
+                        new += 1
+
+                    collected.add(job_id)
+                    campaign['jobs'].append(job_id)
+
+        if new > 0:
+            # The cache of `plot.load_results` is outdated
+            aggregated = f'{self.parsed_dir}/aggregated.csv'
+            if os.path.isfile(aggregated):
+                os.remove(aggregated)
+
+        if duplicates > 0:
+            logging.info(f'{name}: dropped {duplicates} duplicate records')
+
+        return new, duplicates
@@ -0,0 +1,75 @@
+"""
+Per-rank resource usage of every iteration, as recorded by `main` with getrusage around the implementation (`rusage`
+in the output, see notes/Output_Format.md).
+
+The peak RSS of a process includes its inputs and the result matrix, it is the real memory cost of a rank, unlike the
+job-level maximum reported by LSF divided by the number of processes. Involuntary context switches and a CPU time
+below the wall time of a rank hint at interference by the OS or other processes: MPI busy-polls while waiting, so an
+undisturbed rank spends its whole runtime on the CPU.
+"""
+
+import ast
+import typing
+
+import numpy as np
+import pandas as pd
+
+RESOURCE_KEYS = ['max_rss', 'cpu_user', 'cpu_system', 'ctx_voluntary', 'ctx_involuntary']
+
+KIB = 1024
+
+
+def rank_values(value) -> typing.Optional[np.ndarray]:
+    """
+    Per-rank array of a `rusage.<key>` cell, None for records without resource usage.
+    """
+    if isinstance(value, str):  # lists are serialized when read from the aggregated csv
+        value = ast.literal_eval(value)
+    if not isinstance(value, list):
+        return None
+
+    return np.asarray(value, dtype=np.int64)
+
+
+def add_resource_usage(df: pd.DataFrame, rank_runtimes: typing.Callable[[pd.Series], np.ndarray]) -> pd.DataFrame:
+    """
+    Adds the resource usage to every iteration of `df` that recorded it (NaN otherwise), `rank_runtimes` returns the
+    per-rank runtimes in microseconds of a record (see `plot.rank_timings`):
+
+    - rss_max, rss_mean: largest and mean peak RSS of the ranks in GB
+    - cpu_fraction: CPU time (user and system) of the slowest rank relative to its runtime
+    - ctx_voluntary, ctx_involuntary: context switches of the slowest rank during the iteration
+    """
+    columns = ['rss_max', 'rss_mean', 'cpu_fraction', 'ctx_voluntary', 'ctx_involuntary']
+    df = df.copy()
+    if not all(f'rusage.{key}' in df.columns for key in RESOURCE_KEYS):
+        for column in columns:
+            df[column] = np.nan
+        return df
+
+    rows = []
+    for _, record in df.iterrows():
+        usage = {key: rank_values(record[f'rusage.{key}']) for key in RESOURCE_KEYS}
+        if any(values is None for values in usage.values()):
+            rows.append([np.nan] * len(columns))
+            continue
+
+        runtimes = rank_runtimes(record)
+        slowest = int(np.argmax(runtimes))
+        rss = usage['max_rss'] * KIB / 1e9
+        cpu = usage['cpu_user'][slowest] + usage['cpu_system'][slowest]
+
+        rows.append([
+            rss.max(),
+            rss.mean(),
+            cpu / runtimes[slowest] if runtimes[slowest] > 0 else np.nan,
+            usage['ctx_voluntary'][slowest],
+            usage['ctx_involuntary'][slowest],
+        ])
+
+    # Positional, the index of the concatenated results is not unique
+    values = np.array(rows, dtype=float).reshape(len(rows), len(columns))
+    for i, column in enumerate(columns):
+        df[column] = values[:, i]
+
+    return df
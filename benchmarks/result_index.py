@@ -0,0 +1,90 @@
+"""
+Index over a results frame to fetch the rows of a configuration without scanning the whole frame with a boolean mask.
+
+The frame is sorted by the key columns once, such that the rows of every key are a contiguous range. Lookups by a
+subset of the key columns (e.g. only implementation and numprocs) are answered from a per-subset table of ranges, which
+is built on first use.
+"""
+
+import typing
+
+import numpy as np
+import pandas as pd
+
+KEYS = ('implementation', 'N', 'numprocs', 'repetition')
+
+
+class ResultIndex:
+
+    def __init__(self, df: pd.DataFrame, keys: typing.Sequence[str] = KEYS):
+        self.keys = tuple(k for k in keys if k in df.columns)
+        self.df = df.sort_values(list(self.keys), kind='stable').reset_index(drop=True)
+
+        # Row range [start, stop) of every full key, in sorted order
+        self._ranges: typing.Dict[tuple, typing.Tuple[int, int]] = {}
+        for key, positions in self.df.groupby(list(self.keys), sort=True).indices.items():
+            key = key if isinstance(key, tuple) else (key, )
+            self._ranges[key] = (int(positions[0]), int(positions[-1]) + 1)
+
+        self._subsets: typing.Dict[typing.Tuple[str, ...], typing.Dict[tuple, typing.List[typing.Tuple[int, int]]]] = {}
+        self._columns: typing.Dict[str, np.ndarray] = {}
+
+    def _lookup(self, criteria: typing.Dict[str, typing.Any]) -> typing.List[typing.Tuple[int, int]]:
+        for field in criteria:
+            if field not in self.keys:
+                raise KeyError(f'{field} is not indexed, expected one of {self.keys}')
+
+        fields = tuple(k for k in self.keys if k in criteria)
+        if fields not in self._subsets:
+            positions = [self.keys.index(f) for f in fields]
+            table: typing.Dict[tuple, typing.List[typing.Tuple[int, int]]] = {}
+            for key, row_range in self._ranges.items():
+                table.setdefault(tuple(key[p] for p in positions), []).append(row_range)
+
+            self._subsets[fields] = table
+
+        return self._subsets[fields].get(tuple(criteria[f] for f in fields), [])
+
+    def frame(self, **criteria) -> pd.DataFrame:
+        """
+        Rows matching all `criteria` (key column = value), a view if they are contiguous.
+        """
+        ranges = self._lookup(criteria)
+        if not ranges:
+            return self.df.iloc[0:0]
+
+        # Ranges of neighbouring keys touch, merge them to slice once where possible
+        merged = [list(ranges[0])]
+        for start, stop in ranges[1:]:
+            if start == merged[-1][1]:
+                merged[-1][1] = stop
+            else:
+                merged.append([start, stop])
+
+        if len(merged) == 1:
+            return self.df.iloc[merged[0][0]:merged[0][1]]
+
+        return pd.concat([self.df.iloc[start:stop] for start, stop in merged])
+
+    def values(self, column: str, **criteria) -> np.ndarray:
+        """
+        Values of `column` in the rows matching all `criteria`.
+        """
+        if column not in self._columns:
+            self._columns[column] = self.df[column].to_numpy()
+
+        ranges = self._lookup(criteria)
+        data = self._columns[column]
+        if len(ranges) == 1:
+            return data[ranges[0][0]:ranges[0][1]]
+
+        return np.concatenate([data[start:stop] for start, stop in ranges]) if ranges else data[0:0]
+
+    def unique(self, field: str, **criteria) -> list:
+        """
+        Sorted values of the key column `field` in the rows matching all `criteria`, in O(number of keys).
+        """
+        position = self.keys.index(field)
+        matching = {self.keys.index(f): value for f, value in criteria.items()}
+
+        return sorted({key[position] for key in self._ranges if all(key[p] == v for p, v in matching.items())})
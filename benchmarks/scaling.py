@@ -0,0 +1,106 @@
+"""
+Strong and weak scaling analysis of the sweeps in `scheduler.scaling_modes` (`benchmark.py --scaling`).
+
+A series starts at N0 with the smallest number of processes p0 of an implementation and contains the sizes
+`scheduler.scaled_size` prescribes for the larger numbers of processes p. With q = p / p0 and the runtimes T0 and T:
+
+- efficiency: T0 / (q T) for strong scaling (ideally the runtime shrinks with the number of processes), T0 / T for
+  weak scaling (ideally the runtime stays constant)
+- Karp-Flatt metric: the experimentally determined serial fraction (1 / E - 1) / (q - 1), which grows with q if the
+  loss of efficiency is due to overhead increasing with the number of processes rather than a serial part
+
+The runtime of every series is fitted with non-negative coefficients to T(q) = a + b / q + c log2(q) + d q (serial
+part, divided work, tree-shaped and linear communication).
+"""
+
+import typing
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import nnls
+
+from scheduler import scaled_size, scaling_modes
+
+SERIES_COLUMNS = ['implementation', 'mode', 'base_N', 'base_numprocs']
+
+
+def runtimes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Runtime per implementation, N and number of processes, the median of the per-repetition medians.
+    """
+    per_repetition = df.groupby(['implementation', 'N', 'numprocs', 'repetition'])['runtime'].median()
+    return per_repetition.groupby(['implementation', 'N', 'numprocs']).median().reset_index()
+
+
+def series(df: pd.DataFrame, modes: typing.Iterable[str] = scaling_modes) -> pd.DataFrame:
+    """
+    Efficiency and Karp-Flatt metric of every point of all scaling series with at least two points in `df`.
+    """
+    points = runtimes(df)
+    rows = []
+    for impl, data in points.groupby('implementation'):
+        lookup = {(n, p): t for n, p, t in zip(data['N'], data['numprocs'], data['runtime'])}
+        base_numprocs = data['numprocs'].min()
+        numprocs = sorted(data['numprocs'].unique())
+
+        for mode in modes:
+            for base_n in sorted(data[data['numprocs'] == base_numprocs]['N']):
+                base_runtime = lookup[(base_n, base_numprocs)]
+                found = []
+                for p in numprocs:
+                    n = scaled_size(base_n, base_numprocs, p, mode)
+                    if (n, p) in lookup:
+                        found.append((n, p, lookup[(n, p)]))
+
+                if len(found) < 2:
+                    continue
+
+                for n, p, t in found:
+                    q = p / base_numprocs
+                    efficiency = base_runtime / t / (q if mode == 'strong' else 1)
+                    rows.append({
+                        'implementation': impl,
+                        'mode': mode,
+                        'base_N': base_n,
+                        'base_numprocs': base_numprocs,
+                        'N': n,
+                        'numprocs': p,
+                        'runtime': t,
+                        'efficiency': efficiency,
+                        'karp_flatt': (1 / efficiency - 1) / (q - 1) if q > 1 else np.nan,
+                    })
+
+    return pd.DataFrame(rows, columns=SERIES_COLUMNS + ['N', 'numprocs', 'runtime', 'efficiency', 'karp_flatt'])
+
+
+def basis(q: np.ndarray) -> np.ndarray:
+    q = np.asarray(q, dtype=float)
+    return np.column_stack([np.ones_like(q), 1 / q, np.log2(q), q])
+
+
+def fit(points: pd.DataFrame) -> np.ndarray:
+    """
+    Coefficients (a, b, c, d) of the runtime model of a single series.
+    """
+    q = points['numprocs'] / points['base_numprocs']
+    coefficients, _ = nnls(basis(q), points['runtime'].to_numpy(dtype=float))
+    return coefficients
+
+
+def predict(coefficients: np.ndarray, q: np.ndarray) -> np.ndarray:
+    return basis(q) @ coefficients
+
+
+def fits(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fitted coefficients of every series (see `series`) with at least three points.
+    """
+    rows = []
+    for key, points in df.groupby(SERIES_COLUMNS):
+        if points.shape[0] < 3:
+            continue
+
+        a, b, c, d = fit(points)
+        rows.append(dict(zip(SERIES_COLUMNS, key), serial=a, parallel=b, log=c, linear=d))
+
+    return pd.DataFrame(rows, columns=SERIES_COLUMNS + ['serial', 'parallel', 'log', 'linear'])
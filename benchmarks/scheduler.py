@@ -1,10 +1,12 @@
 import collections.abc
 import dataclasses
 import enum
+import glob
 import io
 import itertools
 import json
 import logging
+import math
 import os.path
 import pathlib
 import re
@@ -12,7 +14,9 @@ import subprocess
 import sys
 import typing
 
-from config import binary_path
+import archive
+from config import binary_path, kernel_binary_path
+from lsf import LsfReport
 
 logging.basicConfig(stream=sys.stdout, level=logging.INFO)
 logger = logging.getLogger()
@@ -29,15 +33,89 @@ def drop(li: list, keys: typing.List[str]) -> list:
     return li
 
 
+@dataclasses.dataclass(eq=True, frozen=True, order=True)
+class Tunable:
+    """
+    Integer parameter of an implementation, passed to main with `-p name=value`.
+    """
+    name: str
+    minimum: int
+    maximum: int
+    step: int = 1  # valid values are multiples of step
+    log: bool = False  # search on a logarithmic scale
+
+    def to_search(self, value: float) -> float:
+        return math.log2(value) if self.log else float(value)
+
+    def from_search(self, x: float) -> int:
+        """
+        The closest valid value to a point of the search space.
+        """
+        value = 2**x if self.log else x
+        value = int(round(value / self.step)) * self.step
+
+        return min(max(value, self.minimum), self.maximum)
+
+
 @dataclasses.dataclass(eq=True, frozen=True, order=True)
 class Implementation:
     name: str
     allreduce_algorithm: int = None
     allgather_algorithm: int = None
+    segment_size: int = None  # in bytes, coll_tuned_<collective>_algorithm_segmentsize of the forced algorithm
+    rules_file: str = None  # Open MPI dynamic rules file (see coll_rules.py), instead of forcing an algorithm
+    params: typing.Tuple[typing.Tuple[str, int], ...] = ()  # values of tunables, sorted by name
 
     def __str__(self):
+        if self.params:
+            return f'{self.name}[' + ','.join(f'{name}={value}' for name, value in self.params) + ']'
+
         return self.name
 
+    def tunables(self) -> typing.List[Tunable]:
+        for name, tunables in implementation_tunables.items():
+            if self.name == name or (name.endswith('-') and self.name.startswith(name)):
+                return tunables
+
+        return []
+
+    def with_params(self, **params: int) -> 'Implementation':
+        known = [t.name for t in self.tunables()]
+        for name in params:
+            if name not in known:
+                raise Exception(f'{self.name} has no tunable {name}, expected one of {known}')
+
+        merged = dict(self.params)
+        merged.update(params)
+        return dataclasses.replace(self, params=tuple(sorted(merged.items())))
+
+    def collective(self) -> typing.Optional[str]:
+        """
+        The native collective whose algorithm is forced, if any.
+        """
+        if self.allreduce_algorithm is not None:
+            return 'allreduce'
+        if self.allgather_algorithm is not None:
+            return 'allgather'
+
+        return None
+
+    def collective_algorithm(self) -> typing.Optional[int]:
+        return self.allreduce_algorithm if self.allreduce_algorithm is not None else self.allgather_algorithm
+
+    def kernel(self) -> bool:
+        """
+        Whether this is a local outer product kernel run by `kernel_bench` instead of main (see kernels.py).
+        """
+        return self.name.startswith('kernel-')
+
+    def dtypes(self) -> typing.List[str]:
+        """
+        Precisions main can run this implementation with (see `Configuration.dtype`).
+        """
+        base = re.sub(r'-native-.*$', '', self.name)
+        return ['float64', *reduced_precision.get(base, [])]
+
 
 allgather = Implementation(name='allgather')
 allreduce = Implementation(name='allreduce')
@@ -46,6 +124,7 @@ allreduce_ring_pipeline = Implementation(name='allreduce-ring-pipeline')
 allreduce_butterfly = Implementation(name='allreduce-butterfly')
 allreduce_butterfly_segmented = Implementation(name='allreduce-butterfly-segmented')
 allgather_async = Implementation(name='allgather-async')
+allgather_sparse = Implementation(name='allgather-sparse')
 allreduce_rabenseifner = Implementation(name='allreduce-rabenseifner')
 rabenseifner_gather = Implementation(name='rabenseifner-gather')
 grabenseifner_allgather = Implementation(name='g-rabenseifner-allgather')
@@ -58,6 +137,32 @@ grabenseifner_subgroup_8 = Implementation(name='g-rabenseifner-subgroup-8')
 grabenseifner_subgroup_16 = Implementation(name='g-rabenseifner-subgroup-16')
 bruck_async = Implementation(name='bruck-async')
 
+# The blas kernel only exists in builds with BLAS
+kernels = [Implementation(name=f'kernel-{name}') for name in ['naive', 'blocked', 'avx2', 'blas']]
+
+segment_size = Tunable(name='seg_size', minimum=512, maximum=1 << 20, step=8, log=True)
+
+# Tunable parameters by implementation name, or by name prefix for keys ending in `-`. The variants
+# g-rabenseifner-subgroup-<n> fix the number of groups by their name and have no parameters.
+implementation_tunables = {
+    'g-rabenseifner-subgroup': [Tunable(name='n_groups', minimum=1, maximum=48)],
+    'g-rabenseifner-allgather-segmented': [segment_size],
+    'allreduce-butterfly-segmented': [segment_size],
+    'allreduce-ring-pipeline': [segment_size],
+    'kernel-': [Tunable(name='threads', minimum=1, maximum=4)],  # Euler III nodes have 4 cores
+}
+
+# Precision of the communication and accumulation, mixed communicates float32 and accumulates float64
+dtypes = ['float64', 'float32', 'mixed']
+
+# Reduced precisions by implementation name, native variants use the ones of their base implementation. MPI reduces in
+# the communicated datatype, and allgather only communicates the inputs.
+reduced_precision = {
+    'allreduce': ['float32'],
+    'allreduce-ring': ['float32', 'mixed'],
+    'allgather': ['mixed'],
+}
+
 native_allreduce = [
     Implementation(name='allreduce-native-basic_linear', allreduce_algorithm=1),
     Implementation(name='allreduce-native-nonoverlapping', allreduce_algorithm=2),
@@ -76,6 +181,92 @@ native_allgather = [
     Implementation(name='allgather-native-sparbit', allgather_algorithm=6),
 ]
 
+# Native allreduce algorithms that split messages into segments of coll_tuned_allreduce_algorithm_segmentsize
+segmented_allreduce_algorithms = [5]
+
+
+def native_sweep(segment_sizes: typing.List[int]) -> typing.List[Implementation]:
+    """
+    All native algorithms, segmented ones once per segment size (in bytes).
+    """
+    impls = []
+    for impl in native_allreduce:
+        if impl.allreduce_algorithm in segmented_allreduce_algorithms:
+            impls.extend(
+                dataclasses.replace(impl, name=f'{impl.name}-seg{size}', segment_size=size) for size in segment_sizes)
+        else:
+            impls.append(impl)
+
+    return impls + native_allgather
+
+
+def tuned(rules_file: str) -> typing.List[Implementation]:
+    """
+    The allreduce and allgather baselines, using the algorithms of a dynamic rules file instead of the defaults.
+    """
+    return [
+        Implementation(name='allreduce-native-tuned', rules_file=rules_file),
+        Implementation(name='allgather-native-tuned', rules_file=rules_file),
+    ]
+
+
+# How N = M grows with the number of processes p in a scaling sweep, relative to N at the smallest p. Each of the p
+# processes contributes an outer product of N x M to the result of size N x M.
+scaling_modes = {
+    'strong': lambda ratio: 1 / math.sqrt(ratio),  # constant total work p * N * M
+    'work': lambda ratio: 1,  # constant work per process N * M
+    'memory': lambda ratio: math.sqrt(ratio),  # constant share of the result per process N * M / p
+}
+
+
+def scaled_size(base_n: int, base_nodes: int, nodes: int, mode: str) -> int:
+    """
+    N at `nodes` processes of the scaling sweep starting with `base_n` at `base_nodes` processes.
+    """
+    return max(int(round(base_n * scaling_modes[mode](nodes / base_nodes))), 1)
+
+
+def scaling_sweep(base_n: int, nodes: typing.List[int], mode: str) -> typing.List[typing.Tuple[int, int]]:
+    """
+    (N, processes) pairs of a scaling sweep, starting with `base_n` at the smallest number of processes.
+    """
+    base_nodes = min(nodes)
+    return [(scaled_size(base_n, base_nodes, p, mode), p) for p in sorted(nodes)]
+
+
+@dataclasses.dataclass(eq=True, frozen=True, order=True)
+class Placement:
+    """
+    How processes are distributed over nodes and cores. Empty policies use the defaults of mpirun.
+    """
+    ranks_per_node: int = 1
+    map_by: str = ''  # mpirun --map-by, e.g. node, socket or core
+    bind_to: str = ''  # mpirun --bind-to, e.g. none, socket or core
+    rank_by: str = ''  # mpirun --rank-by, e.g. node or slot
+
+    def __str__(self):
+        out = f'{self.ranks_per_node}ppn'
+        for flag, policy in [('map', self.map_by), ('bind', self.bind_to), ('rank', self.rank_by)]:
+            if policy:
+                out += f',{flag}={policy}'
+
+        return out
+
+    def resources(self) -> typing.List[str]:
+        return [f'span[ptile={self.ranks_per_node}]']
+
+    def mpirun_args(self) -> typing.List[str]:
+        args = []
+        for flag, policy in [('--map-by', self.map_by), ('--bind-to', self.bind_to), ('--rank-by', self.rank_by)]:
+            if policy:
+                args.extend([flag, policy])
+
+        return args
+
+
+one_per_node = Placement()
+packed = Placement(ranks_per_node=4, map_by='core', bind_to='core')  # fill Euler III nodes (4 cores)
+
 
 @dataclasses.dataclass(eq=True, frozen=True, order=True)
 class Configuration:
@@ -86,26 +277,76 @@ class Configuration:
     repetitions: int = 1 # used for repetitions within a job (-t ${repetitions})
     job_repetition: int = 0 # used for repeated jobs
     verify: bool = False
+    checksum: bool = False # validate with per-process checksums, cheap enough for production sizes
+    output_format: str = 'json' # one of {json, npy}, npy writes per-rank timings into a separate binary file
+    trace: bool = False # record clock-synchronized per-rank timestamps, see timeline.py
+    placement: Placement = one_per_node
+    density: float = 1.0 # fraction of non-zero entries in the input vectors
+    input_a: str = None # .npy file with the vectors A of all processes (one row per process) instead of random ones
+    input_b: str = None
+    dtype: str = 'float64' # one of `dtypes`, the precision of the communication and accumulation
 
     def __str__(self):
         dim = f'{self.n}' if self.n == self.m else f'{self.n}x{self.m}'
         out = f'{dim}, {self.nodes} nodes, {self.implementation}, {self.repetitions}x'
+        if self.density != 1.0:
+            out += f' [density {self.density}]'
+        if self.input_a is not None or self.input_b is not None:
+            out += ' [input files]'
+        if self.placement != one_per_node:
+            out += f' [{self.placement}]'
+        if self.dtype != 'float64':
+            out += f' [{self.dtype}]'
         if self.verify:
             out += ' [verification]'
+        if self.checksum:
+            out += ' [checksum]'
 
         return out
 
-    def command(self):
+    def command(self, output_file: str = None):
+        binary = kernel_binary_path if self.implementation.kernel() else binary_path
+        return [f'./{binary}', *self.arguments(output_file)]  # Make sure we use a proper path
+
+    def arguments(self, output_file: str = None):
+        """
+        Options of main for this configuration, also used as a line of a batch file (`main --batch`).
+        """
         args = [
-            f'./{binary_path}',  # Make sure we use a proper path
             '-n', str(self.n),
             '-m', str(self.m),
             '-t', str(self.repetitions),
             '-i', self.implementation.name,
             '-r', str(self.job_repetition),
+            '--placement', str(self.placement),
         ]
         if self.verify:
             args.append('-c')
+        if self.checksum:
+            args.append('--checksum')
+
+        if self.density != 1.0:
+            args.extend(['-d', str(self.density)])
+
+        if self.dtype != 'float64':
+            args.extend(['--dtype', self.dtype])
+
+        if self.input_a is not None:
+            args.extend(['--input-a', self.input_a])
+        if self.input_b is not None:
+            args.extend(['--input-b', self.input_b])
+
+        for name, value in self.implementation.params:
+            args.extend(['-p', f'{name}={value}'])
+
+        if self.trace:
+            args.append('--trace')
+
+        if self.output_format != 'json':
+            if output_file is None:
+                raise Exception(f'output format {self.output_format} requires an output file')
+
+            args.extend(['--output-format', self.output_format, '--output-file', output_file])
 
         return args
 
@@ -116,6 +357,16 @@ class Configuration:
         return int((self.n * self.m / (2**15)) * self.nodes)
 
     def runnable(self):
+        if self.dtype not in self.implementation.dtypes():
+            return False, f'{self.implementation} does not support {self.dtype}'
+
+        if self.implementation.kernel() and (self.checksum or self.density != 1.0 or self.input_a is not None
+                                             or self.input_b is not None or self.trace or self.output_format != 'json'):
+            return False, 'kernel_bench only supports random dense inputs, -c and json output'
+
+        if self.placement.ranks_per_node > 4:
+            return False, f'Euler III nodes only have 4 cores ({self.placement.ranks_per_node} ranks per node requested)'
+
         # if self.nodes > 48:
         #     return False, f'euler supports only up to 48 nodes'
 
@@ -133,6 +384,12 @@ class Runner:
     def run_grouped(self, keys, configs: typing.List[Configuration]):
         raise NotImplementedError
 
+    def submitted(self, keys) -> bool:
+        """
+        Whether the group with `keys` was submitted before.
+        """
+        return False
+
     def collect(self, repetition: int):
         raise NotImplementedError
 
@@ -141,9 +398,13 @@ class Runner:
 
 
 class Scheduler:
-    def __init__(self, runner: Runner):
+    def __init__(self, runner: Runner, order: typing.Callable[[dict], list] = None, resume: bool = False):
         self.configs = []
         self.runner = runner
+        # Keys of the groups to submit in submission order, given the configurations of every group (see ordering.py),
+        # by default all groups sorted by their key
+        self.order = order
+        self.resume = resume  # skip groups the runner submitted before
 
     def register(self, config):
         if isinstance(config, collections.abc.Iterable):
@@ -153,16 +414,26 @@ class Scheduler:
 
     @staticmethod
     def grouping_key(c: Configuration):
-        return c.nodes, c.job_repetition
+        return c.nodes, c.placement, c.job_repetition
 
-    def run_grouped(self):
+    def groups(self) -> typing.Dict[tuple, typing.List[Configuration]]:
         grouped = itertools.groupby(
             sorted(self.valid_configurations(), key=self.grouping_key),
             self.grouping_key,
         )
 
-        for nodes, configs in grouped:
-            self.runner.run_grouped(nodes, list(configs))
+        groups = {keys: list(configs) for keys, configs in grouped}
+        if self.resume:
+            groups = {keys: configs for keys, configs in groups.items() if not self.runner.submitted(keys)}
+
+        return groups
+
+    def run_grouped(self):
+        groups = self.groups()
+        order = sorted(groups) if self.order is None else self.order(groups)
+
+        for keys in order:
+            self.runner.run_grouped(keys, groups[keys])
 
     def configurations(self):
         configs = list(set(self.configs))
@@ -204,18 +475,55 @@ class Status(enum.Enum):
 
 
 class EulerRunner(Runner):
-    def __init__(self, results_dir, submit: bool = True, raw_dir="raw"):
+    def __init__(self, results_dir, submit: bool = True, raw_dir="raw", wait: bool = False, batch: bool = False):
         self.raw_dir = f"{results_dir}/{raw_dir}"
         self.parsed_dir = f"{results_dir}/parsed"
         self.submit = submit
+        self.wait = wait  # block until a submitted job finished (bsub -K)
+        self.batch = batch  # run the configurations of a group in a single MPI session (main --batch)
 
         for path in [self.raw_dir, self.parsed_dir]:
             pathlib.Path(path).mkdir(parents=True, exist_ok=True)
 
+        # Outputs of finished jobs may have been packed (see archive.py)
+        self.archive = None
+        if os.path.isfile(archive.archive_path(self.raw_dir)):
+            self.archive = archive.Archive(archive.archive_path(self.raw_dir))
+
+    def raw_exists(self, name: str) -> bool:
+        return os.path.isfile(f'{self.raw_dir}/{name}') or (self.archive is not None and name in self.archive)
+
+    def open_raw(self, name: str) -> typing.TextIO:
+        """
+        Opens a file of the raw directory, from the archive if it is not on disk.
+        """
+        if self.archive is not None and not os.path.isfile(f'{self.raw_dir}/{name}'):
+            return self.archive.open(name)
+
+        return open(f'{self.raw_dir}/{name}')
+
+    def submitted(self, keys) -> bool:
+        return self.raw_exists(f'batch-{self.job_name(keys)}')
+
+    @staticmethod
+    def job_name(keys) -> str:
+        return '-'.join(map(str, keys))
+
+    def job_repetitions(self) -> typing.List[int]:
+        """
+        Job repetitions with a list of submitted jobs (`jobs-<repetition>`).
+        """
+        names = [os.path.basename(path) for path in glob.glob(f'{self.raw_dir}/jobs-*')]
+        if self.archive is not None:
+            names.extend(self.archive.names())
+
+        return sorted({int(name[len('jobs-'):]) for name in names if re.fullmatch(r'jobs-\d+', name)})
+
     def actually_run(self,
                      nodes: int,
                      job_repetition: int,
                      mpi_args: typing.List[str],
+                     placement: Placement = one_per_node,
                      time: int = None,
                      stdin=None,
                      job_name: str = None,
@@ -225,7 +533,7 @@ class EulerRunner(Runner):
             '-o', f'{self.raw_dir}/%J',
             '-e', f'{self.raw_dir}/%J.err',
             '-n', str(nodes),
-            '-R', 'span[ptile=1]',  # use 1 core per node
+            *[arg for resource in placement.resources() for arg in ['-R', resource]],
             '-R', 'select[model==XeonE3_1585Lv5]',  # use Euler III nodes (4 cores)
             '-R', 'select[!ib]',  # disable infiniband (not available on Euler III)
             '-r',  # make jobs retryable
@@ -233,6 +541,9 @@ class EulerRunner(Runner):
         if job_name is not None:
             args.extend(['-J', job_name])
 
+        if self.wait:
+            args.append('-K')
+
         if time is not None and time > 4 * 60:
             args.extend(['-W', str(time)])
 
@@ -256,12 +567,31 @@ class EulerRunner(Runner):
             f.write(job_id + "\n")
 
         logger.info(f'submitted job {job_id}')
+        return job_id
+
+    def output_file(self, config: Configuration, index: int) -> typing.Optional[str]:
+        """
+        Binary output file of a configuration, written next to the job report. `$LSB_JOBID` is expanded in the batch
+        job, `index` distinguishes multiple configurations within the same job.
+        """
+        if config.output_format == 'json':
+            return None
+
+        return f'{self.raw_dir}/$LSB_JOBID-{index}.{config.output_format}'
 
     @staticmethod
-    def prepare_cmd(config: Configuration):
+    def prepare_cmd(config: Configuration, output_file: str = None):
+        return EulerRunner.mpirun_args(config) + config.command(output_file)
+
+    @staticmethod
+    def mpirun_args(config: Configuration) -> typing.List[str]:
+        """
+        The mpirun command of a configuration without main, configurations with the same command can share a session.
+        """
         mpi_args = [
             'mpirun',
             '-np', str(config.nodes),
+            *config.placement.mpirun_args(),
         ]
         if config.implementation.allreduce_algorithm is not None:
             mpi_args.extend([
@@ -279,7 +609,23 @@ class EulerRunner(Runner):
                 and config.implementation.allgather_algorithm is not None:
             raise Exception("can only specify one of {allreduce_algorithm, allgather_algorithm), not both")
 
-        mpi_args.extend(config.command())
+        if config.implementation.segment_size is not None:
+            collective = config.implementation.collective()
+            if collective is None:
+                raise Exception("segment_size requires one of {allreduce_algorithm, allgather_algorithm}")
+
+            mpi_args.extend([
+                '--mca', f'coll_tuned_{collective}_algorithm_segmentsize', f'{config.implementation.segment_size}'
+            ])
+
+        if config.implementation.rules_file is not None:
+            if config.implementation.collective() is not None:
+                raise Exception("rules_file cannot be combined with a forced algorithm")
+
+            mpi_args.extend([
+                '--mca', 'coll_tuned_use_dynamic_rules', '1',
+                '--mca', 'coll_tuned_dynamic_rules_filename', config.implementation.rules_file
+            ])
 
         return mpi_args
 
@@ -289,16 +635,18 @@ class EulerRunner(Runner):
             logger.warning(f'skipping configuration: {reason}')
             return
 
-        mpi_args = self.prepare_cmd(config)
+        mpi_args = self.prepare_cmd(config, self.output_file(config, 0))
 
-        self.actually_run(config.nodes, config.job_repetition, [' '.join(mpi_args)])
+        self.actually_run(config.nodes, config.job_repetition, [' '.join(mpi_args)], placement=config.placement)
 
     def run_grouped(self, keys, configs: typing.List[Configuration]):
         nodes = configs[0].nodes
         repetition = configs[0].job_repetition
+        placement = configs[0].placement
 
         commands = []
-        for config in configs:
+        sessions: typing.Dict[str, typing.List[str]] = {}
+        for index, config in enumerate(configs):
             runnable, reason = config.runnable()
             if not runnable:
                 logger.warning(f'skipping configuration: {reason}')
@@ -313,12 +661,24 @@ class EulerRunner(Runner):
                     f'different job repetition in same grouping, expected {repetition}, received {config.job_repetition}'
                 )
 
-            mpi_args = self.prepare_cmd(config)
-            commands.append(' '.join(mpi_args))
+            if config.placement != placement:
+                raise Exception(
+                    f'different placement in same grouping, expected {placement}, received {config.placement}')
+
+            if self.batch and not config.implementation.kernel():
+                mpirun = ' '.join(self.mpirun_args(config))
+                sessions.setdefault(mpirun, []).append(' '.join(config.arguments(self.output_file(config, index))))
+            else:
+                mpi_args = self.prepare_cmd(config, self.output_file(config, index))
+                commands.append(' '.join(mpi_args))
+
+        # Configurations are passed on stdin of root, the shell of the job still expands $LSB_JOBID in output files
+        for mpirun, lines in sessions.items():
+            commands.append('\n'.join([f'{mpirun} ./{binary_path} --batch - <<EOF', *lines, 'EOF']))
 
         time = 2 * len(configs) # roughly 1.25 minutes / run on average
 
-        job_name = '-'.join(map(str, keys))
+        job_name = self.job_name(keys)
         batch_filename = f'./{self.raw_dir}/batch-{job_name}'
         with open(batch_filename, "w+") as f:
             for line in commands:
@@ -327,13 +687,13 @@ class EulerRunner(Runner):
             f.seek(0)
 
             if self.submit:
-                self.actually_run(nodes, repetition, [], time, stdin=f, job_name=job_name)
+                return self.actually_run(nodes, repetition, [], placement, time, stdin=f, job_name=job_name)
 
     def verify(self, repetition: int) -> bool:
         completed = True
-        with open(f"{self.raw_dir}/jobs-{repetition}") as f:
+        with self.open_raw(f"jobs-{repetition}") as f:
             for job_id in f.read().splitlines():
-                if os.path.isfile(f'{self.raw_dir}/{job_id}'):
+                if self.raw_exists(job_id):
                     continue
 
                 proc = subprocess.run(
@@ -354,68 +714,53 @@ class EulerRunner(Runner):
 
         return completed
 
-    @staticmethod
-    def find_key(job_id, data: list, key: str) -> str:
-        line = [x for x in data if key in x]
-        if len(line) != 1:
-            raise Exception(f'[{job_id}] expected length 1 for key {key}, got {len(line)}')
-
-        return line[0].split(":")[1].split()
-
-    @staticmethod
-    def collect_lines(data: typing.List[str]) -> typing.List[typing.Tuple[int, str]]:
-        start, end = (0, 0)
-        for idx, line in enumerate(data):
-            if line == "The output (if any) follows:\n":
-                start = idx
-            if line == "PS:\n":
-                end = idx
-
-        # account for padding
-        start += 2
-        end -= 2
-
-        line_nrs = range(start + 1, end + 1) # line numbers are usually 1-indexed
-        return list(zip(line_nrs, data[start:end]))
+    def job_records(self, repetition: int, skip: typing.Container[str] = ()
+                    ) -> typing.Iterator[typing.Tuple[str, typing.Optional[typing.List[dict]]]]:
+        """
+        Parsed records of every job of the job repetition `repetition` except for the jobs in `skip`, None for jobs
+        without an output file (yet). The repetition of the records is the one passed to main, see `collect`.
+        """
+        with self.open_raw(f"jobs-{repetition}") as f:
+            job_ids = f.read().splitlines()
+
+        for job_id in job_ids:
+            if job_id in skip:
+                continue
 
-    def find_mem_max(self, job_id: str, data: list) -> float:
-        max_mem = self.find_key(job_id, data, "Max Memory")[0]
-        if max_mem == '-':
-            return 0
+            input_path = f'{self.raw_dir}/{job_id}'
+            records = []
+            try:
+                with self.open_raw(job_id) as j:
+                    report = LsfReport(job_id, j)
+                    job_data = report.job_data()
+
+                    found_lines = False
+                    for line_nr, line in report.lines():
+                        found_lines = True
+                        try:
+                            parsed = json.loads(line)
+                            parsed['job'] = job_data
+                            if 'runtimes_file' in parsed:
+                                # Binary output lies next to the job report it was collected from
+                                runtimes_file = os.path.basename(parsed['runtimes_file'])
+                                parsed['runtimes_file'] = f'{self.raw_dir}/{runtimes_file}'
+                            records.append(parsed)
+                        except Exception as e:
+                            logging.error(f'[{job_id}] failed to parse line {line_nr}, "{report.subject}": {e}')
+                            break
+
+                    if not found_lines:
+                        logging.error(f'[{job_id}] no usable data lines found, {report.subject}')
+            except FileNotFoundError:
+                logging.error(f'[{job_id} no job output file found (yet): {input_path}')
+                yield job_id, None
+                continue
 
-        return float(max_mem)
+            yield job_id, records
 
     def collect(self, repetition: int, repetition_offset: int = 0):
         with open(f"{self.parsed_dir}/{repetition+repetition_offset}.json", "a") as o: # append mode
-            with open(f"{self.raw_dir}/jobs-{repetition}") as f:
-                for job_id in f.read().splitlines():
-                    input_path = f'{self.raw_dir}/{job_id}'
-                    try:
-                        with open(input_path) as j:
-                            data = j.readlines()
-
-                            data_lines = self.collect_lines(data)
-                            job_data = {
-                                'id': job_id,
-                                'turnaround_time': int(self.find_key(job_id, data, "Turnaround time")[0]),
-                                'runtime': int(self.find_key(job_id, data, "Run time")[0]),
-                                'mem_requested': float(self.find_key(job_id, data, "Total Requested Memory")[0]),
-                                'mem_max': self.find_mem_max(job_id, data),
-                            }
-
-                            subject = data[1].strip()
-                            if len(data_lines) == 0:
-                                logging.error(f'[{job_id}] no usable data lines found, {subject}')
-
-                            for line_nr, line in data_lines:
-                                try:
-                                    parsed = json.loads(line)
-                                    parsed['job'] = job_data
-                                    parsed[
-                                        'repetition'] = repetition + repetition_offset # Overwrites repetition with information from file-name
-                                    o.write(json.dumps(parsed, separators=(',', ':')) + '\n')
-                                except Exception as e:
-                                    logging.error(f'[{job_id}] failed to parse line {line_nr}, "{subject}": {e}')
-                                    break
-                    except FileNotFoundError:
-                        logging.error(f'[{job_id} no job output file found (yet): {input_path}')
+            for _, records in self.job_records(repetition):
+                for parsed in records or []:
+                    parsed['repetition'] = repetition + repetition_offset # Overwrites repetition with information from file-name
+                    o.write(json.dumps(parsed, separators=(',', ':')) + '\n')
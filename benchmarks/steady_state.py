@@ -0,0 +1,108 @@
+"""
+Detects the warmup (transient prefix) of every run, instead of assuming only the first iteration is one.
+
+The end of the warmup is the change point chosen by the MSER rule (marginal standard error rule, White 1997): of all
+truncation points `d` in the first half of the series, it picks the one minimizing the standard error of the mean of the
+remaining iterations,
+
+    sum((x[d:] - mean(x[d:]))^2) / (n - d)^2
+
+Cutting a transient prefix lowers the variance of the rest by more than it loses in sample size, while cutting steady
+iterations does not. The first iteration is always treated as warmup.
+"""
+
+import typing
+
+import numpy as np
+import pandas as pd
+
+# Columns identifying a run (a single invocation of `main` or a configuration of `main --batch`, see
+# `timeline.run_key`), `run_columns` adds the parameters of the implementation
+RUN_COLUMNS = ['job.id', 'implementation', 'N', 'M', 'numprocs', 'repetition', 'placement', 'density', 'dtype',
+               'timestamp']
+
+# Columns identifying a configuration across runs, `config_columns` adds the parameters of the implementation
+CONFIG_COLUMNS = ['implementation', 'N', 'numprocs', 'placement', 'density', 'dtype']
+
+MIN_WARMUP = 1
+
+
+def param_columns(df: pd.DataFrame) -> typing.List[str]:
+    return sorted(c for c in df.columns if c.startswith('params.'))
+
+
+def run_columns(df: pd.DataFrame) -> typing.List[str]:
+    return [c for c in RUN_COLUMNS if c in df.columns] + param_columns(df)
+
+
+def config_columns(df: pd.DataFrame) -> typing.List[str]:
+    return [c for c in CONFIG_COLUMNS if c in df.columns] + param_columns(df)
+
+
+def mser(values: typing.Sequence[float]) -> int:
+    """
+    Number of iterations to truncate from the start of the series according to the MSER rule.
+    """
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    if n < 4:
+        return 0
+
+    # Sums over the suffixes x[d:] for all d
+    suffix_sum = np.cumsum(x[::-1])[::-1]
+    suffix_sq_sum = np.cumsum((x * x)[::-1])[::-1]
+    remaining = np.arange(n, 0, -1)
+
+    squared_errors = suffix_sq_sum - suffix_sum**2 / remaining
+    statistic = squared_errors / remaining**2
+
+    # Truncating more than half of the series is not trusted, the series is too short to tell
+    return int(np.argmin(statistic[:n // 2 + 1]))
+
+
+def warmup_length(values: typing.Sequence[float], min_warmup: int = MIN_WARMUP) -> int:
+    return min(max(mser(values), min_warmup), len(values))
+
+
+def annotate(df: pd.DataFrame, column: str = 'runtime') -> pd.DataFrame:
+    """
+    Adds the warmup length of its run (`warmup`) and whether it is part of the steady state (`steady`) to every
+    iteration.
+    """
+    keys = run_columns(df)
+    df = df.sort_values(keys + ['iteration'])
+
+    # Missing values (e.g. the job of local runs) must not drop the run from the grouping
+    groups = df.groupby(keys, sort=False, dropna=False)[column]
+    df['warmup'] = groups.transform(lambda values: warmup_length(values.to_numpy())).astype(int)
+    df['steady'] = groups.cumcount() >= df['warmup']
+
+    return df
+
+
+def trim(df: pd.DataFrame, column: str = 'runtime') -> pd.DataFrame:
+    """
+    Only the steady iterations of every run.
+    """
+    df = annotate(df, column)
+    return df[df['steady']]
+
+
+def summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Distribution of the warmup length per configuration, `df` must be annotated. `steady_min` is the smallest number
+    of iterations left in a run after trimming.
+    """
+    keys = run_columns(df)
+    runs = df.groupby(keys, dropna=False).agg(warmup=('warmup', 'first'), iterations=('iteration', 'size'))
+    runs = runs.reset_index()
+    runs['steady'] = runs['iterations'] - runs['warmup']
+
+    return runs.groupby(config_columns(df), dropna=False).agg(
+        runs=('warmup', 'size'),
+        iterations=('iterations', 'max'),
+        warmup_median=('warmup', 'median'),
+        warmup_p90=('warmup', lambda w: np.percentile(w, 90)),
+        warmup_max=('warmup', 'max'),
+        steady_min=('steady', 'min'),
+    ).reset_index()
@@ -0,0 +1,5 @@
+import pathlib
+import sys
+
+# The benchmark scripts are not a package, make their modules importable for the tests
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
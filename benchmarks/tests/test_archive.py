@@ -0,0 +1,85 @@
+import os
+import pathlib
+import shutil
+
+import pytest
+
+import archive
+from scheduler import EulerRunner
+
+FIXTURES = pathlib.Path(__file__).parent / 'fixtures' / 'lsf'
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    raw = tmp_path / 'raw'
+    raw.mkdir()
+    (raw / 'jobs-0').write_text('196612254\n196612391\n1\n')  # job 1 is still running
+    (raw / 'batch-test').write_text('mpirun ...\n')
+    for job_id in ['196612254', '196612391']:
+        shutil.copy(FIXTURES / job_id, raw / job_id)
+        (raw / f'{job_id}.err').write_text(f'stderr of {job_id}\n')
+    (raw / '1.err').write_text('running\n')
+    return raw
+
+
+def test_pack(raw_dir):
+    added, _ = archive.pack(str(raw_dir))
+
+    # Job lists, batch files, reports and errors of finished jobs only
+    assert added == 6
+    with archive.Archive(archive.archive_path(str(raw_dir))) as packed:
+        assert '1.err' not in packed
+        for name in packed.names():
+            assert packed.read(name) == (raw_dir / name).read_bytes()
+
+    # Nothing changed
+    assert archive.pack(str(raw_dir))[0] == 0
+
+
+def test_pack_incremental(raw_dir, monkeypatch):
+    # A chunk per member
+    monkeypatch.setattr(archive, 'CHUNK_SIZE', 1)
+    archive.pack(str(raw_dir), remove=True)
+    assert not (raw_dir / '196612254').exists()
+    assert (raw_dir / 'jobs-0').exists()
+
+    # Job 1 finished, another job was submitted
+    (raw_dir / '1').write_bytes((FIXTURES / '196612254').read_bytes())
+    (raw_dir / 'jobs-0').write_text('196612254\n196612391\n1\n2\n')
+    assert archive.pack(str(raw_dir))[0] == 3  # jobs-0, 1 and 1.err
+
+    with archive.Archive(archive.archive_path(str(raw_dir))) as packed:
+        assert len(packed.chunks) == 9
+        assert packed.read('jobs-0') == b'196612254\n196612391\n1\n2\n'
+        assert packed.read('196612254') == (FIXTURES / '196612254').read_bytes()
+
+
+def test_interrupted(raw_dir):
+    archive.pack(str(raw_dir))
+    path = archive.archive_path(str(raw_dir))
+    size = os.path.getsize(path)
+
+    # An interrupted run appended a partial chunk
+    with open(path, 'ab') as f:
+        f.write(b'partial chunk')
+
+    with archive.Archive(path) as packed:
+        assert packed.end == size
+        assert '196612254' in packed
+
+    (raw_dir / '1').write_bytes(b'report')
+    assert archive.pack(str(raw_dir))[0] == 2
+    with archive.Archive(path) as packed:
+        assert packed.read('1') == b'report'
+
+
+def test_collect_from_archive(raw_dir, tmp_path):
+    records = list(EulerRunner(results_dir=str(tmp_path)).job_records(0))
+
+    archive.pack(str(raw_dir), remove=True)
+    runner = EulerRunner(results_dir=str(tmp_path))
+
+    assert runner.job_repetitions() == [0]
+    assert runner.raw_exists('196612254')
+    assert list(runner.job_records(0)) == records
@@ -0,0 +1,54 @@
+import io
+
+import coll_rules
+from coll_rules import Rule
+
+
+def record(name: str, n: int, numprocs: int, runtime: int, iteration: int = 1) -> dict:
+    return {'name': name, 'N': n, 'M': n, 'numprocs': numprocs, 'runtime': runtime, 'iteration': iteration}
+
+
+def test_native_implementation():
+    impl = coll_rules.native_implementation('allreduce-native-segmented_ring-seg8192')
+
+    assert impl.allreduce_algorithm == 5
+    assert impl.segment_size == 8192
+    assert coll_rules.native_implementation('allgather-native-bruck').allgather_algorithm == 2
+    assert coll_rules.native_implementation('allreduce') is None
+
+
+def test_fastest():
+    records = [
+        record('allreduce-native-ring', 16, 8, 10),
+        record('allreduce-native-ring', 16, 8, 1, iteration=0),  # warmup is ignored
+        record('allreduce-native-recursive_doubling', 16, 8, 5),
+        record('allreduce-native-ring', 32, 8, 10),
+        record('allreduce-native-segmented_ring-seg8192', 32, 8, 8),
+        record('allreduce-native-ring', 64, 8, 10),
+        record('allreduce-native-segmented_ring-seg8192', 64, 8, 9),
+        record('allgather-native-bruck', 16, 4, 3),
+        record('allreduce', 16, 8, 1),  # not a native algorithm
+    ]
+
+    rules = coll_rules.fastest(records)
+
+    # Consecutive message sizes with the same algorithm are merged
+    assert rules['allreduce'] == {8: [Rule(0, 3, 0), Rule(32 * 32 * 8, 5, 8192)]}
+    assert rules['allgather'] == {4: [Rule(0, 2, 0)]}
+
+
+def test_write_rules():
+    out = io.StringIO()
+    coll_rules.write_rules({'allreduce': {8: [Rule(0, 3), Rule(8192, 5, 8192)]}, 'allgather': {4: [Rule(0, 2)]}}, out)
+
+    values = [line.split('#')[0].strip() for line in out.getvalue().splitlines()]
+    assert values == ['2', '0', '1', '4', '1', '0 2 0 0', '2', '1', '8', '2', '0 3 0 0', '8192 5 0 8192']
+
+
+def test_message_size_precision():
+    double = record('allreduce-native-ring', 100, 4, 10)
+    single = dict(double, dtype='float32')
+
+    assert coll_rules.message_size('allreduce', double) == 100 * 100 * 8
+    assert coll_rules.message_size('allreduce', single) == 100 * 100 * 4
+    assert coll_rules.message_size('allgather', single) == 4 * 100 * 4
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import comm_profile
+import metrics
+
+
+def record(implementation: str, n: int, m: int, p: int, **payloads) -> dict:
+    out = {'implementation': implementation, 'N': n, 'M': m, 'numprocs': p, 'density': 1.0}
+    for call, payload in payloads.items():
+        out[f'comm.{call}.bytes'] = payload
+        out[f'comm.{call}.calls'] = [1] * p
+    return out
+
+
+def test_rank_bytes():
+    columns = ['comm.MPI_Allgather.bytes', 'comm.MPI_Allgather@2.bytes', 'comm.MPI_Recv.bytes']
+    row = pd.Series({
+        'numprocs': 4,
+        'comm.MPI_Allgather.bytes': [10, 10, 10, 10],
+        'comm.MPI_Allgather@2.bytes': '[100, 100, 100, 100]',  # serialized in the aggregated csv
+        'comm.MPI_Recv.bytes': [5, 5, 5, 5],
+    })
+
+    # Forwarded to 3 others in the world and 1 other in the subcommunicator, receives do not send
+    assert comm_profile.rank_bytes(row, columns).tolist() == [130, 130, 130, 130]
+
+    unprofiled = pd.Series({'numprocs': 4, 'comm.MPI_Allgather.bytes': np.nan})
+    assert comm_profile.rank_bytes(unprofiled, ['comm.MPI_Allgather.bytes']) is None
+
+
+def test_validate():
+    n, m, p = 100, 200, 4
+    df = pd.DataFrame([
+        # Contributions of a and b to the allgathers
+        record('allgather', n, m, p, MPI_Allgather=[(n + m) * 8] * p),
+        # Sends twice what the model assumes
+        record('allreduce', n, m, p, MPI_Allreduce=[2 * n * m * 8] * p),
+        record('unknown', n, m, p, MPI_Send=[8, 0, 0, 0]),
+        # Not profiled
+        {'implementation': 'allgather', 'N': 2 * n, 'M': m, 'numprocs': p, 'density': 1.0},
+    ])
+
+    validated = comm_profile.validate(df).set_index('implementation')
+
+    assert validated.shape[0] == 3
+    assert validated.loc['allgather', 'expected'] == metrics.communicated_bytes('allgather', n, m, p)
+    assert validated.loc['allgather', 'deviation'] == pytest.approx(0)
+    assert not validated.loc['allgather', 'flagged']
+
+    assert validated.loc['allreduce', 'deviation'] == pytest.approx(1)
+    assert validated.loc['allreduce', 'flagged']
+
+    assert validated.loc['unknown', 'measured_max'] == 8
+    assert validated.loc['unknown', 'measured_mean'] == 2
+    assert np.isnan(validated.loc['unknown', 'expected'])
+    assert not validated.loc['unknown', 'flagged']
+
+
+def test_validate_params():
+    n, m, p = 100, 200, 4
+    expected = {
+        g: metrics.communicated_bytes('g-rabenseifner-subgroup', n, m, p, params={'n_groups': g})
+        for g in [1, 2]
+    }
+    df = pd.DataFrame([
+        dict(record('g-rabenseifner-subgroup', n, m, p, MPI_Send=[expected[g]] * p), **{'params.n_groups': g})
+        for g in [1, 2]
+    ])
+
+    validated = comm_profile.validate(df).set_index('params.n_groups')
+
+    assert validated.shape[0] == 2
+    assert expected[1] != expected[2]
+    assert validated['expected'].to_dict() == expected
+    assert not validated['flagged'].any()
@@ -0,0 +1,66 @@
+import json
+import re
+
+import pandas as pd
+
+import html_report
+
+
+def results():
+    return pd.DataFrame([{
+        'implementation': impl,
+        'N': n,
+        'numprocs': 4,
+        'repetition': repetition,
+        'iteration': iteration,
+        'runtime': factor * n + repetition,
+    } for impl, factor in [('allgather', 1), ('allreduce', 2)] for n in [10, 20] for repetition in range(5)
+        for iteration in range(3) if (impl, n) != ('allreduce', 20)])
+
+
+def test_cube():
+    cube = html_report.cube(results(), percentiles=[0, 50, 100])
+
+    assert cube['dims'] == {'implementation': ['allgather', 'allreduce'], 'N': [10, 20], 'numprocs': [4],
+                            'percentile': [0, 50, 100]}
+    # (implementation, N, numprocs, percentile) in row-major order
+    assert cube['runtime'][:6] == [10, 12, 14, 20, 22, 24]
+    assert cube['runtime'][6:9] == [20, 22, 24]
+    assert cube['runtime'][9:] == [None] * 3
+    assert cube['runs'] == [5, 5, 5, None]
+
+
+def test_render():
+    html = html_report.render(html_report.cube(results()), title='</script>')
+
+    embedded = re.search(r'<script id="data" type="application/json">(.*?)</script>', html).group(1)
+    assert json.loads(embedded)['dims']['N'] == [10, 20]
+
+
+def test_precisions_and_params():
+    df = pd.concat([
+        results().assign(dtype='float64'),
+        results().assign(dtype='float32', runtime=lambda d: d['runtime'] / 2),
+        results().assign(dtype='float64', implementation='kernel-avx2', **{'params.threads': 2}),
+    ], ignore_index=True)
+
+    cube = html_report.cube(df, percentiles=[50])
+
+    assert cube['dims']['implementation'] == ['allgather', 'allgather [float32]', 'allreduce', 'allreduce [float32]',
+                                              'kernel-avx2[threads=2]']
+    # (implementation, N) with a single number of processes and percentile
+    assert cube['runtime'][:4] == [12, 22, 6, 11]
+
+
+def test_placements_and_densities():
+    df = pd.concat([
+        results().assign(placement='1ppn', density=1.0),
+        results().assign(placement='4ppn', density=1.0),
+        results().assign(placement='1ppn', density=0.05, dtype='float32'),
+    ], ignore_index=True)
+
+    labels = html_report.implementation_labels(df)
+
+    assert sorted(labels.unique()) == ['allgather', 'allgather [4ppn]', 'allgather [float32, density=0.05]',
+                                       'allreduce', 'allreduce [4ppn]', 'allreduce [float32, density=0.05]']
+    assert len(html_report.cube(df)['dims']['implementation']) == 6
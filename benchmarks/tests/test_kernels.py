@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import kernels
+import metrics
+
+
+def results():
+    records = [{
+        'implementation': f'kernel-{name}',
+        'N': n,
+        'M': n,
+        'numprocs': 1,
+        'ranks_per_node': 1,
+        'params.threads': threads,
+        'repetition': repetition,
+        'runtime': n * n / rate / 1e9 * 2,
+        'runtime_compute': n * n / rate / 1e9 * 2,
+    } for name, rate in [('naive', 1), ('avx2', 2)] for n in [1000, 2000] for threads in [1, 2]
+        for repetition in range(3)]
+    records.append({
+        'implementation': 'allreduce',
+        'N': 1000,
+        'M': 1000,
+        'numprocs': 4,
+        'ranks_per_node': 1,
+        'params.threads': np.nan,
+        'repetition': 0,
+        'runtime': 0.004,
+        'runtime_compute': 0.002,
+    })
+    return metrics.add_metrics(pd.DataFrame(records))
+
+
+def test_rates():
+    df = results()
+    rates = kernels.rates(df)
+
+    assert kernels.is_kernel(df).sum() == 24
+    assert sorted(rates['implementation'].unique()) == ['kernel-avx2', 'kernel-naive']
+    assert rates.shape[0] == 8
+    assert np.allclose(rates[rates['implementation'] == 'kernel-avx2']['gflops'], 2)
+
+    assert kernels.best_rate(rates, np.array([1000, 1500]), np.array([1000, 1500])) == pytest.approx([2, 2])
+
+
+def test_compute_bound():
+    df = results()
+    bound = kernels.compute_bound(df[~kernels.is_kernel(df)], kernels.rates(df))
+
+    # 1e6 updates take 1 ms with the fastest kernel, a quarter of the runtime and half of the compute time
+    assert bound['kernel_fraction'].iloc[0] == pytest.approx(0.25)
+    assert bound['kernel_efficiency'].iloc[0] == pytest.approx(0.5)
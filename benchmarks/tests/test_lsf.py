@@ -0,0 +1,69 @@
+import io
+import json
+import pathlib
+
+import pytest
+
+from lsf import LsfReport, ReportError
+
+FIXTURES = pathlib.Path(__file__).parent / 'fixtures' / 'lsf'
+
+
+def open_report(job_id: str):
+    return open(FIXTURES / job_id)
+
+
+def test_header():
+    with open_report('196612254') as f:
+        report = LsfReport('196612254', f)
+
+        assert report.subject == 'Subject: Job 196612254: <8-3> in cluster <euler> Done'
+        assert report.job_data() == {
+            'id': '196612254',
+            'turnaround_time': 58,
+            'runtime': 8,
+            'mem_requested': 8192.0,
+            'mem_max': 1722.0,
+        }
+
+
+def test_lines():
+    with open_report('196612254') as f:
+        lines = list(LsfReport('196612254', f).lines())
+
+    assert [nr for nr, _ in lines] == [44, 45, 46, 47]
+
+    records = [json.loads(line) for _, line in lines]
+    assert [(r['name'], r['iteration']) for r in records] == [
+        ('allgather', 0),
+        ('allgather', 1),
+        ('allreduce', 0),
+        ('allreduce', 1),
+    ]
+
+
+def test_failed_job():
+    with open_report('196612391') as f:
+        report = LsfReport('196612391', f)
+        assert report.job_data()['mem_max'] == 0
+
+        lines = [line for _, line in report.lines()]
+
+    assert lines[0].startswith('-----')
+    assert lines[-1].startswith('-----')
+    with pytest.raises(ValueError):
+        json.loads(lines[0])
+
+
+def test_missing_output():
+    report = LsfReport('1', io.StringIO('Sender: LSF System\nSubject: Job 1\n\n    Run time : 1 sec.\n'))
+
+    assert list(report.lines()) == []
+    assert report.field('Run time') == '1'
+    with pytest.raises(ReportError):
+        report.job_data()
+
+
+def test_duplicate_key():
+    with pytest.raises(ReportError):
+        LsfReport('1', io.StringIO('    Run time : 1 sec.\n    Run time : 2 sec.\n'))
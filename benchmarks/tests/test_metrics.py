@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics
+from config import LINK_BANDWIDTH
+
+
+def test_communicated_bytes():
+    n, m, p = 100, 200, 4
+
+    assert metrics.communicated_bytes('allreduce', n, m, p) == 2 * 3 / 4 * n * m * 8
+    assert metrics.communicated_bytes('allreduce-butterfly', n, m, p) == 2 * n * m * 8
+    assert metrics.communicated_bytes('allgather', n, m, p) == 3 * (n + m) * 8
+    assert metrics.communicated_bytes('g-rabenseifner-allgather', n, m, p) == (3 * (n + m) + 3 / 4 * n * m) * 8
+    assert metrics.communicated_bytes('allgather', n, m, 1) == 0
+    assert metrics.communicated_bytes('unknown', n, m, p) is None
+
+    # Two subgroups of two processes only exchange result rows with one other process
+    assert metrics.communicated_bytes('g-rabenseifner-subgroup-2', n, m, p) == (3 * (n + m) + n * m / 2) * 8
+    assert metrics.communicated_bytes('g-rabenseifner-subgroup', n, m, p, params={'n_groups': 2}) == \
+        metrics.communicated_bytes('g-rabenseifner-subgroup-2', n, m, p)
+
+    assert metrics.communicated_bytes('allgather-sparse', n, m, p, density=0.1) == pytest.approx(3 * (n + m) * 1.2)
+    assert metrics.communicated_bytes('allgather-sparse', n, m, p, density=1) == 3 * (n + m) * 8
+
+    # Reduced precisions only halve the communicated values
+    assert metrics.communicated_bytes('allreduce-ring', n, m, p, value_size=metrics.VALUE_SIZES['float32']) == \
+        metrics.communicated_bytes('allreduce-ring', n, m, p) / 2
+
+
+def test_local_updates():
+    assert metrics.local_updates('allreduce', 10, 20, 4) == 200
+    assert metrics.local_updates('allgather', 10, 20, 4) == 800
+    assert metrics.local_updates('g-rabenseifner-allgather', 10, 20, 4) == 200
+    assert metrics.local_updates('g-rabenseifner-subgroup-2', 10, 20, 4) == 400
+
+
+def test_add_metrics():
+    df = pd.DataFrame([{
+        'implementation': 'allgather',
+        'N': 1000,
+        'M': 1000,
+        'numprocs': 5,
+        'runtime': 0.01,
+        'runtime_compute': 0.002,
+    }, {
+        'implementation': 'unknown',
+        'N': 1000,
+        'M': 1000,
+        'numprocs': 5,
+        'runtime': 0.01,
+        'runtime_compute': 0.002,
+    }], index=[0, 0])
+
+    df = metrics.add_metrics(df)
+    first = df.iloc[0]
+    assert first['bytes'] == 4 * 2000 * 8
+    assert first['network_gbps'] == pytest.approx(64000 / 0.008 / 1e9)
+    assert first['gflops'] == pytest.approx(2 * 5e6 / 0.002 / 1e9)
+    assert first['link_efficiency'] == pytest.approx(64000 / 0.008 / LINK_BANDWIDTH)
+    assert np.isnan(df.iloc[1]['network_gbps'])
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+import ordering
+from scheduler import Configuration, Runner, Scheduler, allgather, allreduce, one_per_node
+
+
+def records(name, nodes, runtimes, n=100):
+    # One job per entry of runtimes, with two iterations each
+    return [{
+        'name': name,
+        'N': n,
+        'M': n,
+        'numprocs': nodes,
+        'repetition': job,
+        'iteration': i,
+        'runtime': runtime,
+    } for job, runtime in enumerate(runtimes) for i in range(2)]
+
+
+def campaign(nodes=(4, 8), job_repetitions=3):
+    return [
+        Configuration(n=100, m=100, nodes=n, implementation=implementation, job_repetition=job_repetition)
+        for n in nodes
+        for job_repetition in range(job_repetitions)
+        for implementation in [allreduce, allgather]
+    ]
+
+
+class Recorder(Runner):
+    def __init__(self, submitted=()):
+        self.keys = []
+        self.before = set(submitted)
+
+    def run_grouped(self, keys, configs):
+        self.keys.append(keys)
+
+    def submitted(self, keys) -> bool:
+        return keys in self.before
+
+
+def test_interleaved():
+    assert ordering.interleaved([1, 2, 3, 4, 5]) == [1, 5, 2, 4, 3]
+    assert ordering.interleaved([1, 2]) == [1, 2]
+    assert ordering.interleaved([]) == []
+
+
+def test_estimates():
+    estimates = ordering.estimates(records('allreduce', 4, [1.0, 2.0, 3.0]) + records('allgather', 4, [5.0]))
+
+    key = ordering.config_key('allreduce', {}, 100, 100, 4, 1.0, 'float64', '1ppn')
+    assert estimates[key] == ordering.Estimate(mean=2.0, variance=1.0, jobs=3)
+    assert key == ordering.configuration_key(Configuration(n=100, m=100, nodes=4, implementation=allreduce))
+
+    # A single job spreads like the others (relative standard deviation 0.5)
+    single = estimates[ordering.config_key('allgather', {}, 100, 100, 4, 1.0, 'float64', '1ppn')]
+    assert single.jobs == 1
+    assert single.variance == pytest.approx((0.5 * 5.0)**2)
+
+
+def test_misranking():
+    a = ordering.Estimate(mean=1.0, variance=0.01, jobs=1)
+    b = ordering.Estimate(mean=1.1, variance=0.01, jobs=1)
+
+    assert ordering.misranking(a, 1, a, 1) == 0.5
+    assert ordering.misranking(a, 1, b, 1) < 0.5
+    assert ordering.misranking(a, 10, b, 10) < ordering.misranking(a, 1, b, 1)
+    assert ordering.misranking(a._replace(variance=0), 1, b._replace(variance=0), 1) == 0.0
+
+
+def test_round_robin_without_prior():
+    scheduler = Scheduler(Recorder(), order=ordering.uncertainty_order({}))
+    scheduler.register(campaign(nodes=(2, 4, 8)))
+    scheduler.run_grouped()
+
+    nodes = [keys[0] for keys in scheduler.runner.keys]
+    assert nodes == [2, 8, 4] * 3
+    assert [keys[2] for keys in scheduler.runner.keys] == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+
+
+def test_uncertain_rankings_first(tmp_path):
+    # Far apart at 4 nodes, close at 8 nodes
+    prior = records('allreduce', 4, [1.0, 1.1]) + records('allgather', 4, [3.0, 3.1]) + \
+        records('allreduce', 8, [1.0, 1.1]) + records('allgather', 8, [1.05, 1.15])
+    with open(tmp_path / '0.json', 'w') as f:
+        f.writelines(json.dumps(r) + '\n' for r in prior)
+
+    scheduler = Scheduler(Recorder(), order=ordering.uncertainty_order(ordering.load_prior(f'{tmp_path}/*.json')))
+    scheduler.register(campaign())
+    scheduler.run_grouped()
+
+    # The pilot round first, then all jobs of the uncertain ranking
+    assert scheduler.runner.keys == [
+        (4, one_per_node, 0),
+        (8, one_per_node, 0),
+        (8, one_per_node, 1),
+        (8, one_per_node, 2),
+        (4, one_per_node, 1),
+        (4, one_per_node, 2),
+    ]
+
+
+def test_pilot_and_resume():
+    scheduler = Scheduler(Recorder(), order=ordering.pilot_order)
+    scheduler.register(campaign())
+    scheduler.run_grouped()
+    pilot = scheduler.runner.keys
+    assert pilot == [(4, one_per_node, 0), (8, one_per_node, 0)]
+
+    scheduler = Scheduler(Recorder(submitted=pilot), resume=True)
+    scheduler.register(campaign())
+    scheduler.run_grouped()
+    assert len(scheduler.runner.keys) == 4
+    assert not set(pilot) & set(scheduler.runner.keys)
@@ -0,0 +1,98 @@
+import json
+import pathlib
+import shutil
+
+import registry
+
+FIXTURES = pathlib.Path(__file__).parent / 'fixtures' / 'lsf'
+REPORT = '196612254'
+
+
+def campaign(results_dir: pathlib.Path, name: str, jobs: dict):
+    """
+    Raw results of a campaign, `jobs` maps job repetitions to their job ids. Every job reports the output of the
+    fixture 196612254.
+    """
+    raw_dir = results_dir / name
+    raw_dir.mkdir(parents=True)
+    for repetition, job_ids in jobs.items():
+        (raw_dir / f'jobs-{repetition}').write_text(''.join(f'{job_id}\n' for job_id in job_ids))
+        for job_id in job_ids:
+            shutil.copy(FIXTURES / REPORT, raw_dir / job_id)
+
+
+def parsed(results_dir: pathlib.Path) -> list:
+    records = []
+    for file in sorted((results_dir / 'parsed').glob('*.json')):
+        records.extend(json.loads(line) for line in file.read_text().splitlines())
+    return records
+
+
+def test_unique_repetitions(tmp_path):
+    # Both campaigns use job repetition 3
+    campaign(tmp_path, 'mixed/a', {3: ['1']})
+    campaign(tmp_path, 'mixed/b', {3: ['2']})
+
+    results = registry.Registry(str(tmp_path))
+    assert results.collect('mixed/a')[0] > 0
+    assert results.collect('mixed/b')[0] > 0
+    results.save()
+
+    records = parsed(tmp_path)
+    assert {(r['campaign'], r['repetition']) for r in records} == {('mixed/a', 0), ('mixed/b', 1)}
+
+
+def test_incremental(tmp_path):
+    campaign(tmp_path, 'raw', {0: ['1', '2']})
+    # The second job has not finished yet
+    (tmp_path / 'raw' / '2').unlink()
+
+    results = registry.Registry(str(tmp_path))
+    first, _ = results.collect('raw')
+    results.save()
+    (tmp_path / 'parsed' / 'aggregated.csv').write_text('cached')
+
+    shutil.copy(FIXTURES / REPORT, tmp_path / 'raw' / '2')
+    results = registry.Registry(str(tmp_path))
+    second, duplicates = results.collect('raw')
+    results.save()
+
+    assert first > 0 and second > 0
+    assert duplicates == 0
+    assert len(parsed(tmp_path)) == first + second
+    # New records invalidate the cache of plot.load_results
+    assert not (tmp_path / 'parsed' / 'aggregated.csv').exists()
+
+    # Nothing left to collect
+    assert registry.Registry(str(tmp_path)).collect('raw') == (0, 0)
+
+
+def test_duplicates(tmp_path):
+    campaign(tmp_path, 'raw', {0: ['1']})
+    # A retried job reports its output twice
+    lines = (tmp_path / 'raw' / '1').read_text().splitlines(keepends=True)
+    output = [i for i, line in enumerate(lines) if line.startswith('{')]
+    retried = lines[:output[-1] + 1] + lines[output[0]:output[-1] + 1] + lines[output[-1] + 1:]
+    (tmp_path / 'raw' / '1').write_text(''.join(retried))
+    # The same job copied into a second campaign
+    campaign(tmp_path, 'copy', {0: ['1']})
+
+    results = registry.Registry(str(tmp_path))
+    new, duplicates = results.collect('raw')
+    copied, copied_duplicates = results.collect('copy')
+
+    assert new == len(output)
+    assert duplicates == len(output)
+    assert copied == 0
+    assert copied_duplicates == len(output)
+
+
+def test_rebuild(tmp_path):
+    campaign(tmp_path, 'raw', {0: ['1']})
+    results = registry.Registry(str(tmp_path))
+    new, _ = results.collect('raw')
+    results.save()
+
+    results = registry.Registry(str(tmp_path), rebuild=True)
+    assert results.collect('raw') == (new, 0)
+    assert len(parsed(tmp_path)) == new
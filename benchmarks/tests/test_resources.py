@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import resources
+
+
+def record(**usage):
+    return {f'rusage.{key}': value for key, value in usage.items()}
+
+
+def runtimes(record: pd.Series) -> np.ndarray:
+    return np.asarray(record['runtimes'])
+
+
+def test_add_resource_usage():
+    df = pd.DataFrame([
+        {
+            'runtimes': [100, 400],
+            **record(max_rss=[1000, 3000], cpu_user=[90, 200], cpu_system=[10, 100], ctx_voluntary=[0, 1],
+                     ctx_involuntary=[5, 7]),
+        },
+        # Lists are serialized in the aggregated csv
+        {
+            'runtimes': [50, 10],
+            **record(max_rss='[2000, 2000]', cpu_user='[50, 10]', cpu_system='[0, 0]', ctx_voluntary='[0, 0]',
+                     ctx_involuntary='[0, 3]'),
+        },
+    ], index=[0, 0])
+
+    df = resources.add_resource_usage(df, runtimes)
+
+    assert df['rss_max'].tolist() == pytest.approx([3000 * 1024 / 1e9, 2000 * 1024 / 1e9])
+    assert df['rss_mean'].iloc[0] == pytest.approx(2000 * 1024 / 1e9)
+    # Slowest rank
+    assert df['cpu_fraction'].tolist() == pytest.approx([0.75, 1.0])
+    assert df['ctx_involuntary'].tolist() == [7, 0]
+    assert df['ctx_voluntary'].tolist() == [1, 0]
+
+
+def test_add_resource_usage_missing():
+    df = pd.DataFrame([{'runtimes': [1, 2]}])
+    assert resources.add_resource_usage(df, runtimes)['rss_max'].isna().all()
+
+    # Records of older runs in the same frame have no resource usage
+    df = pd.DataFrame([
+        {'runtimes': [1], **record(max_rss=[1], cpu_user=[1], cpu_system=[0], ctx_voluntary=[0], ctx_involuntary=[0])},
+        {'runtimes': [1], **{f'rusage.{key}': np.nan for key in resources.RESOURCE_KEYS}},
+    ])
+    df = resources.add_resource_usage(df, runtimes)
+    assert df['cpu_fraction'].iloc[0] == 1.0
+    assert np.isnan(df['cpu_fraction'].iloc[1])
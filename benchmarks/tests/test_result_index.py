@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from result_index import ResultIndex
+
+
+def results():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame([{
+        'implementation': impl,
+        'N': n,
+        'numprocs': numprocs,
+        'repetition': repetition,
+        'runtime': rng.random(),
+    } for repetition in range(3) for n in [300, 100, 200] for numprocs in [8, 4] for impl in ['b', 'a']])
+
+
+def test_matches_masks():
+    df = results()
+    index = ResultIndex(df)
+
+    for impl in ['a', 'b']:
+        for numprocs in [4, 8]:
+            mask = (df['implementation'] == impl) & (df['numprocs'] == numprocs)
+            expected = df[mask].sort_values(['N', 'repetition'])['runtime'].to_numpy()
+
+            assert np.array_equal(index.values('runtime', implementation=impl, numprocs=numprocs), expected)
+            assert index.frame(implementation=impl, numprocs=numprocs).shape[0] == mask.sum()
+
+            for n in [100, 200, 300]:
+                values = index.values('runtime', implementation=impl, numprocs=numprocs, N=n)
+                assert sorted(values) == sorted(df[mask & (df['N'] == n)]['runtime'])
+
+
+def test_contiguous_prefix():
+    index = ResultIndex(results())
+
+    frame = index.frame(implementation='a', N=200)
+    assert frame.shape[0] == 6
+    # A prefix of the key columns is a single range, which is sliced without copying
+    assert frame.index.tolist() == list(range(frame.index[0], frame.index[0] + 6))
+
+
+def test_unique():
+    index = ResultIndex(results())
+
+    assert index.unique('implementation') == ['a', 'b']
+    assert index.unique('N', implementation='b', numprocs=4) == [100, 200, 300]
+    assert index.values('runtime', implementation='c').size == 0
+    assert index.frame(implementation='c').shape[0] == 0
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import scaling
+from scheduler import scaled_size, scaling_sweep
+
+
+def test_scaling_sweep():
+    assert scaling_sweep(4000, [16, 4], 'strong') == [(4000, 4), (2000, 16)]
+    assert scaling_sweep(4000, [4, 16], 'work') == [(4000, 4), (4000, 16)]
+    assert scaling_sweep(4000, [4, 16], 'memory') == [(4000, 4), (8000, 16)]
+    assert scaled_size(1000, 2, 4, 'memory') == 1414
+
+
+def results(mode, model):
+    return pd.DataFrame([{
+        'implementation': 'allreduce',
+        'N': n,
+        'M': n,
+        'numprocs': p,
+        'repetition': repetition,
+        'runtime': model(p / 2),
+    } for n, p in scaling_sweep(4000, [2, 4, 8, 16], mode) for repetition in range(3)])
+
+
+def test_strong_scaling():
+    # Amdahl's law with a serial fraction of 10%
+    data = scaling.series(results('strong', lambda q: 0.1 + 0.9 / q), modes=['strong'])
+
+    assert data['numprocs'].tolist() == [2, 4, 8, 16]
+    assert data['efficiency'].iloc[0] == 1
+    assert np.all(np.diff(data['efficiency']) < 0)
+    assert np.allclose(data['karp_flatt'].iloc[1:], 0.1)
+
+
+def test_weak_scaling():
+    data = scaling.series(results('memory', lambda q: 1 + 0.5 * np.log2(q)), modes=['memory', 'strong'])
+
+    # The sizes of the strong scaling series were not measured
+    assert data['mode'].unique().tolist() == ['memory']
+    assert data['efficiency'].tolist() == pytest.approx([1, 1 / 1.5, 1 / 2, 1 / 2.5])
+
+
+def test_fit():
+    data = scaling.series(results('strong', lambda q: 0.2 + 1 / q + 0.1 * np.log2(q)), modes=['strong'])
+
+    assert scaling.fit(data) == pytest.approx([0.2, 1, 0.1, 0], abs=1e-6)
+    [row] = scaling.fits(data).to_dict('records')
+    assert row['serial'] == pytest.approx(0.2)
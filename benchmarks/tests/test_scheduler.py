@@ -0,0 +1,108 @@
+import dataclasses
+
+from scheduler import Configuration, EulerRunner, Implementation, Placement, Scheduler, allgather, allreduce, kernels, \
+    one_per_node
+
+
+def test_placement():
+    placement = Placement(ranks_per_node=4, map_by='core', bind_to='core')
+
+    assert str(one_per_node) == '1ppn'
+    assert str(placement) == '4ppn,map=core,bind=core'
+    assert placement.resources() == ['span[ptile=4]']
+    assert one_per_node.mpirun_args() == []
+    assert placement.mpirun_args() == ['--map-by', 'core', '--bind-to', 'core']
+
+
+def test_placement_command():
+    placement = Placement(ranks_per_node=2, rank_by='node')
+    config = Configuration(n=10, m=10, nodes=4, implementation=allreduce, placement=placement)
+
+    cmd = EulerRunner.prepare_cmd(config)
+    assert cmd[:5] == ['mpirun', '-np', '4', '--rank-by', 'node']
+    assert cmd[-2:] == ['--placement', '2ppn,rank=node']
+
+    assert not Configuration(n=10, m=10, nodes=8, implementation=allreduce,
+                             placement=Placement(ranks_per_node=8)).runnable()[0]
+
+
+def test_grouping_by_placement():
+    configs = [
+        Configuration(n=10, m=10, nodes=4, implementation=allreduce, placement=placement)
+        for placement in [one_per_node, Placement(ranks_per_node=2)]
+    ]
+
+    assert len({Scheduler.grouping_key(c) for c in configs}) == 2
+
+
+def test_checksum_command():
+    config = Configuration(n=10, m=10, nodes=4, implementation=allreduce, checksum=True)
+
+    assert '--checksum' in config.command()
+    assert '-c' not in config.command()
+    assert 'checksum' in str(config)
+
+
+def test_density_command():
+    dense = Configuration(n=10, m=10, nodes=4, implementation=allreduce)
+    sparse = dataclasses.replace(dense, density=0.05)
+
+    assert '-d' not in dense.command()
+    assert sparse.command()[-2:] == ['-d', '0.05']
+    assert dense != sparse
+
+
+def test_input_files_command():
+    config = Configuration(n=10, m=20, nodes=4, implementation=allreduce, input_a='a.npy')
+
+    assert config.command()[-2:] == ['--input-a', 'a.npy']
+    assert '--input-b' not in config.command()
+    assert 'input files' in str(config)
+
+
+def test_dtype_command():
+    config = Configuration(n=10, m=10, nodes=4, implementation=allreduce, dtype='float32')
+
+    assert config.command()[-2:] == ['--dtype', 'float32']
+    assert '--dtype' not in dataclasses.replace(config, dtype='float64').command()
+    assert 'float32' in str(config)
+
+    assert config.runnable()[0]
+    assert not dataclasses.replace(config, implementation=allgather).runnable()[0]
+    assert Implementation(name='allreduce-native-ring').dtypes() == ['float64', 'float32']
+
+
+def test_kernel_command():
+    kernel = kernels[0].with_params(threads=2)
+    config = Configuration(n=10, m=10, nodes=1, implementation=kernel)
+
+    assert config.command()[0].endswith('kernel_bench')
+    assert config.command()[-2:] == ['-p', 'threads=2']
+    assert config.runnable()[0]
+    assert not dataclasses.replace(config, checksum=True).runnable()[0]
+
+
+def test_batch_grouped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # batch files are written relative to the working directory
+    native = dataclasses.replace(allreduce, name='allreduce-native-ring', allreduce_algorithm=4)
+    configs = [
+        Configuration(n=n, m=n, nodes=4, implementation=impl, output_format='npy')
+        for n in [10, 20]
+        for impl in [allreduce, native]
+    ]
+    runner = EulerRunner(results_dir='results', submit=False, batch=True)
+    runner.run_grouped((4, one_per_node, 0), configs)
+
+    with open(f'{runner.raw_dir}/batch-4-1ppn-0') as f:
+        script = f.read().splitlines()
+
+    # One session per set of mpirun options, the configurations are read from stdin
+    sessions = [line for line in script if line.startswith('mpirun')]
+    assert len(sessions) == 2
+    assert all(line.endswith('main --batch - <<EOF') for line in sessions)
+    assert 'coll_tuned_allreduce_algorithm' in sessions[1]
+    assert script.count('EOF') == 2
+
+    lines = [line for line in script if line.startswith('-n')]
+    assert lines[0].split() == configs[0].arguments(runner.output_file(configs[0], 0))
+    assert '$LSB_JOBID-1.npy' in lines[2]
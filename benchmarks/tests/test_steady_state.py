@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+import steady_state
+
+
+def test_mser_transient():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([[50, 40, 30, 20], 10 + rng.normal(0, 0.5, 40)])
+
+    assert steady_state.mser(values) == 4
+
+
+def test_mser_steady():
+    rng = np.random.default_rng(0)
+
+    assert steady_state.mser(10 + rng.normal(0, 0.5, 40)) <= 2
+    assert steady_state.mser([10, 10, 10, 10, 10]) == 0
+    assert steady_state.warmup_length([10, 10, 10, 10, 10]) == 1
+    assert steady_state.warmup_length([10]) == 1
+
+
+def test_mser_at_most_half():
+    # A series which keeps decreasing has no steady state, half of it is cut at most
+    assert steady_state.mser(list(range(20, 0, -1))) <= 10
+
+
+def run(job_id, repetition, runtimes):
+    return [{
+        'job.id': job_id,
+        'implementation': 'allreduce',
+        'N': 100,
+        'M': 100,
+        'numprocs': 4,
+        'repetition': repetition,
+        'iteration': i,
+        'runtime': r,
+    } for i, r in enumerate(runtimes)]
+
+
+def test_trim():
+    df = pd.DataFrame(run(None, 0, [9, 5, 1, 1, 1, 1, 1, 1]) + run(None, 1, [9, 1, 1, 1, 1, 1, 1, 1]))
+
+    df = steady_state.annotate(df)
+    assert df.groupby('repetition')['warmup'].first().tolist() == [2, 1]
+    assert df['steady'].sum() == 6 + 7
+    assert (df[df['steady']]['runtime'] == 1).all()
+
+    summary = steady_state.summary(df)
+    assert summary.shape[0] == 1
+    assert summary.iloc[0]['runs'] == 2
+    assert summary.iloc[0]['warmup_max'] == 2
+    assert summary.iloc[0]['steady_min'] == 6
+
+
+def test_precisions_are_separate_runs():
+    # Two precisions of a batch session starting within the same second
+    df = pd.DataFrame([dict(r, dtype=dtype, timestamp='2021-01-01T00:00:00Z')
+                       for dtype, runtimes in [('float64', [9, 5, 1, 1, 1, 1, 1, 1]), ('float32', [1] * 8)]
+                       for r in run(1, 0, runtimes)])
+
+    df = steady_state.annotate(df)
+    assert df.groupby('dtype')['warmup'].first().to_dict() == {'float32': 1, 'float64': 2}
+
+    summary = steady_state.summary(df)
+    assert sorted(summary['dtype']) == ['float32', 'float64']
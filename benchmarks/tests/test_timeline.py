@@ -0,0 +1,59 @@
+import timeline
+
+
+def record(iteration: int, offset: int = 0) -> dict:
+    return {
+        'name': 'allreduce',
+        'N': 100,
+        'M': 100,
+        'numprocs': 2,
+        'repetition': 0,
+        'iteration': iteration,
+        'timestamp': '2022-01-01T00:00:00Z+0100',
+        'runtimes': [30, 25],
+        'phases': {'outer-product': [10, 5], 'allreduce': [20, 20]},
+        'trace': {
+            'barrier_enter': [offset + 100, offset + 110],
+            'barrier_exit': [offset + 120, offset + 125],
+            'end': [offset + 150, offset + 150],
+            'clock_offset': [0, -7],
+            'phase_entries': {
+                'outer-product': [[[offset + 120, 4], [offset + 144, 6]], [[offset + 125, 5]]],
+                'allreduce': [[[offset + 124, 20]], None],
+            },
+        },
+    }
+
+
+def slices(events, category):
+    return [e for e in events if e['ph'] == 'X' and e['cat'] == category]
+
+
+def test_trace_events():
+    events = timeline.trace_events([record(1, offset=100), record(0)])
+
+    threads = [e['args']['name'] for e in events if e['name'] == 'thread_name']
+    assert threads == ['rank 0', 'rank 1']
+
+    barriers = slices(events, 'barrier')
+    assert [(e['tid'], e['ts'], e['dur']) for e in barriers] == [(0, 0, 20), (1, 10, 15), (0, 100, 20), (1, 110, 15)]
+
+    iterations = slices(events, 'iteration')
+    assert [e['name'] for e in iterations] == ['iteration 0', 'iteration 0', 'iteration 1', 'iteration 1']
+    assert iterations[1]['args'] == {'runtime': 25, 'clock_offset': -7}
+
+    # One slice per entry of a phase, rank 1 never entered the allreduce phase
+    phases = slices(events, 'phase')
+    assert [(e['name'], e['tid'], e['ts'], e['dur']) for e in phases[:4]] == [
+        ('outer-product', 0, 20, 4),
+        ('outer-product', 0, 44, 6),
+        ('allreduce', 0, 24, 20),
+        ('outer-product', 1, 25, 5),
+    ]
+
+
+def test_without_trace():
+    untraced = record(0)
+    del untraced['trace']
+
+    assert timeline.trace_events([untraced]) == []
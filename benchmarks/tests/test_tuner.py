@@ -0,0 +1,126 @@
+import json
+import pathlib
+import shutil
+import subprocess
+
+import pytest
+
+import benchmark
+import registry
+import tuner
+from scheduler import Configuration, EulerRunner, Implementation, Tunable, grabenseifner_subgroup, \
+    grabenseifner_subgroup_4, segment_size
+
+butterfly = Implementation(name='allreduce-butterfly-segmented')
+
+
+def evaluator(optimum: int):
+    """
+    Unimodal runtime with its minimum at `optimum`, counting the evaluated values.
+    """
+    evaluated = []
+
+    def evaluate(values, repetitions):
+        evaluated.extend(values)
+        return [abs(value - optimum) + 100 for value in values]
+
+    return evaluate, evaluated
+
+
+@pytest.mark.parametrize('optimum', [1, 17, 48])
+def test_golden_section(optimum):
+    tunable = Tunable(name='n_groups', minimum=1, maximum=48)
+    evaluate, evaluated = evaluator(optimum)
+
+    best, costs = tuner.golden_section(evaluate, tunable, repetitions=1)
+
+    assert best == optimum
+    assert len(evaluated) == len(set(evaluated)) == len(costs)
+    assert len(evaluated) < 16
+
+
+def test_golden_section_log():
+    evaluate, evaluated = evaluator(8192)
+
+    best, _ = tuner.golden_section(evaluate, segment_size, repetitions=1)
+
+    assert best % segment_size.step == 0
+    assert abs(best - 8192) / 8192 < 0.1
+    assert len(evaluated) < 30
+
+
+def test_successive_halving():
+    tunable = Tunable(name='n_groups', minimum=1, maximum=48)
+    repetitions = []
+
+    def evaluate(values, reps):
+        repetitions.append(reps)
+        return [abs(value - 30) for value in values]
+
+    best, costs = tuner.successive_halving(evaluate, tunable, repetitions=1, num_candidates=16)
+
+    assert abs(best - 30) <= 2
+    assert repetitions == [1, 2, 4, 8]
+    assert len(costs) == 16
+
+
+def test_tunable():
+    assert segment_size.from_search(segment_size.to_search(4096)) == 4096
+    assert segment_size.from_search(100) == segment_size.maximum
+    assert Tunable(name='x', minimum=1, maximum=10).from_search(0.2) == 1
+
+
+def test_params_command():
+    impl = butterfly.with_params(seg_size=8192)
+    config = Configuration(n=10, m=10, nodes=4, implementation=impl)
+
+    assert str(impl) == 'allreduce-butterfly-segmented[seg_size=8192]'
+    assert config.command()[-2:] == ['-p', 'seg_size=8192']
+
+    with pytest.raises(Exception):
+        butterfly.with_params(n_groups=4)
+
+    # The variants fixing the number of groups by their name have no parameter
+    assert grabenseifner_subgroup.with_params(n_groups=2).params == (('n_groups', 2), )
+    with pytest.raises(Exception):
+        grabenseifner_subgroup_4.with_params(n_groups=2)
+
+
+def test_record(tmp_path):
+    path = str(tmp_path / 'tuned.json')
+    result = {'implementation': butterfly.name, 'param': 'seg_size', 'N': 100, 'numprocs': 4, 'value': 4096}
+
+    tuner.record(path, result)
+    tuner.record(path, dict(result, numprocs=8, value=1024))
+    tuner.record(path, dict(result, value=16384))
+
+    with open(path) as f:
+        assert [r['value'] for r in json.load(f)] == [16384, 1024]
+
+    assert tuner.optimum(path, butterfly, 100, 4).params == (('seg_size', 16384), )
+    assert tuner.optimum(path, butterfly, 200, 4).params == ()
+
+
+def test_optimal(tmp_path):
+    path = str(tmp_path / 'tuned.json')
+    tuner.record(path, {'implementation': butterfly.name, 'param': 'seg_size', 'N': 100, 'numprocs': 4, 'value': 4096})
+
+    configs = [Configuration(n=n, m=n, nodes=4, implementation=butterfly) for n in [100, 200]]
+    configs = benchmark.optimal(configs, path)
+
+    assert [c.implementation.params for c in configs] == [(('seg_size', 4096), ), ()]
+    assert benchmark.optimal(configs, str(tmp_path / 'missing.json')) == configs
+
+
+def test_tuning_jobs_apart_from_campaign(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    submitted = subprocess.CompletedProcess([], 0, stdout=b'Job <196612254> is submitted to queue.')
+    monkeypatch.setattr(subprocess, 'run', lambda *args, **kwargs: submitted)
+
+    runner = EulerRunner(results_dir='results', raw_dir=tuner.RAW_DIR, wait=True)
+    configs = tuner.configurations(butterfly, segment_size, [4096, 8192], 100, 4, repetitions=3)
+    job_id = runner.run_grouped(('tune', butterfly.name, 100, 4), configs)
+    shutil.copy(pathlib.Path(__file__).parent / 'fixtures' / 'lsf' / job_id, f'{runner.raw_dir}/{job_id}')
+
+    assert registry.Registry('results').collect('raw') == (0, 0)
+    assert registry.Registry('results').collect(tuner.RAW_DIR)[0] > 0
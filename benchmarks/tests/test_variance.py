@@ -0,0 +1,99 @@
+import dataclasses
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmark
+import variance
+from scheduler import Configuration, allreduce, packed
+
+
+def nested(sigma_job, sigma_iteration, jobs=20, iterations=30, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame([{
+        'implementation': 'allreduce',
+        'N': 100,
+        'M': 100,
+        'numprocs': 4,
+        'repetition': job,
+        'iteration': i,
+        'runtime': 1.0 + offset + rng.normal(0, sigma_iteration),
+    } for job, offset in enumerate(rng.normal(0, sigma_job, jobs)) for i in range(iterations)])
+
+
+def test_components():
+    c = variance.components(nested(0.05, 0.01))
+
+    assert c.jobs == 20
+    assert c.iterations == 30
+    assert c.mean == pytest.approx(1.0, abs=0.05)
+    assert c.sigma_job == pytest.approx(0.05, rel=0.4)
+    assert c.sigma_iteration == pytest.approx(0.01, rel=0.1)
+
+    assert variance.components(nested(0, 0.01)).sigma_job < 0.005
+
+
+def test_recommend():
+    # Noise between jobs can only be averaged out with more jobs
+    c = variance.Components(mean=1.0, sigma_job=0.02, sigma_iteration=0.001, jobs=10, iterations=10)
+    repetitions, job_repetitions = variance.recommend(c, target=0.02)
+    assert repetitions == 1
+    assert variance.ci_width(c, repetitions, job_repetitions) <= 0.02
+    assert variance.ci_width(c, repetitions, job_repetitions - 1) > 0.02
+
+    # Noise between iterations is cheaper to average out with more iterations
+    c = variance.Components(mean=1.0, sigma_job=0.0, sigma_iteration=0.05, jobs=10, iterations=10)
+    repetitions, job_repetitions = variance.recommend(c, target=0.02)
+    assert repetitions > job_repetitions
+    assert variance.ci_width(c, repetitions, job_repetitions) <= 0.02
+
+
+def test_analyze():
+    [r] = variance.analyze(nested(0.05, 0.01), target=0.05)
+
+    assert (r['implementation'], r['N'], r['numprocs']) == ('allreduce', 100, 4)
+    assert r['repetitions'] > r['warmup']
+    assert r['job_repetitions'] > 2
+    assert r['ci_width'] <= 0.05
+
+
+def test_analyze_precisions():
+    df = pd.concat([nested(0.05, 0.01).assign(dtype='float64'), nested(0.05, 0.01, seed=1).assign(dtype='float32')])
+
+    recommendations = variance.analyze(df, target=0.05)
+    assert sorted(r['dtype'] for r in recommendations) == ['float32', 'float64']
+    assert all(r['params'] == {} for r in recommendations)
+
+
+def test_analyze_placements_and_densities():
+    df = pd.concat([
+        nested(0.05, 0.01).assign(placement='1ppn', density=1.0),
+        nested(0.05, 0.01, seed=1).assign(placement='4ppn', density=1.0),
+        nested(0.05, 0.01, seed=2).assign(placement='1ppn', density=0.05),
+    ])
+
+    recommendations = variance.analyze(df, target=0.05)
+    assert sorted((r['placement'], r['density']) for r in recommendations) == [('1ppn', 0.05), ('1ppn', 1.0),
+                                                                               ('4ppn', 1.0)]
+
+
+def test_recommended(tmp_path):
+    path = tmp_path / 'repetitions.json'
+    path.write_text(json.dumps([{'implementation': 'allreduce', 'N': 10, 'numprocs': 4, 'repetitions': 5,
+                                 'job_repetitions': 3}]))
+
+    configs = [
+        Configuration(n=n, m=n, nodes=4, implementation=allreduce, repetitions=25, job_repetition=j)
+        for n in [10, 20] for j in range(17)
+    ]
+    result = benchmark.recommended(configs, str(path))
+
+    assert sorted((c.n, c.job_repetition, c.repetitions) for c in result if c.n == 10) == [(10, j, 5) for j in range(3)]
+    assert len([c for c in result if c.n == 20]) == 17
+
+    # Recommendations of other precisions, placements or densities do not apply
+    for changes in [{'dtype': 'float32'}, {'placement': packed}, {'density': 0.05}]:
+        other = [dataclasses.replace(c, **changes) for c in configs]
+        assert benchmark.recommended(other, str(path)) == other
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import pathlib
+import shutil
+
+import watch
+from scheduler import Configuration, EulerRunner, allgather, allreduce, grabenseifner_subgroup
+
+FIXTURES = pathlib.Path(__file__).parent / 'fixtures' / 'lsf'
+
+
+def test_batch_configurations():
+    config = Configuration(n=1000, m=2000, nodes=8, implementation=grabenseifner_subgroup.with_params(n_groups=2),
+                           repetitions=5, density=0.1)
+    single = ' '.join(EulerRunner.prepare_cmd(config))
+    batch = '\n'.join([
+        'mpirun -np 4 ./code/build_output/main --batch - <<EOF',
+        ' '.join(Configuration(n=10, m=10, nodes=4, implementation=allreduce, dtype='float32').arguments()),
+        'EOF',
+    ])
+
+    configs = watch.batch_configurations(f'{single}\n{batch}\n')
+    assert configs == [
+        ('g-rabenseifner-subgroup 1000x2000 p=8 density=0.1 n_groups=2', 5),
+        ('allreduce 10x10 p=4 float32', 1),
+    ]
+
+    record = {'name': 'allreduce', 'N': 10, 'M': 10, 'numprocs': 4, 'density': 1, 'dtype': 'float32', 'params': {}}
+    assert watch.record_key(record) == configs[1][0]
+
+
+def test_campaign(tmp_path):
+    raw_dir = tmp_path / 'raw'
+    raw_dir.mkdir()
+    (raw_dir / 'jobs-3').write_text('196612254\n196612391\n')
+    for job_id in ['196612254', '196612391']:
+        shutil.copy(FIXTURES / job_id, raw_dir / job_id)
+
+    # Batch files of the jobs `8-3` and `16-3` of the fixtures, the first one with a configuration that did not report
+    commands = [
+        Configuration(n=1000, m=1000, nodes=8, implementation=allgather, repetitions=2, job_repetition=3),
+        Configuration(n=1000, m=1000, nodes=8, implementation=allreduce, repetitions=3, job_repetition=3),
+    ]
+    (raw_dir / 'batch-8-3').write_text(''.join(' '.join(EulerRunner.prepare_cmd(c)) + '\n' for c in commands))
+    (raw_dir / 'batch-16-3').write_text(' '.join(EulerRunner.prepare_cmd(
+        Configuration(n=1000, m=1000, nodes=16, implementation=allgather, repetitions=2, job_repetition=3))) + '\n')
+
+    campaign = watch.Campaign(str(tmp_path))
+    asyncio.new_event_loop().run_until_complete(campaign.watch(once=True))
+    assert campaign.finished()
+
+    status = json.loads((tmp_path / 'status.json').read_text())
+    assert status['jobs'] == {'DONE': 1, 'EXIT': 1}
+    assert status['failed_jobs'] == ['196612391']
+
+    rows = {row['configuration']: row for row in status['rows']}
+    assert rows['allgather 1000x1000 p=8']['status'] == 'done'
+    assert rows['allgather 1000x1000 p=8']['median_runtime'] == (9312 + 8104) / 2 / 1000
+    assert rows['allreduce 1000x1000 p=8']['status'] == 'failed'
+    assert rows['allreduce 1000x1000 p=8']['iterations'] == 2
+    assert rows['allgather 1000x1000 p=16']['status'] == 'failed'
+    assert 'allgather 1000x1000 p=16' in (tmp_path / 'status.html').read_text()
+
+    # Reports are only parsed once
+    assert campaign.read_reports() == []
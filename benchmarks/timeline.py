@@ -0,0 +1,110 @@
+"""
+Converts the per-rank timestamps recorded with `main --trace` into the Chrome trace event format, which can be opened
+in Perfetto (https://ui.perfetto.dev) or chrome://tracing.
+
+Every run (a single invocation of `main`) becomes a process with one track (thread) per rank. Every iteration shows up
+as a barrier slice (from arriving at to leaving the barrier before the iteration), an iteration slice (until `compute`
+returned) and the phases of the implementation nested inside the iteration, one slice for every time a phase was
+entered.
+"""
+
+import json
+import typing
+
+
+def run_key(record: dict) -> tuple:
+    """
+    Identifies the run a record (a single iteration) belongs to. Timestamps are only comparable within a run.
+    """
+    job_id = record.get('job', {}).get('id')
+    params = tuple(sorted(record.get('params', {}).items()))
+    return job_id, record['name'], params, record['N'], record['M'], record['numprocs'], record.get('dtype', 'float64'), \
+        record['repetition'], record['timestamp']
+
+
+def run_label(record: dict) -> str:
+    dim = f"{record['N']}" if record['N'] == record['M'] else f"{record['N']}x{record['M']}"
+    return f"{record['name']}, {dim}, {record['numprocs']} processes, repetition {record['repetition']}"
+
+
+def _slice(name: str, category: str, pid: int, tid: int, start: int, end: int, args: dict = None) -> dict:
+    event = {
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'pid': pid,
+        'tid': tid,
+        'ts': start,
+        'dur': max(end - start, 0),
+    }
+    if args:
+        event['args'] = args
+
+    return event
+
+
+def _metadata(name: str, pid: int, tid: int, args: dict) -> dict:
+    return {'name': name, 'ph': 'M', 'pid': pid, 'tid': tid, 'args': args}
+
+
+def trace_events(records: typing.Iterable[dict]) -> typing.List[dict]:
+    """
+    Trace events of all records that contain a trace, records without one are skipped.
+    """
+    runs: typing.Dict[tuple, typing.List[dict]] = {}
+    for record in records:
+        if 'trace' in record:
+            runs.setdefault(run_key(record), []).append(record)
+
+    events = []
+    for pid, run in enumerate(runs.values()):
+        run.sort(key=lambda r: r['iteration'])
+
+        # Timestamps are relative to the first process arriving at the first barrier
+        origin = min(run[0]['trace']['barrier_enter'])
+
+        events.append(_metadata('process_name', pid, 0, {'name': run_label(run[0])}))
+        events.append(_metadata('process_sort_index', pid, 0, {'sort_index': pid}))
+        for rank in range(run[0]['numprocs']):
+            events.append(_metadata('thread_name', pid, rank, {'name': f'rank {rank}'}))
+            events.append(_metadata('thread_sort_index', pid, rank, {'sort_index': rank}))
+
+        for record in run:
+            trace = record['trace']
+
+            for rank in range(record['numprocs']):
+                barrier_enter = trace['barrier_enter'][rank] - origin
+                barrier_exit = trace['barrier_exit'][rank] - origin
+                end = trace['end'][rank] - origin
+
+                events.append(_slice('barrier', 'barrier', pid, rank, barrier_enter, barrier_exit))
+                events.append(
+                    _slice(f"iteration {record['iteration']}", 'iteration', pid, rank, barrier_exit, end, {
+                        'runtime': record['runtimes'][rank] if 'runtimes' in record else end - barrier_exit,
+                        'clock_offset': trace['clock_offset'][rank],
+                    }))
+
+                for name, entries in trace.get('phase_entries', {}).items():
+                    for start, duration in entries[rank] or []:
+                        events.append(_slice(name, 'phase', pid, rank, start - origin, start - origin + duration))
+
+    return events
+
+
+def convert(input_files: typing.List[str], output_file: str) -> int:
+    """
+    Writes the trace of all records in the (json lines) input files into `output_file`, returns the number of events.
+    """
+
+    def records():
+        for input_file in input_files:
+            with open(input_file) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    events = trace_events(records())
+    with open(output_file, 'w') as o:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, o, separators=(',', ':'))
+
+    return len(events)
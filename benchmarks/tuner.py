@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+"""
+Searches the tunable parameters of an implementation (see `scheduler.Tunable`) per input size and number of processes,
+with far fewer runs than a grid search:
+
+- golden-section: narrows down the interval of a parameter by evaluating a single new value per step, assumes the
+  runtime is unimodal in the parameter.
+- successive halving: evaluates a coarse grid of values with few repetitions, and repeatedly keeps the faster half
+  while doubling the repetitions. Does not assume anything about the shape, but needs more runs.
+
+The optimum of every search is recorded in a json file (see `record`), which `benchmark.py --optima` runs the
+implementations with.
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import typing
+
+from config import results_path
+from lsf import LsfReport
+from scheduler import Configuration, EulerRunner, Implementation, Tunable, logger
+
+# Raw directory of the tuning jobs in the results directory, apart from the campaign (`raw`) such that collecting the
+# campaign does not mix in the tuning runs
+RAW_DIR = 'tune'
+
+# Evaluates a batch of parameter values with the given number of repetitions and returns their runtimes
+Evaluate = typing.Callable[[typing.List[int], int], typing.List[float]]
+
+INVPHI = (math.sqrt(5) - 1) / 2
+
+
+def golden_section(evaluate: Evaluate, tunable: Tunable,
+                   repetitions: int) -> typing.Tuple[int, typing.Dict[int, float]]:
+    """
+    Returns the best value and the runtimes of all evaluated values.
+    """
+    costs: typing.Dict[int, float] = {}
+
+    def cost(values: typing.List[int]) -> typing.List[float]:
+        missing = sorted({v for v in values if v not in costs})
+        if missing:
+            costs.update(zip(missing, evaluate(missing, repetitions)))
+
+        return [costs[v] for v in values]
+
+    a, b = tunable.to_search(tunable.minimum), tunable.to_search(tunable.maximum)
+    c, d = b - INVPHI * (b - a), a + INVPHI * (b - a)
+    fc, fd = cost([tunable.from_search(c), tunable.from_search(d)])
+
+    # Stop once the inner points are rounded to the same value, the comparison tells nothing about the interval anymore
+    while tunable.from_search(c) != tunable.from_search(d):
+        if fc < fd:
+            # The minimum lies in [a, d]
+            b, d, fd = d, c, fc
+            c = b - INVPHI * (b - a)
+            fc, = cost([tunable.from_search(c)])
+        else:
+            # The minimum lies in [c, b]
+            a, c, fc = c, d, fd
+            d = a + INVPHI * (b - a)
+            fd, = cost([tunable.from_search(d)])
+
+    # Only a few valid values remain in the interval
+    cost(list(range(tunable.from_search(a), tunable.from_search(b) + 1, tunable.step)))
+
+    return min(costs, key=costs.get), costs
+
+
+def successive_halving(evaluate: Evaluate,
+                       tunable: Tunable,
+                       repetitions: int,
+                       num_candidates: int = 16,
+                       eta: int = 2) -> typing.Tuple[int, typing.Dict[int, float]]:
+    """
+    Returns the best value and the runtimes of all evaluated values (with the most repetitions they were run with).
+    """
+    lo, hi = tunable.to_search(tunable.minimum), tunable.to_search(tunable.maximum)
+    points = [lo + (hi - lo) * i / max(num_candidates - 1, 1) for i in range(num_candidates)]
+    candidates = sorted({tunable.from_search(p) for p in points})
+
+    costs: typing.Dict[int, float] = {}
+    while len(candidates) > 1:
+        costs.update(zip(candidates, evaluate(candidates, repetitions)))
+
+        candidates = sorted(candidates, key=costs.get)[:max(1, len(candidates) // eta)]
+        repetitions *= eta
+
+    return candidates[0], costs
+
+
+def median_runtime(lines: typing.Iterable[str]) -> float:
+    """
+    Median runtime (in microseconds) of the json output of a run, without the first (warmup) iteration.
+    """
+    runtimes = [r['runtime'] for r in map(json.loads, lines) if r['iteration'] > 0]
+    return statistics.median(runtimes)
+
+
+def configurations(impl: Implementation, tunable: Tunable, values: typing.List[int], n: int, numprocs: int,
+                   repetitions: int) -> typing.List[Configuration]:
+    # One more iteration which is dropped as warmup
+    return [
+        Configuration(n=n,
+                      m=n,
+                      nodes=numprocs,
+                      repetitions=repetitions + 1,
+                      implementation=impl.with_params(**{tunable.name: value})) for value in values
+    ]
+
+
+def local_evaluator(impl: Implementation, tunable: Tunable, n: int, numprocs: int) -> Evaluate:
+    """
+    Runs every value with mpirun on the current machine.
+    """
+
+    def evaluate(values: typing.List[int], repetitions: int) -> typing.List[float]:
+        runtimes = []
+        for config in configurations(impl, tunable, values, n, numprocs, repetitions):
+            logger.info(f'running {config}')
+            proc = subprocess.run(['mpirun', '-np', str(numprocs)] + config.command(),
+                                  stdout=subprocess.PIPE,
+                                  check=True)
+            runtimes.append(median_runtime(proc.stdout.decode().splitlines()))
+
+        return runtimes
+
+    return evaluate
+
+
+def euler_evaluator(runner: EulerRunner, impl: Implementation, tunable: Tunable, n: int, numprocs: int) -> Evaluate:
+    """
+    Runs every batch of values as a single job and blocks until it finished.
+    """
+
+    def evaluate(values: typing.List[int], repetitions: int) -> typing.List[float]:
+        configs = configurations(impl, tunable, values, n, numprocs, repetitions)
+        job_id = runner.run_grouped(('tune', impl.name, n, numprocs), configs)
+
+        lines: typing.Dict[int, typing.List[str]] = {value: [] for value in values}
+        with open(f'{runner.raw_dir}/{job_id}') as f:
+            for _, line in LsfReport(job_id, f).lines():
+                if not line.startswith('{'):
+                    continue
+
+                lines[json.loads(line)['params'][tunable.name]].append(line)
+
+        return [median_runtime(lines[value]) for value in values]
+
+    return evaluate
+
+
+def record(path: str, result: dict):
+    """
+    Stores the result of a search in the json file at `path`, replacing an earlier result for the same implementation,
+    parameter, N and number of processes.
+    """
+    key = ('implementation', 'param', 'N', 'numprocs')
+
+    results = []
+    if os.path.isfile(path):
+        with open(path) as f:
+            results = json.load(f)
+
+    results = [r for r in results if tuple(r[k] for k in key) != tuple(result[k] for k in key)]
+    results.append(result)
+    results.sort(key=lambda r: tuple(r[k] for k in key))
+
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def optima(path: str) -> typing.Dict[typing.Tuple[str, int, int], typing.Dict[str, int]]:
+    """
+    Recorded optimal parameters per implementation, N and number of processes, empty if nothing was recorded.
+    """
+    if not os.path.isfile(path):
+        return {}
+
+    result: typing.Dict[typing.Tuple[str, int, int], typing.Dict[str, int]] = {}
+    with open(path) as f:
+        for r in json.load(f):
+            result.setdefault((r['implementation'], r['N'], r['numprocs']), {})[r['param']] = r['value']
+
+    return result
+
+
+def optimum(path: str, impl: Implementation, n: int, numprocs: int) -> Implementation:
+    """
+    The implementation with the recorded optimal parameters for N and the number of processes (if any).
+    """
+    return impl.with_params(**optima(path).get((impl.name, n, numprocs), {}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tune the parameters of an implementation')
+    parser.add_argument('-i', '--implementation', type=str, required=True, help="Name of the implementation")
+    parser.add_argument('-p', '--param', type=str, default=None, help="Parameter to tune (default: all)")
+    parser.add_argument('--method', type=str, default='golden', choices=['golden', 'halving'])
+    parser.add_argument('-n', type=int, nargs='+', required=True, help="Vector sizes (N = M)")
+    parser.add_argument('--nodes', type=int, nargs='+', required=True, help="Numbers of processes")
+    parser.add_argument('-r', '--repetitions', type=int, default=3, help="(Initial) repetitions per evaluation")
+    parser.add_argument('-m', '--mode', type=str, default='local', choices=['local', 'euler'])
+    parser.add_argument('-o',
+                        '--output',
+                        type=str,
+                        default=f'{results_path}/tuned.json',
+                        help="File the optima are recorded in")
+    args = parser.parse_args()
+
+    impl = Implementation(name=args.implementation)
+    tunables = [t for t in impl.tunables() if args.param is None or t.name == args.param]
+    if not tunables:
+        parser.error(f'{impl.name} has no tunable parameter {args.param or ""}')
+
+    runner = EulerRunner(results_dir=results_path, raw_dir=RAW_DIR, wait=True) if args.mode == 'euler' else None
+
+    for tunable in tunables:
+        for n in args.n:
+            for numprocs in args.nodes:
+                if runner is not None:
+                    evaluate = euler_evaluator(runner, impl, tunable, n, numprocs)
+                else:
+                    evaluate = local_evaluator(impl, tunable, n, numprocs)
+
+                if args.method == 'golden':
+                    best, costs = golden_section(evaluate, tunable, args.repetitions)
+                else:
+                    best, costs = successive_halving(evaluate, tunable, args.repetitions)
+
+                logger.info(f'{impl.name} N={n} numprocs={numprocs}: {tunable.name}={best} '
+                            f'({len(costs)} values evaluated)')
+                record(
+                    args.output, {
+                        'implementation': impl.name,
+                        'param': tunable.name,
+                        'N': n,
+                        'numprocs': numprocs,
+                        'method': args.method,
+                        'value': best,
+                        'runtime': costs[best] if best in costs else None,
+                        'evaluated': {str(v): c for v, c in sorted(costs.items())},
+                    })
+
+
+if __name__ == '__main__':
+    main()
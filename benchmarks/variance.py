@@ -0,0 +1,167 @@
+"""
+Splits the variance of the runtime of every configuration into the variance between jobs (`job_repetitions`, separate
+LSF jobs) and the variance between iterations within a job (`repetitions`), and recommends the cheapest split that
+reaches a target confidence interval width of the mean runtime.
+
+The runtime of iteration i in job j is modeled with nested random effects
+
+    x_ji = mu + b_j + e_ji,    b_j ~ N(0, sigma_job^2),    e_ji ~ N(0, sigma_iteration^2)
+
+and the variance components are estimated with the ANOVA (method of moments) estimators, which also handle jobs with
+different numbers of iterations. With r iterations in each of J jobs, the mean has the variance
+
+    sigma_job^2 / J + sigma_iteration^2 / (J r)
+
+such that more iterations only help while the variance between jobs is small.
+"""
+
+import json
+import typing
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import plot
+import steady_state
+
+JOB_COLUMN = 'repetition'  # job_repetition of the configuration, passed to main with -r
+
+
+class Components(typing.NamedTuple):
+    mean: float
+    sigma_job: float
+    sigma_iteration: float
+    jobs: int
+    iterations: int  # smallest number of (steady) iterations of a job
+
+
+def components(df: pd.DataFrame, column: str = 'runtime') -> Components:
+    """
+    Variance components of a single configuration, `df` only contains steady iterations.
+    """
+    groups = [g[column].to_numpy(dtype=float) for _, g in df.groupby(JOB_COLUMN)]
+    groups = [g for g in groups if len(g) > 0]
+
+    k = len(groups)
+    sizes = np.array([len(g) for g in groups])
+    total = sizes.sum()
+    mean = np.concatenate(groups).mean()
+
+    ss_within = sum(((g - g.mean())**2).sum() for g in groups)
+    ss_between = sum(len(g) * (g.mean() - mean)**2 for g in groups)
+
+    ms_within = ss_within / (total - k) if total > k else 0.0
+    if k < 2:
+        return Components(mean, 0.0, float(np.sqrt(ms_within)), k, int(sizes.min()))
+
+    ms_between = ss_between / (k - 1)
+    # Effective number of iterations per job for unbalanced jobs
+    n0 = (total - (sizes**2).sum() / total) / (k - 1)
+    var_job = max((ms_between - ms_within) / n0, 0.0)
+
+    return Components(mean, float(np.sqrt(var_job)), float(np.sqrt(ms_within)), k, int(sizes.min()))
+
+
+def t_quantile(job_repetitions: int, confidence: float = 0.95) -> float:
+    # The jobs are the independent samples of the mean
+    return stats.t.ppf((1 + confidence) / 2, max(job_repetitions - 1, 1))
+
+
+def ci_width(c: Components, repetitions: int, job_repetitions: int, t: float = None) -> float:
+    """
+    Width of the 95% confidence interval of the mean runtime, relative to the mean.
+    """
+    if t is None:
+        t = t_quantile(job_repetitions)
+
+    variance = c.sigma_job**2 / job_repetitions + c.sigma_iteration**2 / (job_repetitions * repetitions)
+    return 2 * t * np.sqrt(variance) / c.mean
+
+
+def recommend(c: Components,
+              target: float,
+              warmup: int = 1,
+              job_cost: float = 10,
+              max_repetitions: int = 100,
+              max_job_repetitions: int = 50) -> typing.Tuple[int, int]:
+    """
+    Cheapest (steady repetitions, job repetitions) whose relative CI width is at most `target`. Every job costs its
+    warmup iterations and `job_cost` iterations worth of startup in addition to the measured iterations. If the target
+    is out of reach, the split with the narrowest CI is returned.
+    """
+    best, best_cost = None, None
+    narrowest, narrowest_width = None, None
+    for job_repetitions in range(2, max_job_repetitions + 1):
+        t = t_quantile(job_repetitions)
+        for repetitions in range(1, max_repetitions + 1):
+            width = ci_width(c, repetitions, job_repetitions, t)
+            cost = job_repetitions * (job_cost + warmup + repetitions)
+
+            if narrowest_width is None or width < narrowest_width:
+                narrowest, narrowest_width = (repetitions, job_repetitions), width
+
+            if width <= target:
+                if best_cost is None or cost < best_cost:
+                    best, best_cost = (repetitions, job_repetitions), cost
+
+                # More iterations only cost more
+                break
+
+    return best if best is not None else narrowest
+
+
+def analyze(df: pd.DataFrame, target: float, job_cost: float = 10) -> typing.List[dict]:
+    """
+    Recommendation per configuration, `df` contains all iterations (see `plot.load_results`). The recommended
+    `repetitions` include the warmup, as they are passed to main with -t.
+    """
+    df = steady_state.annotate(df)
+    columns = steady_state.config_columns(df)
+    warmup = steady_state.summary(df).set_index(columns)['warmup_p90']
+    df = df[df['steady']]
+
+    recommendations = []
+    for key, group in df.groupby(columns, dropna=False):
+        config = dict(zip(columns, key))
+        c = components(group)
+        config_warmup = int(np.ceil(warmup.loc[key]))
+        repetitions, job_repetitions = recommend(c, target, config_warmup, job_cost)
+
+        params = {
+            column[len('params.'):]: int(value)
+            for column, value in config.items()
+            if column.startswith('params.') and not pd.isna(value)
+        }
+        recommendations.append({
+            'implementation': config['implementation'],
+            'params': params,
+            'N': int(config['N']),
+            'numprocs': int(config['numprocs']),
+            'placement': config.get('placement', '1ppn'),
+            'density': float(config.get('density', 1.0)),
+            'dtype': config.get('dtype', 'float64'),
+            'mean': c.mean,
+            'sigma_job': c.sigma_job,
+            'sigma_iteration': c.sigma_iteration,
+            'measured_jobs': c.jobs,
+            'measured_iterations': c.iterations,
+            'ci_width': ci_width(c, repetitions, job_repetitions),
+            'warmup': config_warmup,
+            'repetitions': repetitions + config_warmup,
+            'job_repetitions': job_repetitions,
+        })
+
+    return recommendations
+
+
+def convert(input_files: typing.List[str], input_dir: str, output_file: str, target: float, job_cost: float) -> int:
+    """
+    Writes the recommendations for all results into `output_file` (see `benchmark.py --recommended`), returns the
+    number of configurations.
+    """
+    recommendations = analyze(plot.load_results(input_files, input_dir), target, job_cost)
+    with open(output_file, 'w') as f:
+        json.dump(recommendations, f, indent=2)
+
+    return len(recommendations)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Watches a running campaign: polls the job lists of the raw directory and the status of the jobs (`bjobs`), parses the
+reports of jobs as soon as they finished and keeps the progress and the runtime of every configuration up to date. After
+every poll, the state is written to `<results dir>/status.html` (reloading itself) and `status.json`, and a summary is
+printed, such that failing or implausible configurations show up long before the whole campaign finished.
+
+The watcher only reads the raw directory, results are still collected with `process.py collect` afterwards. It runs on
+the cluster next to the jobs (euler/watch_jobs.sh), so it only uses the standard library of Python 3.6.
+"""
+
+import argparse
+import asyncio
+import collections
+import html
+import json
+import logging
+import os
+import re
+import shlex
+import shutil
+import statistics
+import subprocess
+import time
+import typing
+
+from config import results_path
+from lsf import LsfReport
+from scheduler import EulerRunner
+
+POLL_INTERVAL = 60  # seconds
+
+# Options of main and kernel_bench that take a value (see `Configuration.arguments`)
+VALUED_OPTIONS = {'-n', '-m', '-t', '-i', '-r', '-d', '-p', '--dtype', '--placement', '--input-a', '--input-b',
+                  '--output-format', '--output-file'}
+
+BINARIES = ('/main', '/kernel_bench')
+
+
+def config_key(name: str, n: int, m: int, numprocs: int, density: float = 1.0, dtype: str = 'float64',
+               params: typing.Dict[str, int] = None) -> str:
+    """
+    Label of a configuration, the same for its command in a batch file and its records. Job repetitions of a
+    configuration share the label.
+    """
+    key = f'{name} {n}x{m} p={numprocs}'
+    if float(density) != 1.0:
+        key += f' density={float(density):g}'
+    if dtype != 'float64':
+        key += f' {dtype}'
+    if params:
+        key += ' ' + ','.join(f'{param}={value}' for param, value in sorted(params.items()))
+
+    return key
+
+
+def record_key(record: dict) -> str:
+    return config_key(record['name'], record['N'], record['M'], record['numprocs'], record.get('density', 1.0),
+                      record.get('dtype', 'float64'), record.get('params'))
+
+
+def parse_arguments(args: typing.List[str], numprocs: int) -> typing.Tuple[str, int]:
+    """
+    Key and number of iterations of the configuration run with the options `args` on `numprocs` processes.
+    """
+    options = {'-t': '1', '-d': '1.0', '--dtype': 'float64'}
+    params = {}
+    i = 0
+    while i < len(args):
+        if args[i] == '-p':
+            param, _, value = args[i + 1].partition('=')
+            params[param] = int(value)
+        elif args[i] in VALUED_OPTIONS:
+            options[args[i]] = args[i + 1]
+        else:
+            i += 1
+            continue
+
+        i += 2
+
+    key = config_key(options['-i'], int(options['-n']), int(options['-m']), numprocs, float(options['-d']),
+                     options['--dtype'], params)
+    return key, int(options['-t'])
+
+
+def batch_configurations(text: str) -> typing.List[typing.Tuple[str, int]]:
+    """
+    Keys and numbers of iterations of the configurations in a batch file of `EulerRunner.run_grouped`, both of the
+    commands running a single configuration and of the lines of `main --batch -`.
+    """
+    configs = []
+    numprocs = None
+    in_batch = False
+    for line in text.splitlines():
+        if in_batch:
+            if line.strip() == 'EOF':
+                in_batch = False
+            elif line.strip() and not line.lstrip().startswith('#'):
+                configs.append(parse_arguments(shlex.split(line), numprocs))
+            continue
+
+        words = shlex.split(line)
+        if not words or words[0] != 'mpirun':
+            continue
+
+        numprocs = int(words[words.index('-np') + 1])
+        binary = next(i for i, word in enumerate(words) if word.endswith(BINARIES))
+        if '--batch' in words[binary + 1:]:
+            in_batch = True
+        else:
+            configs.append(parse_arguments(words[binary + 1:], numprocs))
+
+    return configs
+
+
+class Report(typing.NamedTuple):
+    job_id: str
+    name: str  # job name, `batch-<name>` holds its commands
+    exited: bool
+    records: typing.List[dict]
+
+
+class Campaign:
+    """
+    Incrementally updated state of the campaign in `<results_dir>/<raw_dir>`.
+    """
+
+    def __init__(self, results_dir: str, raw_dir: str = 'raw'):
+        self.results_dir = results_dir
+        self.runner = EulerRunner(results_dir=results_dir, raw_dir=raw_dir, submit=False)
+
+        self.job_status: typing.Dict[str, str] = {}  # LSF status of the jobs that did not report yet
+        self.job_names: typing.Dict[str, str] = {}
+        self.reports: typing.Dict[str, Report] = {}  # jobs whose reports were parsed, without their records
+        self.batches: typing.Dict[str, typing.List[typing.Tuple[str, int]]] = {}  # configurations by job name
+
+        # Per configuration: iterations and the runtimes (in microseconds) of every job repetition
+        self.iterations: typing.Dict[str, int] = collections.Counter()
+        self.runtimes: typing.Dict[str, typing.Dict[int, typing.List[int]]] = collections.defaultdict(
+            lambda: collections.defaultdict(list))
+        self.compute: typing.Dict[str, typing.List[float]] = collections.defaultdict(list)
+
+        self.warned_bjobs = False
+
+    def job_ids(self) -> typing.List[str]:
+        job_ids = []
+        for repetition in self.runner.job_repetitions():
+            with self.runner.open_raw(f'jobs-{repetition}') as f:
+                job_ids.extend(f.read().splitlines())
+
+        return job_ids
+
+    def read_reports(self) -> typing.List[Report]:
+        """
+        Parses the reports of all jobs that finished since the last call. Only reads files, such that it can run in a
+        separate thread.
+        """
+        reports = []
+        for repetition in self.runner.job_repetitions():
+            with self.runner.open_raw(f'jobs-{repetition}') as f:
+                job_ids = f.read().splitlines()
+
+            # Reports that do not exist yet would only be logged as missing
+            skip = {job_id for job_id in job_ids if job_id in self.reports or not self.runner.raw_exists(job_id)}
+            for job_id, records in self.runner.job_records(repetition, skip=skip):
+                with self.runner.open_raw(job_id) as f:
+                    subject = LsfReport(job_id, f).subject
+
+                match = re.search(r'Job \d+: <([^>]*)>', subject)
+                reports.append(Report(
+                    job_id=job_id,
+                    name=match.group(1) if match else '',
+                    exited=subject.endswith('Exited'),
+                    records=records if records is not None else [],
+                ))
+
+        return reports
+
+    def add_report(self, report: Report):
+        for record in report.records:
+            key = record_key(record)
+            self.iterations[key] += 1
+            self.runtimes[key][record.get('repetition', 0)].append(record['runtime'])
+            if record['runtime'] > 0:
+                self.compute[key].append(record['runtime_compute'] / record['runtime'])
+
+        self.reports[report.job_id] = report._replace(records=[])
+        self.job_names[report.job_id] = report.name
+        self.job_status.pop(report.job_id, None)
+
+    def read_batch(self, name: str):
+        if name in self.batches or not self.runner.raw_exists(f'batch-{name}'):
+            return
+
+        with self.runner.open_raw(f'batch-{name}') as f:
+            self.batches[name] = batch_configurations(f.read())
+
+    async def poll_reports(self):
+        loop = asyncio.get_event_loop()
+        for report in await loop.run_in_executor(None, self.read_reports):
+            self.add_report(report)
+
+    async def poll_jobs(self):
+        """
+        Updates the LSF status and the names of the jobs that did not report yet.
+        """
+        pending = [job_id for job_id in self.job_ids() if job_id not in self.reports]
+        if not pending:
+            return
+
+        if shutil.which('bjobs') is None:
+            if not self.warned_bjobs:
+                logging.warning('bjobs not found, the status of unfinished jobs is unknown')
+                self.warned_bjobs = True
+            return
+
+        proc = await asyncio.create_subprocess_exec(
+            'bjobs', '-o', 'jobid stat job_name', '-json', *pending,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stdout, _ = await proc.communicate()
+        try:
+            records = json.loads(stdout.decode()).get('RECORDS', [])
+        except ValueError:
+            logging.error(f'failed to parse the output of bjobs: {stdout.decode()[:200]}')
+            return
+
+        for record in records:
+            job_id = record.get('JOBID')
+            if job_id not in pending:
+                continue
+
+            self.job_status[job_id] = record.get('STAT', '')
+            if record.get('JOB_NAME'):
+                self.job_names[job_id] = record['JOB_NAME']
+
+    def configurations(self) -> typing.List[dict]:
+        """
+        Progress and summary statistics of every configuration. The status is `done` once all iterations reported,
+        `failed` if all jobs running it reported without, and otherwise the most advanced status of its other jobs.
+        """
+        expected = collections.Counter()
+        jobs = collections.defaultdict(set)
+        for job_id, name in self.job_names.items():
+            self.read_batch(name)
+            for key, iterations in self.batches.get(name, []):
+                expected[key] += iterations
+                jobs[key].add(job_id)
+
+        rows = []
+        for key in sorted(set(expected) | set(self.iterations)):
+            statuses = {self.job_status.get(job_id, 'UNKNOWN') for job_id in jobs[key] if job_id not in self.reports}
+            total = max(expected[key], self.iterations[key])
+            if self.iterations[key] >= total:
+                status = 'done'
+            elif not statuses:
+                status = 'failed'
+            elif 'RUN' in statuses:
+                status = 'running'
+            else:
+                status = 'pending'
+
+            medians = [statistics.median(runtimes) for runtimes in self.runtimes[key].values()]
+            rows.append({
+                'configuration': key,
+                'status': status,
+                'iterations': self.iterations[key],
+                'expected': total,
+                'repetitions': len(medians),
+                # Median of the per-repetition medians in ms, like the report (see html_report.py)
+                'median_runtime': statistics.median(medians) / 1000 if medians else None,
+                'median_compute': statistics.median(self.compute[key]) if self.compute[key] else None,
+            })
+
+        return rows
+
+    def summary(self) -> dict:
+        # Jobs LSF reports as finished whose reports were not parsed yet count as running
+        jobs = collections.Counter(
+            'RUN' if status in ['DONE', 'EXIT'] else status for status in self.job_status.values())
+        jobs.update('EXIT' if r.exited else 'DONE' for r in self.reports.values())
+        configs = self.configurations()
+
+        return {
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'jobs': dict(jobs),
+            'configurations': dict(collections.Counter(c['status'] for c in configs)),
+            'failed_jobs': sorted(job_id for job_id, r in self.reports.items() if r.exited),
+            'rows': configs,
+        }
+
+    def finished(self) -> bool:
+        job_ids = self.job_ids()
+        return len(job_ids) > 0 and all(job_id in self.reports for job_id in job_ids)
+
+    def write_status(self, summary: dict):
+        write_atomic(f'{self.results_dir}/status.json', json.dumps(summary, indent=1))
+        write_atomic(f'{self.results_dir}/status.html', status_page(summary))
+
+    async def watch(self, interval: float = POLL_INTERVAL, once: bool = False):
+        while True:
+            await asyncio.gather(self.poll_reports(), self.poll_jobs())
+
+            summary = self.summary()
+            self.write_status(summary)
+            jobs = ', '.join(f'{count} {status}' for status, count in sorted(summary['jobs'].items()))
+            configs = ', '.join(f'{count} {status}' for status, count in sorted(summary['configurations'].items()))
+            print(f'[{summary["updated"]}] jobs: {jobs or "none"}; configurations: {configs or "none"}', flush=True)
+
+            if once or self.finished():
+                return
+
+            await asyncio.sleep(interval)
+
+
+def write_atomic(path: str, content: str):
+    # Replace atomically, a browser reloading the page must not see a partially written file
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+STATUS_COLORS = {'done': '#d4edda', 'running': '#fff3cd', 'pending': '#ffffff', 'failed': '#f8d7da'}
+
+
+def status_page(summary: dict, refresh: int = POLL_INTERVAL) -> str:
+    def cell(value, digits: int = 3) -> str:
+        if value is None:
+            return '<td></td>'
+        if isinstance(value, float):
+            return f'<td>{value:.{digits}g}</td>'
+        return f'<td>{html.escape(str(value))}</td>'
+
+    rows = []
+    for row in summary['rows']:
+        rows.append(f'<tr style="background: {STATUS_COLORS[row["status"]]}">' + ''.join([
+            cell(row['configuration']),
+            cell(row['status']),
+            cell(f'{row["iterations"]} / {row["expected"]}'),
+            cell(row['repetitions']),
+            cell(row['median_runtime'], 4),
+            cell(row['median_compute'], 2),
+        ]) + '</tr>')
+
+    counts = '; '.join(
+        f'{title}: ' + ', '.join(f'{count} {html.escape(status)}' for status, count in sorted(summary[key].items()))
+        for title, key in [('Jobs', 'jobs'), ('Configurations', 'configurations')])
+    table = '\n'.join(rows)
+    failed = ''
+    if summary['failed_jobs']:
+        failed = '<p>Failed jobs: ' + ', '.join(map(html.escape, summary['failed_jobs'])) + '</p>'
+
+    return f'''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta http-equiv="refresh" content="{refresh}">
+<title>Campaign status</title>
+<style>
+body {{ font-family: sans-serif; }}
+td, th {{ padding: 2px 8px; text-align: right; }}
+td:first-child {{ text-align: left; }}
+</style>
+</head>
+<body>
+<p>Updated {html.escape(summary['updated'])}. {counts}</p>
+{failed}
+<table>
+<tr>
+<th>Configuration</th><th>Status</th><th>Iterations</th><th>Repetitions</th><th>Median runtime (ms)</th>
+<th>Compute fraction</th>
+</tr>
+{table}
+</table>
+</body>
+</html>
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse the reports of a running campaign as its jobs finish')
+    parser.add_argument('-d', '--dir', type=str, default=results_path, help="Directory containing results")
+    parser.add_argument('--raw', type=str, default='raw', help="Raw directory of the campaign, relative to --dir")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help="Seconds between polls")
+    parser.add_argument('--once', action='store_true', default=False, help="Poll once and exit")
+    args = parser.parse_args()
+
+    campaign = Campaign(args.dir, args.raw)
+    # asyncio.run needs Python 3.7
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(campaign.watch(args.interval, args.once))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()
+
+
+if __name__ == '__main__':
+    main()
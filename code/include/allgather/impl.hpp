@@ -14,6 +14,11 @@ class allgather : public dsop {
 
  public:
   void compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) override;
+
+  // Only the input vectors are communicated, reducing their precision does not reduce the memory of the result
+  bool supports(precision p) const override {
+    return p != precision::float32;
+  }
 };
 
 } // namespace impls::allgather
@@ -0,0 +1,49 @@
+#pragma once
+
+#include <dsop.h>
+#include <mpi.h>
+
+#include <memory>
+
+#include "vector.h"
+
+namespace impls::allgather_sparse {
+
+/**
+ * Non-zero entries of multiple vectors, the entries of vector i are at [offsets[i], offsets[i + 1]).
+ */
+struct sparse_vectors {
+  std::vector<int> indices;
+  std::vector<double> values;
+  std::vector<int> offsets{0};
+
+  // Appends the non-zero entries of a dense vector of size n
+  void append(const double* data, int n);
+
+  int size() const {
+    return static_cast<int>(offsets.size()) - 1;
+  }
+};
+
+/**
+ * Whether exchanging the non-zero entries as (index, value) pairs needs fewer bytes than exchanging the dense vectors
+ * of size n, given the number of non-zero entries of every process.
+ */
+bool use_compressed(const std::vector<int>& nnz, int n);
+
+/**
+ * Allgather implementation for sparse inputs. Only the non-zero entries of the vectors are exchanged, unless the
+ * vectors are dense enough that exchanging them as a whole is cheaper.
+ */
+class allgather_sparse : public dsop {
+  using dsop::dsop;
+
+ public:
+  void compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) override;
+
+ private:
+  // Gathers the non-zero entries of v from all processes
+  sparse_vectors gather(const vector& v);
+};
+
+} // namespace impls::allgather_sparse
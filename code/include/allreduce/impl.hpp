@@ -14,6 +14,11 @@ class allreduce : public dsop {
 
  public:
   void compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) override;
+
+  // MPI reduces in the datatype that is communicated
+  bool supports(precision p) const override {
+    return p != precision::mixed;
+  }
 };
 
 } // namespace impls::allreduce
@@ -16,4 +16,7 @@ class allreduce_butterfly_segmented : public dsop {
   void compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) override;
 };
 
+// Number of bytes in a segment
+extern int BUTTERFLY_SEG_SIZE;
+
 } // namespace impls::allreduce_butterfly_segmented
@@ -14,6 +14,17 @@ class allreduce_ring : public dsop {
 
  public:
   void compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) override;
+
+  bool supports(precision) const override {
+    return true;
+  }
+
+ private:
+  /**
+   * Ring allreduce of the `size` values in `current`, which are accumulated in precision Acc and sent as Wire.
+   */
+  template <typename Acc, typename Wire>
+  void ring(Acc* current, unsigned long size, MPI_Datatype wire_type);
 };
 
 } // namespace impls::allreduce
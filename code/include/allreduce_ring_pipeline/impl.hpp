@@ -16,4 +16,7 @@ class allreduce_ring_pipeline : public dsop {
   void compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) override;
 };
 
+// Number of bytes in a segment
+extern int RING_PIPELINE_SEG_SIZE;
+
 } // namespace impls::allreduce
@@ -0,0 +1,42 @@
+#pragma once
+
+#include <cinttypes>
+#include <vector>
+
+#include "matrix.h"
+#include "vector.h"
+
+/**
+ * Verification of a result matrix R = sum_i a_i b_i^T without computing a reference matrix (Freivalds' algorithm).
+ *
+ * R is projected onto a random vector x. The expected projection R x = sum_i a_i (b_i . x) only takes O(p (N + M))
+ * operations, computing the actual projection of a result O(N M). Comparing the two per block of rows yields a single
+ * relative error per process, such that only these digests have to be gathered on root.
+ */
+namespace checksum {
+
+// Number of rows whose projections are compared as a block
+constexpr int BLOCK_ROWS = 16;
+
+// Random vector of size m with entries in [-1, 1), the same on every process
+vector projection(uint64_t seed, int m);
+
+// R x of the exact result, from the input vectors
+std::vector<double> expected(const std::vector<vector>& a, const std::vector<vector>& b, const vector& x);
+
+// Adds a (b . x), the contribution of a single pair of input vectors to the expected projection y
+void accumulate(std::vector<double>& y, const vector& a, const vector& b, const vector& x);
+
+// R x of a computed result
+std::vector<double> actual(const matrix& result, const vector& x);
+
+// Whether v is neither infinite nor NaN, from its bit pattern such that it also holds with -ffast-math
+bool is_finite(double v);
+
+/**
+ * Largest relative error ||actual - expected|| / ||expected|| of any block of BLOCK_ROWS rows. Blocks whose expected
+ * projection vanishes are compared with the absolute error. Infinite if any projection is not finite.
+ */
+double max_block_error(const std::vector<double>& actual, const std::vector<double>& expected);
+
+} // namespace checksum
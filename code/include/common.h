@@ -21,6 +21,7 @@ static constexpr int ROOT = 0;
 #define TAG_BRUCK_ASYNC TAG_BASE + 11
 #define TAG_ALLREDUCE_BUTTERFLY_SEGMENTED TAG_BASE + 12
 #define TAG_ALLREDUCE_BUTTERFLY_SEGMENTED_REDUCE TAG_BASE + 13
+#define TAG_CLOCK_SYNC TAG_BASE + 14
 
 #ifdef NDEBUG
 #define debug_log(...) ((void)0)
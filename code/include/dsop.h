@@ -3,10 +3,59 @@
 
 #include <mpi.h>
 
+#include <stdexcept>
+#include <string>
+#include <vector>
+
 #include "common.h"
 #include "matrix.h"
 #include "util.hpp"
 
+// A single time a phase was entered, in microseconds
+struct phase_entry {
+  int64_t start;
+  int64_t duration;
+};
+
+// Runtime of a named phase of an implementation
+struct phase_time {
+  std::string name;
+  // Every time the phase was entered, in order
+  std::vector<phase_entry> entries;
+  // Accumulated over all entries
+  int64_t duration;
+};
+
+/**
+ * Precision of the values an implementation communicates and accumulates, the result matrix is float64 in any case.
+ *
+ * - float64: communicates and accumulates doubles
+ * - float32: communicates and accumulates floats, which halves the volume and the memory of partial results
+ * - mixed: communicates floats and accumulates them into doubles
+ */
+enum class precision { float64, float32, mixed };
+
+inline const char* precision_name(precision p) {
+  switch (p) {
+    case precision::float32:
+      return "float32";
+    case precision::mixed:
+      return "mixed";
+    default:
+      return "float64";
+  }
+}
+
+inline precision parse_precision(const std::string& name) {
+  for (auto p : {precision::float64, precision::float32, precision::mixed}) {
+    if (name == precision_name(p)) {
+      return p;
+    }
+  }
+
+  throw std::runtime_error("Unknown precision '" + name + "'");
+}
+
 // dsop is the interface that dsop implementations should satisfy
 class dsop {
  protected:
@@ -18,6 +67,35 @@ class dsop {
 
   int64_t mpi_time{0};
 
+  precision dtype{precision::float64};
+
+  std::vector<phase_time> phase_times;
+
+  /**
+   * Ends the current phase (if any) and starts timing the phase `name`. Time spent in a phase that is entered multiple
+   * times is accumulated. The last phase is ended by `end_phase()` once `compute` returns.
+   */
+  void phase(const std::string& name) {
+    end_phase();
+
+    phase_timer = timer();
+    in_phase = true;
+    for (current_phase = 0; current_phase < phase_times.size(); current_phase++) {
+      if (phase_times[current_phase].name == name) {
+        phase_times[current_phase].entries.push_back({phase_timer.started(), 0});
+        return;
+      }
+    }
+
+    phase_times.push_back({name, {{phase_timer.started(), 0}}, 0});
+  }
+
+ private:
+  // Index into phase_times of the running phase, only valid if in_phase is set
+  size_t current_phase{0};
+  bool in_phase{false};
+  timer phase_timer;
+
  public:
   dsop(MPI_Comm comm, int rank, int num_procs, int N, int M)
       : comm(comm), rank(rank), num_procs(num_procs), N(N), M(M) {}
@@ -25,6 +103,19 @@ class dsop {
 
   virtual void compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) = 0;
 
+  // Whether the implementation can run with precision p, all implementations support float64
+  virtual bool supports(precision p) const {
+    return p == precision::float64;
+  }
+
+  void set_precision(precision p) {
+    if (!supports(p)) {
+      throw std::runtime_error(std::string("Implementation does not support precision ") + precision_name(p));
+    }
+
+    dtype = p;
+  }
+
   template <typename F, typename... Args>
   auto mpi_timer(F& f, Args&&... args) {
     timer t;
@@ -37,6 +128,20 @@ class dsop {
   int64_t get_mpi_time() const {
     return mpi_time;
   }
+
+  void end_phase() {
+    if (in_phase) {
+      const int64_t duration = phase_timer.finish();
+      phase_times[current_phase].entries.back().duration = duration;
+      phase_times[current_phase].duration += duration;
+      in_phase = false;
+    }
+  }
+
+  // Phases in the order they were entered first
+  const std::vector<phase_time>& get_phase_times() const {
+    return phase_times;
+  }
 };
 
 #endif // CODE_DSOP_H
@@ -16,4 +16,7 @@ class grabenseifner_allgather_segmented : public dsop {
   void compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) override;
 };
 
+// Number of bytes in a segment
+extern int SEGMENTED_SEG_SIZE;
+
 } // namespace impls::grabenseifner_allgather_segmented
@@ -0,0 +1,43 @@
+#pragma once
+
+#include <cinttypes>
+#include <memory>
+#include <string>
+
+#include "npy.hpp"
+#include "util.hpp"
+#include "vector.h"
+
+/**
+ * Input vectors of all processes, indexed by rank: either generated (the vectors of `get_random_vectors`) or the rows
+ * of a two-dimensional float64 `.npy` file with one row per process.
+ *
+ * A process only needs its own vector, which costs O(n) memory either way. Files are memory-mapped such that only the
+ * rows that are accessed are read. Accessing the vectors in ascending order is cheapest for generated inputs, as the
+ * random stream only has to be rewound when going back.
+ */
+class input_source {
+ public:
+  // Generated vectors of size n
+  input_source(uint64_t seed, int n, double density = 1.0);
+
+  // Rows of the file at `path`
+  explicit input_source(const std::string& path);
+
+  // Size of the vectors
+  int size() const {
+    return n;
+  }
+
+  // Number of vectors, unbounded for generated inputs
+  int count() const;
+
+  vector get(int i);
+
+ private:
+  uint64_t seed{0};
+  int n;
+  double density{1.0};
+  std::unique_ptr<random_vectors> generated;
+  std::unique_ptr<npy_reader> file;
+};
@@ -0,0 +1,41 @@
+#pragma once
+
+#include <cstddef>
+#include <string>
+#include <vector>
+
+/**
+ * Kernels of the local update of every implementation, adding the outer product of a (size n) and b (size m) to the
+ * row-major n x m matrix c (see `matrix::add_outer_product`). They are timed in isolation by `kernel_bench`.
+ */
+namespace kernels {
+
+using kernel = void (*)(double* c, const double* a, size_t n, const double* b, size_t m);
+
+// Straightforward loop over the rows and columns, like `matrix::add_outer_product`
+void naive(double* c, const double* a, size_t n, const double* b, size_t m);
+
+// Number of columns of a block, such that the part of b a block needs stays in L1 (4 KiB) while its rows are updated
+constexpr size_t BLOCK_COLUMNS = 512;
+
+// Updates the columns block by block
+void blocked(double* c, const double* a, size_t n, const double* b, size_t m);
+
+// Explicitly vectorized with AVX2 fused multiply-adds of 4 doubles
+void avx2(double* c, const double* a, size_t n, const double* b, size_t m);
+
+#ifdef DSOP_BLAS
+// BLAS dger, only available in builds with BLAS
+void blas(double* c, const double* a, size_t n, const double* b, size_t m);
+#endif
+
+// Names of the kernels of this build
+std::vector<std::string> names();
+
+// Kernel with the given name, throws std::runtime_error for unknown ones
+kernel get(const std::string& name);
+
+// Runs `k` on `threads` threads, each updating a contiguous range of rows of c
+void run(kernel k, int threads, double* c, const double* a, size_t n, const double* b, size_t m);
+
+} // namespace kernels
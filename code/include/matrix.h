@@ -124,14 +124,16 @@ class matrix {
     }
   }
 
+  // Vectors in reduced precision are multiplied and accumulated in double precision
+  template <typename T>
   inline void add_submatrix_outer_product(
-      int start_row, int start_col, size_t a_size, const double* a, size_t b_size, const double* b) {
+      int start_row, int start_col, size_t a_size, const T* a, size_t b_size, const T* b) {
     assert(rows >= start_row + a_size);
     assert(columns >= start_col + b_size);
 
     for (size_t i = 0; i < a_size; i++) {
       for (size_t j = 0; j < b_size; j++) {
-        get(start_row + i, start_col + j) += a[i] * b[j];
+        get(start_row + i, start_col + j) += static_cast<double>(a[i]) * b[j];
       }
     }
   }
@@ -148,7 +150,8 @@ class matrix {
   }
 
   // Compute and add the outer product and write to matrix in-place
-  inline void add_outer_product(size_t a_size, const double* a, size_t b_size, const double* b) {
+  template <typename T>
+  inline void add_outer_product(size_t a_size, const T* a, size_t b_size, const T* b) {
     assert(dimension() == a_size * b_size);
     add_submatrix_outer_product(0, 0, a_size, a, b_size, b);
   }
@@ -161,6 +164,17 @@ class matrix {
 // Compute outer product and write to matrix C in place
 void set_outer_product(matrix& C, const vector& a, const vector& b);
 
+// Compute the outer product in precision T and write it to the row-major array `out` of size a.size() * b.size()
+template <typename T>
+void set_outer_product(T* out, const vector& a, const vector& b) {
+  for (size_t i = 0; i < a.size(); i++) {
+    const T a_i = static_cast<T>(a[i]);
+    for (size_t j = 0; j < b.size(); j++) {
+      out[i * b.size() + j] = a_i * static_cast<T>(b[j]);
+    }
+  }
+}
+
 // Compute and add the outer product and write to matrix C in-place
 void add_outer_product(matrix& C, const vector& a, const vector& b);
 
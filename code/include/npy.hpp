@@ -0,0 +1,81 @@
+#pragma once
+
+#include <cinttypes>
+#include <fstream>
+#include <string>
+#include <vector>
+
+/**
+ * Writes a C-contiguous int64 array in the NumPy `.npy` format (version 1.0), such that it can be loaded without any
+ * parsing using `numpy.load(path, mmap_mode='r')`.
+ *
+ * The array is appended to row by row (along the first axis). The header is written with a fixed size and rewritten
+ * with the number of rows actually written once the writer is closed, so a file of an aborted run stays loadable.
+ */
+class npy_writer {
+ public:
+  /**
+   * Total size of the preamble (magic string, version, header length and header), a multiple of 64 bytes.
+   */
+  static constexpr size_t PREAMBLE_SIZE = 128;
+
+  /**
+   * `row_shape` is the shape of a single row, i.e. the shape of the final array without its first dimension.
+   */
+  npy_writer(const std::string& path, std::vector<size_t> row_shape);
+  ~npy_writer();
+
+  npy_writer(const npy_writer&) = delete;
+  npy_writer& operator=(const npy_writer&) = delete;
+
+  // Append a single row, its size must match the row shape
+  void write(const std::vector<int64_t>& row);
+
+  size_t rows() const {
+    return num_rows;
+  }
+
+  static std::string preamble(const std::vector<size_t>& shape, const std::string& descr = "<i8");
+
+ private:
+  std::ofstream out;
+  std::vector<size_t> row_shape;
+  size_t row_size{1};
+  size_t num_rows{0};
+
+  void write_preamble();
+};
+
+/**
+ * Read-only memory map of a C-contiguous two-dimensional float64 array in the NumPy `.npy` format (any version), e.g.
+ * written with `numpy.save`. Only the pages of the rows that are accessed are read from disk.
+ */
+class npy_reader {
+ public:
+  explicit npy_reader(const std::string& path);
+  ~npy_reader();
+
+  npy_reader(const npy_reader&) = delete;
+  npy_reader& operator=(const npy_reader&) = delete;
+
+  size_t rows() const {
+    return num_rows;
+  }
+
+  size_t columns() const {
+    return num_columns;
+  }
+
+  // Pointer to the first of the `columns()` values of row i
+  const double* row(size_t i) const;
+
+ private:
+  std::string path;
+  void* mapped{nullptr};
+  size_t mapped_size{0};
+  const double* values{nullptr};
+  size_t num_rows{0};
+  size_t num_columns{0};
+
+  void parse_header();
+};
@@ -0,0 +1,31 @@
+#pragma once
+
+#include <cinttypes>
+#include <map>
+#include <string>
+
+/**
+ * Communication profile of the MPI calls of a process, recorded by the PMPI interposition library `pmpi_profiler`
+ * (CMake option DSOP_PROFILER). Every wrapped MPI function counts its calls, the bytes of its payload and the time
+ * spent in it, and forwards to the PMPI_ entry point of the MPI library.
+ *
+ * The payload is what this process passes to the call: the send buffer of sends and collectives (the own contribution
+ * of allgathers) and the receive buffer of receives. What a collective sends on the wire depends on the algorithm MPI
+ * chooses and on the size of the communicator, it is estimated from the payload in `benchmarks/comm_profile.py`.
+ * Collectives on communicators smaller than MPI_COMM_WORLD are therefore counted separately, as "<name>@<size>".
+ */
+namespace profiler {
+
+struct call_stats {
+  int64_t calls{0};
+  int64_t bytes{0};
+  int64_t time_us{0};
+};
+
+// Clears all counters of the calling process
+void reset();
+
+// Counters of every MPI function called since the last reset, by name (e.g. "MPI_Send" or "MPI_Allgather@2")
+std::map<std::string, call_stats> snapshot();
+
+} // namespace profiler
@@ -6,10 +6,51 @@
 #include <functional>
 #include <limits>
 #include <memory>
+#include <random>
 
 #include "vector.h"
 
-std::vector<vector> get_random_vectors(uint64_t seed, int n, int p);
+/**
+ * Generates p vectors of size n with entries uniformly distributed in [-1, 1).
+ *
+ * With a density below 1, every entry is non-zero with probability `density` only. The dense vectors are the same as
+ * before sparse inputs were introduced, such that existing measurements stay comparable.
+ */
+std::vector<vector> get_random_vectors(uint64_t seed, int n, int p, double density = 1.0);
+
+/**
+ * The vector with index i of `get_random_vectors(seed, n, p, density)`, for any p > i, without storing the others.
+ */
+vector get_random_vector(uint64_t seed, int n, int i, double density = 1.0);
+
+/**
+ * The vectors of `get_random_vectors` one after the other from a single random stream.
+ *
+ * Skipped dense vectors advance the engine without converting its numbers. Skipped sparse vectors still draw every
+ * entry without storing it, as the number of draws per entry depends on whether it is non-zero, so skipping to the
+ * vector of rank i costs i * n draws on every rank (a fraction of the time of generating them, and no memory).
+ */
+class random_vectors {
+ public:
+  random_vectors(uint64_t seed, int n, double density = 1.0);
+
+  // Index of the vector returned by the next call to `next`
+  int position() const {
+    return index;
+  }
+
+  vector next();
+
+  void skip(int count);
+
+ private:
+  std::mt19937_64 gen;
+  std::uniform_real_distribution<double> dist{-1, 1};
+  std::bernoulli_distribution non_zero;
+  int n;
+  double density;
+  int index{0};
+};
 
 /**
  * Runs the given function and returns its result.
@@ -18,6 +59,11 @@ std::vector<vector> get_random_vectors(uint64_t seed, int n, int p);
  */
 int64_t timer_run(std::function<void(void)> fun);
 
+// Current time in microseconds, as measured by `timer`
+inline int64_t wtime_us() {
+  return static_cast<int64_t>(MPI_Wtime() * 1e6);
+}
+
 class timer {
  public:
   timer() {
@@ -28,15 +74,46 @@ class timer {
     return get_time() - start_us;
   }
 
+  // Timestamp (in microseconds) the timer was started at
+  int64_t started() const {
+    return start_us;
+  }
+
  protected:
   int64_t get_time() {
-    return static_cast<int64_t>(MPI_Wtime() * 1e6);
+    return wtime_us();
   }
 
  private:
   int64_t start_us{0};
 };
 
+/**
+ * Resource usage of the calling process (getrusage), CPU times in microseconds and the peak resident set size in KiB.
+ *
+ * The difference of two snapshots covers the CPU time and context switches in between, the peak RSS of a difference is
+ * the one of the later snapshot (it never decreases).
+ */
+struct resource_usage {
+  int64_t max_rss_kib{0};
+  int64_t user_us{0};
+  int64_t system_us{0};
+  int64_t voluntary_switches{0};
+  int64_t involuntary_switches{0};
+
+  static resource_usage now();
+
+  resource_usage operator-(const resource_usage& start) const {
+    return {
+        max_rss_kib,
+        user_us - start.user_us,
+        system_us - start.system_us,
+        voluntary_switches - start.voluntary_switches,
+        involuntary_switches - start.involuntary_switches,
+    };
+  }
+};
+
 template <typename T>
 T nrm_sqr_diff(const T* x, const T* y, int n) {
   T nrm_sqr = 0;
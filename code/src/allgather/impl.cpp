@@ -6,12 +6,32 @@ void allgather::compute(const std::vector<vector>& a_in, const std::vector<vecto
   const auto& a = a_in[rank];
   const auto& b = b_in[rank];
 
+  if (dtype == precision::mixed) {
+    phase("allgather");
+    const std::vector<float> send_a(a.begin(), a.end());
+    const std::vector<float> send_b(b.begin(), b.end());
+
+    auto rec_a = std::vector<float>(N * num_procs);
+    mpi_timer(MPI_Allgather, send_a.data(), N, MPI_FLOAT, rec_a.data(), N, MPI_FLOAT, comm);
+
+    auto rec_b = std::vector<float>(M * num_procs);
+    mpi_timer(MPI_Allgather, send_b.data(), M, MPI_FLOAT, rec_b.data(), M, MPI_FLOAT, comm);
+
+    phase("outer-product");
+    for (int i = 0; i < num_procs; i++) {
+      result.add_outer_product(N, &rec_a[i * N], M, &rec_b[i * M]);
+    }
+    return;
+  }
+
+  phase("allgather");
   auto rec_a = vector(N * num_procs);
   mpi_timer(MPI_Allgather, a.data(), N, MPI_DOUBLE, rec_a.data(), N, MPI_DOUBLE, comm);
 
   auto rec_b = vector(M * num_procs);
   mpi_timer(MPI_Allgather, b.data(), M, MPI_DOUBLE, rec_b.data(), M, MPI_DOUBLE, comm);
 
+  phase("outer-product");
   for (int i = 0; i < num_procs; i++) {
     result.add_outer_product(N, &rec_a[i * N], M, &rec_b[i * M]);
   }
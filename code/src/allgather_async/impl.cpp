@@ -28,6 +28,7 @@ void allgather_async::compute(const std::vector<vector>& a_in, const std::vector
   /*
    * Asynchronously send and receive vectors to/from all other processes.
    */
+  phase("allgather");
   for (int i = 0; i < num_procs; i++) {
     if (i == rank) {
       continue;
@@ -42,6 +43,7 @@ void allgather_async::compute(const std::vector<vector>& a_in, const std::vector
   }
 
   // Calculate own outer product
+  phase("outer-product");
   result.set_outer_product(a, b);
 
   /*
@@ -50,6 +52,7 @@ void allgather_async::compute(const std::vector<vector>& a_in, const std::vector
    */
   while (true) {
     int idx;
+    phase("allgather");
     mpi_timer(MPI_Waitany, recv_reqs.size(), recv_reqs.data(), &idx, MPI_STATUS_IGNORE);
 
     // No active requests left
@@ -59,6 +62,7 @@ void allgather_async::compute(const std::vector<vector>& a_in, const std::vector
 
     const auto& vec = rec[rec_map[idx]];
 
+    phase("outer-product");
     result.add_outer_product(N, vec.data(), M, &vec[N]);
   }
 
@@ -0,0 +1,84 @@
+#include "allgather_sparse/impl.hpp"
+
+namespace impls::allgather_sparse {
+
+void sparse_vectors::append(const double* data, int n) {
+  for (int i = 0; i < n; i++) {
+    if (data[i] != 0) {
+      indices.push_back(i);
+      values.push_back(data[i]);
+    }
+  }
+
+  offsets.push_back(static_cast<int>(indices.size()));
+}
+
+bool use_compressed(const std::vector<int>& nnz, int n) {
+  size_t compressed_bytes = 0;
+  for (auto count : nnz) {
+    compressed_bytes += count * (sizeof(int) + sizeof(double));
+  }
+
+  return compressed_bytes < nnz.size() * n * sizeof(double);
+}
+
+sparse_vectors allgather_sparse::gather(const vector& v) {
+  const int n = static_cast<int>(v.size());
+
+  sparse_vectors local;
+  local.append(v.data(), n);
+
+  // All processes have to agree on the representation
+  int nnz = static_cast<int>(local.indices.size());
+  std::vector<int> counts(num_procs);
+  mpi_timer(MPI_Allgather, &nnz, 1, MPI_INT, counts.data(), 1, MPI_INT, comm);
+
+  sparse_vectors all;
+
+  if (!use_compressed(counts, n)) {
+    auto dense = vector(n * num_procs);
+    mpi_timer(MPI_Allgather, v.data(), n, MPI_DOUBLE, dense.data(), n, MPI_DOUBLE, comm);
+
+    for (int i = 0; i < num_procs; i++) {
+      all.append(&dense[i * n], n);
+    }
+
+    return all;
+  }
+
+  for (int i = 0; i < num_procs; i++) {
+    all.offsets.push_back(all.offsets.back() + counts[i]);
+  }
+  all.indices.resize(all.offsets.back());
+  all.values.resize(all.offsets.back());
+
+  mpi_timer(MPI_Allgatherv, local.indices.data(), nnz, MPI_INT, all.indices.data(), counts.data(), all.offsets.data(),
+      MPI_INT, comm);
+  mpi_timer(MPI_Allgatherv, local.values.data(), nnz, MPI_DOUBLE, all.values.data(), counts.data(), all.offsets.data(),
+      MPI_DOUBLE, comm);
+
+  return all;
+}
+
+void allgather_sparse::compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) {
+  const auto& a = a_in[rank];
+  const auto& b = b_in[rank];
+
+  phase("allgather");
+  auto all_a = gather(a);
+  auto all_b = gather(b);
+
+  phase("outer-product");
+  for (int i = 0; i < num_procs; i++) {
+    for (int k = all_a.offsets[i]; k < all_a.offsets[i + 1]; k++) {
+      double* row = &result.get(all_a.indices[k], 0);
+      const double value = all_a.values[k];
+
+      for (int l = all_b.offsets[i]; l < all_b.offsets[i + 1]; l++) {
+        row[all_b.indices[l]] += value * all_b.values[l];
+      }
+    }
+  }
+}
+
+} // namespace impls::allgather_sparse
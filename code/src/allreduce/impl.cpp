@@ -1,12 +1,30 @@
 #include "allreduce/impl.hpp"
 
+#include <algorithm>
+
 namespace impls::allreduce {
 
 void allreduce::compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) {
   const auto& a = a_in[rank];
   const auto& b = b_in[rank];
 
+  if (dtype == precision::float32) {
+    phase("outer-product");
+    std::vector<float> current(result.dimension());
+    set_outer_product(current.data(), a, b);
+
+    phase("allreduce");
+    mpi_timer(MPI_Allreduce, MPI_IN_PLACE, current.data(), current.size(), MPI_FLOAT, MPI_SUM, comm);
+
+    phase("convert");
+    std::copy(current.begin(), current.end(), result.get_ptr());
+    return;
+  }
+
+  phase("outer-product");
   auto current = matrix::outer(a, b);
+
+  phase("allreduce");
   mpi_timer(MPI_Allreduce, current.get_ptr(), result.get_ptr(), result.dimension(), MPI_DOUBLE, MPI_SUM, comm);
 }
 
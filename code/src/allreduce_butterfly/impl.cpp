@@ -25,6 +25,7 @@ void allreduce_butterfly::compute(const std::vector<vector>& a_in, const std::ve
   MPI_Status status;
   MPI_Request request = MPI_REQUEST_NULL;
   // Write initial outer product to result matrix
+  phase("outer-product");
   result.set_outer_product(a, b);
   double* receivedMatrixPtr = new double[N * M];
   double* resultPtr = result.get_ptr();
@@ -51,6 +52,7 @@ void allreduce_butterfly::compute(const std::vector<vector>& a_in, const std::ve
   }
 
   // Start Reducing to nearest power of 2
+  phase("fold");
   if (non_power_of_2_rounds && i_am_idle_rank) {
     // send
     mpi_timer(MPI_Ssend, resultPtr, matrix_size, MPI_DOUBLE, idle_partner_rank, TAG_ALLREDUCE_BUTTERFLY_REDUCE, comm);
@@ -66,6 +68,7 @@ void allreduce_butterfly::compute(const std::vector<vector>& a_in, const std::ve
   }
 
   // [START BUTTERFLY ROUNDS]
+  phase("butterfly");
   if (!i_am_idle_rank) {
     for (round = 0; round < n_rounds; round++) {
       // receiver rank (from who we should expect data), is the same rank we send data to
@@ -93,6 +96,7 @@ void allreduce_butterfly::compute(const std::vector<vector>& a_in, const std::ve
   // [END BUTTERFLY ROUNDS]
 
   // [FINISH Reducing to nearest power of 2]
+  phase("fold");
   if (non_power_of_2_rounds && i_am_idle_partner) {
     //    fprintf(stderr, "%d: [IDLE-PARTNER] Sending to rank=%d\n", rank, idle_partner_rank);
     // send
@@ -1,14 +1,10 @@
 #include "allreduce_butterfly_segmented/impl.hpp"
 
-// Number of bytes in a segment
-static constexpr int SEG_SIZE = 1 << 17;
-// Number of elements in a segment
-static constexpr int SEG_EL = SEG_SIZE / sizeof(double);
-
-static_assert(SEG_SIZE % sizeof(double) == 0);
-
 namespace impls::allreduce_butterfly_segmented {
 
+// Default number of bytes in a segment, a multiple of sizeof(double) (overwritten in main)
+int BUTTERFLY_SEG_SIZE = 1 << 17;
+
 /**
  * Performs allreduce with explicit butterfly communication.
  *
@@ -17,6 +13,9 @@ namespace impls::allreduce_butterfly_segmented {
  */
 void allreduce_butterfly_segmented::compute(
     const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) {
+  // Number of elements in a segment
+  const int SEG_EL = BUTTERFLY_SEG_SIZE / sizeof(double);
+
   const auto& a = a_in[rank];
   const auto& b = b_in[rank];
 
@@ -32,6 +31,7 @@ void allreduce_butterfly_segmented::compute(
   assert((num_segments - 1) * SEG_EL + last_segment_elements == matrix_size);
 
   // Write initial outer product to result matrix
+  phase("outer-product");
   result.set_outer_product(a, b);
 
   if (num_procs == 1) {
@@ -68,6 +68,7 @@ void allreduce_butterfly_segmented::compute(
   assert(!(i_am_idle_rank && i_am_idle_partner));
 
   // Start Reducing to nearest power of 2
+  phase("fold");
   if (i_am_idle_rank) {
     // send
     mpi_timer(MPI_Send, resultPtr, matrix_size, MPI_DOUBLE, idle_partner_rank, TAG_ALLREDUCE_BUTTERFLY_SEGMENTED_REDUCE,
@@ -83,11 +84,12 @@ void allreduce_butterfly_segmented::compute(
   }
 
   // [START BUTTERFLY ROUNDS]
-
+  phase("butterfly");
   if (!i_am_idle_rank) {
     int recv_rank = rank ^ 1UL;
     mpi_timer(MPI_Sendrecv, resultPtr, matrix_size, MPI_DOUBLE, recv_rank, TAG_ALLREDUCE_BUTTERFLY_SEGMENTED,
-        receivedMatrix.get(), matrix_size, MPI_DOUBLE, recv_rank, TAG_ALLREDUCE_BUTTERFLY_SEGMENTED, comm, MPI_STATUS_IGNORE);
+        receivedMatrix.get(), matrix_size, MPI_DOUBLE, recv_rank, TAG_ALLREDUCE_BUTTERFLY_SEGMENTED, comm,
+        MPI_STATUS_IGNORE);
 
     for (int round = 1; round < n_rounds; round++) {
       // receiver rank (from who we should expect data), is the same rank we send data to
@@ -130,6 +132,7 @@ void allreduce_butterfly_segmented::compute(
   // [END BUTTERFLY ROUNDS]
 
   // [FINISH Reducing to nearest power of 2]
+  phase("fold");
   if (i_am_idle_partner) {
     // send
     mpi_timer(MPI_Send, resultPtr, matrix_size, MPI_DOUBLE, idle_partner_rank, TAG_ALLREDUCE_BUTTERFLY_SEGMENTED_REDUCE,
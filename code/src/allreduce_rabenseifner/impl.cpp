@@ -37,6 +37,7 @@ void allreduce_rabenseifner::compute(const std::vector<vector>& a_in, const std:
   MPI_Status status;
 
   // Initial Temporary Matrix
+  phase("outer-product");
   result.set_outer_product(a, b);
   double* tempMatrixPtr = result.get_ptr();
   double* receivedMatrixPtr = new double[N * M];
@@ -107,6 +108,7 @@ void allreduce_rabenseifner::compute(const std::vector<vector>& a_in, const std:
 
   // [RABENSEIFNER - BUTTERFLY REDUCE SCATTER]
   // --> send chunks, and add them to your temporary matrix
+  phase("reduce-scatter");
   int idx_lower_send, idx_upper_send, idx_lower_recv, idx_upper_recv;
   for (round = n_rounds - 1; round >= 0; round--) {
     // receiver rank (from who we should expect data), is the same rank we send data to
@@ -153,6 +155,7 @@ void allreduce_rabenseifner::compute(const std::vector<vector>& a_in, const std:
   // [RABENSEIFNER - BUTTERFLY ALLGATHER]
   // --> send chunks (final value), and set them directly in the result array
   // --> reverse send and receive indices!!!
+  phase("allgather");
   for (round = 0; round < n_rounds; round++) {
     //    fprintf(stderr, "%d: ROUND=%d\n", rank, round); // DELETE
     // receiver rank (from who we should expect data), is the same rank we send data to
@@ -1,21 +1,58 @@
 #include "allreduce_ring/impl.hpp"
 
+#include <algorithm>
 #include <iostream>
+#include <type_traits>
 
 namespace impls::allreduce {
 void allreduce_ring::compute(const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) {
   const auto& a = a_in[rank];
   const auto& b = b_in[rank];
 
+  phase("outer-product");
+  if (dtype == precision::float32) {
+    std::vector<float> current(result.dimension());
+    set_outer_product(current.data(), a, b);
+    ring<float, float>(current.data(), current.size(), MPI_FLOAT);
+
+    phase("convert");
+    std::copy(current.begin(), current.end(), result.get_ptr());
+    return;
+  }
+
   result.set_outer_product(a, b);
-  auto current = result.get_ptr();
+  if (dtype == precision::mixed) {
+    ring<double, float>(result.get_ptr(), result.dimension(), MPI_FLOAT);
+  } else {
+    ring<double, double>(result.get_ptr(), result.dimension(), MPI_DOUBLE);
+  }
+}
 
-  unsigned long chunk_size = (a.size() * b.size()) / num_procs;
-  unsigned long last_chunk_size = chunk_size + ((a.size() * b.size()) % num_procs);
+template <typename Acc, typename Wire>
+void allreduce_ring::ring(Acc* current, unsigned long size, MPI_Datatype wire_type) {
+  unsigned long chunk_size = size / num_procs;
+  unsigned long last_chunk_size = chunk_size + (size % num_procs);
   auto destination = (rank + 1) % num_procs;
   auto source = (rank - 1) % num_procs;
 
+  // Chunks accumulated in a higher precision than they are sent in are converted before sending and after receiving
+  constexpr bool convert = !std::is_same_v<Acc, Wire>;
+  std::vector<Wire> send_chunk(convert ? last_chunk_size : 0);
+  std::vector<Wire> recv_chunk(last_chunk_size);
+
+  const auto send = [&](unsigned long offset, int length, MPI_Request* request) {
+    const Wire* data;
+    if constexpr (convert) {
+      std::copy(current + offset, current + offset + length, send_chunk.data());
+      data = send_chunk.data();
+    } else {
+      data = current + offset;
+    }
+    mpi_timer(MPI_Isend, data, length, wire_type, destination, 0, comm, request);
+  };
+
   // Send partial results through the ring until everyone has everything
+  phase("reduce-scatter");
   for (int i = 0; i < num_procs - 1; ++i) {
     // Determine current chunk offset and length
     auto snd_chunk_index = (rank + num_procs - i) % num_procs;
@@ -29,11 +66,10 @@ void allreduce_ring::compute(const std::vector<vector>& a_in, const std::vector<
 
     // Send current chunk to next node
     MPI_Request sendRequest = MPI_REQUEST_NULL;
-    mpi_timer(MPI_Isend, current + snd_chunk_offset, snd_chunk_length, MPI_DOUBLE, destination, 0, comm, &sendRequest);
+    send(snd_chunk_offset, snd_chunk_length, &sendRequest);
 
     // Receive chunk from previous node
-    auto recv_chunk = new double[rcv_chunk_length];
-    mpi_timer(MPI_Recv, recv_chunk, rcv_chunk_length, MPI_DOUBLE, source, 0, comm, MPI_STATUS_IGNORE);
+    mpi_timer(MPI_Recv, recv_chunk.data(), rcv_chunk_length, wire_type, source, 0, comm, MPI_STATUS_IGNORE);
 
     // The message should be received so we can wait on it
     mpi_timer(MPI_Wait, &sendRequest, MPI_STATUS_IGNORE);
@@ -42,12 +78,11 @@ void allreduce_ring::compute(const std::vector<vector>& a_in, const std::vector<
     for (int j = 0; j < rcv_chunk_length; ++j) {
       current[rcv_chunk_offset + j] += recv_chunk[j];
     }
-
-    delete[] recv_chunk;
   }
 
   // At this point the current node should have the result of the chunk with index (rank + 1).
   // We then have to distribute all result chunks
+  phase("allgather");
   for (int i = 0; i < num_procs - 1; ++i) {
     // Determine current chunk offset and length
     auto snd_chunk_index = (rank + num_procs - i + 1) % num_procs;
@@ -61,10 +96,15 @@ void allreduce_ring::compute(const std::vector<vector>& a_in, const std::vector<
 
     // Send current chunk to next node
     MPI_Request sendRequest = MPI_REQUEST_NULL;
-    mpi_timer(MPI_Isend, current + snd_chunk_offset, snd_chunk_length, MPI_DOUBLE, destination, 0, comm, &sendRequest);
+    send(snd_chunk_offset, snd_chunk_length, &sendRequest);
 
     // Receive chunk from previous node
-    mpi_timer(MPI_Recv, current + rcv_chunk_offset, rcv_chunk_length, MPI_DOUBLE, source, 0, comm, MPI_STATUS_IGNORE);
+    if constexpr (convert) {
+      mpi_timer(MPI_Recv, recv_chunk.data(), rcv_chunk_length, wire_type, source, 0, comm, MPI_STATUS_IGNORE);
+      std::copy(recv_chunk.begin(), recv_chunk.begin() + rcv_chunk_length, current + rcv_chunk_offset);
+    } else {
+      mpi_timer(MPI_Recv, current + rcv_chunk_offset, rcv_chunk_length, wire_type, source, 0, comm, MPI_STATUS_IGNORE);
+    }
 
     // The message should be received so we can wait on it
     mpi_timer(MPI_Wait, &sendRequest, MPI_STATUS_IGNORE);
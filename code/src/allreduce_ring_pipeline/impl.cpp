@@ -2,28 +2,29 @@
 
 #include <iostream>
 
-// Number of bytes in a segment
-static constexpr int SEG_SIZE = 4096;
-// Number of elements in a segment
-static constexpr int SEG_EL = SEG_SIZE / sizeof(double);
-
-static_assert(SEG_SIZE % sizeof(double) == 0);
-
 namespace impls::allreduce {
+
+// Default number of bytes in a segment, a multiple of sizeof(double) (overwritten in main)
+int RING_PIPELINE_SEG_SIZE = 4096;
 void allreduce_ring_pipeline::compute(
     const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) {
+  // Number of elements in a segment
+  const int SEG_EL = RING_PIPELINE_SEG_SIZE / sizeof(double);
+
   const auto& a = a_in[rank];
   const auto& b = b_in[rank];
 
+  phase("outer-product");
   result.set_outer_product(a, b);
   auto current = result.get_ptr();
 
   unsigned long chunk_size = (a.size() * b.size()) / num_procs;
   unsigned long last_chunk_size = chunk_size + ((a.size() * b.size()) % num_procs);
   auto destination = (rank + 1) % num_procs;
-  auto source = (rank - 1) % num_procs;
+  auto source = (rank + num_procs - 1) % num_procs;
 
   // Send partial results through the ring until everyone has everything
+  phase("reduce-scatter");
   for (int i = 0; i < num_procs - 1; ++i) {
     // Determine current chunk offset and length
     auto snd_chunk_index = (rank + num_procs - i) % num_procs;
@@ -53,7 +54,7 @@ void allreduce_ring_pipeline::compute(
     for (int j = 0; j < pipeline_chunk_count; ++j) {
       auto pipeline_chunk_offset = j * SEG_EL;
 
-      MPI_Request sendRequest;
+      MPI_Request sendRequest = MPI_REQUEST_NULL;
       if (j < snd_pipeline_chunk_count) {
         // Send current chunk to next node
         auto snd_pipeline_chunk_length = j == snd_pipeline_chunk_count - 1 ? snd_pipeline_remainder : SEG_EL;
@@ -67,23 +68,22 @@ void allreduce_ring_pipeline::compute(
         auto recv_chunk = new double[rcv_pipeline_chunk_length];
         mpi_timer(MPI_Recv, recv_chunk, rcv_pipeline_chunk_length, MPI_DOUBLE, source, 0, comm, MPI_STATUS_IGNORE);
 
-        if (sendRequest) {
-          // The message should be received so we can wait on it
-          mpi_timer(MPI_Wait, &sendRequest, MPI_STATUS_IGNORE);
-        }
-
         // Add received chunk to current matrix
-        for (int k = 0; k < rcv_chunk_length; ++k) {
+        for (int k = 0; k < rcv_pipeline_chunk_length; ++k) {
           current[rcv_chunk_offset + pipeline_chunk_offset + k] += recv_chunk[k];
         }
 
         delete[] recv_chunk;
       }
+
+      // The message should be received so we can wait on it
+      mpi_timer(MPI_Wait, &sendRequest, MPI_STATUS_IGNORE);
     }
   }
 
   // At this point the current node should have the result of the chunk with index (rank + 1).
   // We then have to distribute all result chunks
+  phase("allgather");
   for (int i = 0; i < num_procs - 1; ++i) {
     // Determine current chunk offset and length
     auto snd_chunk_index = (rank + num_procs - i + 1) % num_procs;
@@ -67,9 +67,11 @@ void bruck_async::compute(const std::vector<vector>& a_in, const std::vector<vec
     auto* base_send = rbuf.data();
     auto* base_recv = rbuf.data() + chunks_received * vec_size;
 
+    phase("allgather");
     mpi_timer(MPI_Isend, base_send, num_send, MPI_DOUBLE, target, TAG_BRUCK_ASYNC, comm, &send_req);
     mpi_timer(MPI_Irecv, base_recv, num_send, MPI_DOUBLE, source, TAG_BRUCK_ASYNC, comm, &recv_req);
 
+    phase("outer-product");
     for (int z = to_compute_start; z < to_compute_end; z++) {
       int rbuf_offset = z * vec_size;
       result.add_outer_product(N, &rbuf[rbuf_offset], M, &rbuf[rbuf_offset + N]);
@@ -79,10 +81,12 @@ void bruck_async::compute(const std::vector<vector>& a_in, const std::vector<vec
     to_compute_end += num_chunks_send;
     chunks_received += num_chunks_send;
 
+    phase("allgather");
     mpi_timer(MPI_Wait, &send_req, MPI_STATUS_IGNORE);
     mpi_timer(MPI_Wait, &recv_req, MPI_STATUS_IGNORE);
   }
 
+  phase("outer-product");
   for (int z = to_compute_start; z < to_compute_end; z++) {
     int rbuf_offset = z * vec_size;
     result.add_outer_product(N, &rbuf[rbuf_offset], M, &rbuf[rbuf_offset + N]);
@@ -0,0 +1,99 @@
+#include "checksum.hpp"
+
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <limits>
+#include <random>
+#include <stdexcept>
+
+namespace checksum {
+
+vector projection(uint64_t seed, int m) {
+  std::mt19937_64 gen(seed);
+  std::uniform_real_distribution<double> dist(-1, 1);
+
+  vector x(m);
+  for (auto& v : x) {
+    v = dist(gen);
+  }
+
+  return x;
+}
+
+std::vector<double> expected(const std::vector<vector>& a, const std::vector<vector>& b, const vector& x) {
+  std::vector<double> y(a.empty() ? 0 : a[0].size(), 0);
+
+  for (size_t i = 0; i < a.size(); i++) {
+    accumulate(y, a[i], b[i], x);
+  }
+
+  return y;
+}
+
+void accumulate(std::vector<double>& y, const vector& a, const vector& b, const vector& x) {
+  double dot = 0;
+  for (size_t j = 0; j < b.size(); j++) {
+    dot += b[j] * x[j];
+  }
+
+  for (size_t row = 0; row < y.size(); row++) {
+    y[row] += a[row] * dot;
+  }
+}
+
+std::vector<double> actual(const matrix& result, const vector& x) {
+  if (result.columns != x.size()) {
+    throw std::runtime_error("checksum: projection vector does not match the result dimensions");
+  }
+
+  std::vector<double> y(result.rows, 0);
+  for (size_t row = 0; row < result.rows; row++) {
+    const double* r = result.get_ptr() + row * result.columns;
+    double sum = 0;
+    for (size_t col = 0; col < result.columns; col++) {
+      sum += r[col] * x[col];
+    }
+    y[row] = sum;
+  }
+
+  return y;
+}
+
+bool is_finite(double v) {
+  uint64_t bits;
+  std::memcpy(&bits, &v, sizeof(bits));
+
+  // All exponent bits are set for infinities and NaNs
+  constexpr uint64_t EXPONENT = 0x7ff0000000000000;
+  return (bits & EXPONENT) != EXPONENT;
+}
+
+double max_block_error(const std::vector<double>& actual, const std::vector<double>& expected) {
+  if (actual.size() != expected.size()) {
+    return std::numeric_limits<double>::infinity();
+  }
+
+  double max_error = 0;
+  for (size_t start = 0; start < actual.size(); start += BLOCK_ROWS) {
+    const size_t end = std::min(actual.size(), start + BLOCK_ROWS);
+
+    double diff = 0;
+    double norm = 0;
+    for (size_t row = start; row < end; row++) {
+      diff += (actual[row] - expected[row]) * (actual[row] - expected[row]);
+      norm += expected[row] * expected[row];
+    }
+
+    double error = norm > 0 ? std::sqrt(diff / norm) : std::sqrt(diff);
+    if (!is_finite(error)) {
+      return std::numeric_limits<double>::infinity();
+    }
+
+    max_error = std::max(max_error, error);
+  }
+
+  return max_error;
+}
+
+} // namespace checksum
@@ -64,8 +64,10 @@ void grabenseifner_allgather::compute(
   // TODO: Handle case when not all processes compute
 
   // allgather round
+  phase("allgather");
   mpi_timer(
       MPI_Allgather, appended_vecs, appended_vec_size, MPI_DOUBLE, receive_buf, appended_vec_size, MPI_DOUBLE, comm);
+  phase("outer-product");
   const int GRABENSEIFNER_BSIZE = 16;
   int row_idx_upper = my_start_row + my_n_rows;
   int row_idx_upper_blkd = row_idx_upper - GRABENSEIFNER_BSIZE;
@@ -164,6 +166,7 @@ void grabenseifner_allgather::compute(
   //    }
   //  }
 
+  phase("allgather-result");
   if (special_last_block) {
     // second allgather round matrix prefix
     mpi_timer(MPI_Allgather, &result_ptr[my_start_row * n_cols], my_block_size, MPI_DOUBLE, result_ptr, my_block_size,
@@ -6,20 +6,19 @@
 
 #include "grabenseifner_allgather/impl.hpp"
 
-// Number of bytes in a segment
-static constexpr int SEG_SIZE = 4096;
-// Number of elements in a segment
-static constexpr int SEG_EL = SEG_SIZE / sizeof(double);
-
-static_assert(SEG_SIZE % sizeof(double) == 0);
-
 namespace impls::grabenseifner_allgather_segmented {
 
+// Default number of bytes in a segment, a multiple of sizeof(double) (overwritten in main)
+int SEGMENTED_SEG_SIZE = 4096;
+
 /**
  * Generalized Rabenseifner using two allgather rounds with pipelining
  */
 void grabenseifner_allgather_segmented::compute(
     const std::vector<vector>& a_in, const std::vector<vector>& b_in, matrix& result) {
+  // Number of elements in a segment
+  const int SEG_EL = SEGMENTED_SEG_SIZE / sizeof(double);
+
   const auto& a = a_in[rank];
   const auto& b = b_in[rank];
 
@@ -34,9 +33,14 @@ void grabenseifner_allgather_segmented::compute(
    * If the sent vector size is smaller than the number of elements in a segment, we can just as well use the
    * non-segmented implementation
    */
-  if (b.size() < SEG_EL) {
+  if (n_cols < SEG_EL) {
     grabenseifner_allgather::grabenseifner_allgather impl(comm, rank, num_procs, N, M);
     impl.compute(a_in, b_in, result);
+
+    // Report the timings of the delegate as our own
+    impl.end_phase();
+    phase_times = impl.get_phase_times();
+    mpi_time += impl.get_mpi_time();
     return;
   }
 
@@ -85,6 +89,8 @@ void grabenseifner_allgather_segmented::compute(
 
   // allgather round
 
+  phase("allgather");
+
   // First receive the A vectors
   // TODO use blocking allgather with the smaller vector
   mpi_timer(MPI_Allgather, a.data(), a.size(), MPI_DOUBLE, all_as.data(), a.size(), MPI_DOUBLE, comm);
@@ -100,6 +106,8 @@ void grabenseifner_allgather_segmented::compute(
     last_segment_elements = SEG_EL;
   }
 
+  // Computation overlaps with the allgather of the following segment
+  phase("segmented-outer-product");
   for (int seg_i = 0; seg_i < num_segments; seg_i++) {
     bool is_last = seg_i == num_segments - 1;
     // Index in all_bs where this segment starts
@@ -132,6 +140,7 @@ void grabenseifner_allgather_segmented::compute(
     }
   }
 
+  phase("allgather-result");
   if (special_last_block) {
     // second allgather round matrix prefix
     mpi_timer(MPI_Allgather, &result.get(my_start_row, 0), my_block_size, MPI_DOUBLE, result.get_ptr(), my_block_size,
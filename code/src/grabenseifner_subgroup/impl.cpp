@@ -43,6 +43,7 @@ void grabenseifner_subgroup::compute(const std::vector<vector>& a_in, const std:
   // build the communicators for the individual groups
   int color = rank % N_GROUPS;
 
+  phase("comm-split");
   MPI_Comm subgroup;
   MPI_Comm_split(comm, color, rank, &subgroup);
   int subgroup_rank, subgroup_num_procs;
@@ -95,10 +96,12 @@ void grabenseifner_subgroup::compute(const std::vector<vector>& a_in, const std:
   // TODO: Handle case when not all processes compute
 
   // allgather round (between all processes)
+  phase("allgather");
   mpi_timer(
       MPI_Allgather, appended_vecs, appended_vec_size, MPI_DOUBLE, receive_buf, appended_vec_size, MPI_DOUBLE, comm);
 
   // start computing the local problem
+  phase("outer-product");
   const int GRABENSEIFNER_BSIZE = 16;
   int row_idx_upper = my_start_row + my_n_rows;
   int row_idx_upper_blkd = row_idx_upper - GRABENSEIFNER_BSIZE;
@@ -198,6 +201,7 @@ void grabenseifner_subgroup::compute(const std::vector<vector>& a_in, const std:
   //  }
 
   // allgather round inside the subgroup
+  phase("subgroup-allgather");
   if (special_last_block) {
     // second allgather round matrix prefix
     mpi_timer(MPI_Allgather, &result_ptr[my_start_row * n_cols], my_block_size, MPI_DOUBLE, result_ptr, my_block_size,
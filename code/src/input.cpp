@@ -0,0 +1,37 @@
+#include "input.hpp"
+
+#include <limits>
+#include <stdexcept>
+
+input_source::input_source(uint64_t seed, int n, double density)
+    : seed(seed), n(n), density(density), generated(std::make_unique<random_vectors>(seed, n, density)) {}
+
+input_source::input_source(const std::string& path) : file(std::make_unique<npy_reader>(path)) {
+  if (file->columns() > static_cast<size_t>(std::numeric_limits<int>::max())) {
+    throw std::runtime_error("Vectors of '" + path + "' are too large");
+  }
+
+  n = static_cast<int>(file->columns());
+}
+
+int input_source::count() const {
+  if (file) {
+    return static_cast<int>(file->rows());
+  }
+
+  return std::numeric_limits<int>::max();
+}
+
+vector input_source::get(int i) {
+  if (file) {
+    const double* row = file->row(i);
+    return vector(row, row + n);
+  }
+
+  if (i < generated->position()) {
+    generated = std::make_unique<random_vectors>(seed, n, density);
+  }
+
+  generated->skip(i - generated->position());
+  return generated->next();
+}
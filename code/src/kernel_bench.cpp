@@ -0,0 +1,253 @@
+#include <getopt.h>
+#include <mpi.h>
+
+#include <algorithm>
+#include <chrono>
+#include <iomanip>
+#include <iostream>
+#include <limits>
+#include <nlohmann/json.hpp>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#include "common.h"
+#include "kernels.hpp"
+#include "util.hpp"
+#include "vector.h"
+
+/**
+ * Times the local outer product kernels (see kernels.hpp) in isolation. Every process updates its own n x m matrix with
+ * the outer product of its input vectors, the same vectors `main` generates, such that processes sharing a node compete
+ * for its memory bandwidth like the ranks of an implementation. The output is a json line per iteration in the format
+ * of `main` (see notes/Output_Format.md), with the kernel as the implementation `kernel-<name>`.
+ */
+
+struct settings {
+  std::string name;
+  int N{0};
+  int M{0};
+  int num_iterations{1};
+  int repetition{0};
+  int threads{1};
+  bool validate{false};
+  std::string placement;
+};
+
+using json = nlohmann::json;
+
+// Prefix of the implementation names of the kernels
+static const std::string PREFIX = "kernel-";
+
+// Accepted relative error of a validated result in multiples of the machine epsilon
+#define TOLERANCE_EPSILONS 1e4
+
+static void print_usage(const char* exec) {
+  fprintf(stderr, "Usage: %s -n N -m M [-hc] [-t iterations] [-r repetition] [-p threads=T] [-P placement] -i name\n",
+      exec);
+  fprintf(stderr, "\n");
+  fprintf(stderr, "  -h        Display this help and exit\n");
+  fprintf(stderr, "  -c        Check results against the naive kernel\n");
+  fprintf(stderr, "  -n        Size of vector A\n");
+  fprintf(stderr, "  -m        Size of vector B\n");
+  fprintf(stderr, "  -i        Name of the kernel to run, one of {");
+  const auto names = kernels::names();
+  for (size_t i = 0; i < names.size(); i++) {
+    fprintf(stderr, "%s%s%s", i > 0 ? ", " : "", PREFIX.c_str(), names[i].c_str());
+  }
+  fprintf(stderr, "}\n");
+  fprintf(stderr, "  -t        Number of iterations (default: 1)\n");
+  fprintf(stderr, "  -r        Repetition number (default: 0)\n");
+  fprintf(stderr, "  -p        threads=T, number of threads every process runs the kernel on (default: 1)\n");
+  fprintf(stderr, "  -P, --placement\n");
+  fprintf(stderr, "            Label of the process placement (e.g. mpirun mapping), echoed in the output\n");
+}
+
+static settings parse_cmdline(int argc, char** argv) {
+  settings s;
+
+  static const option long_options[] = {
+      {"placement", required_argument, nullptr, 'P'},
+      {nullptr, 0, nullptr, 0},
+  };
+
+  int opt;
+  while ((opt = getopt_long(argc, argv, "hn:m:i:ct:r:p:P:", long_options, nullptr)) != -1) {
+    switch (opt) {
+      case 'n':
+        s.N = std::stoi(optarg);
+        break;
+      case 'm':
+        s.M = std::stoi(optarg);
+        break;
+      case 't':
+        s.num_iterations = std::stoi(optarg);
+        break;
+      case 'r':
+        s.repetition = std::stoi(optarg);
+        break;
+      case 'p': {
+        std::string param(optarg);
+        auto separator = param.find('=');
+        if (separator == std::string::npos || param.substr(0, separator) != "threads") {
+          fprintf(stderr, "Parameter '%s' is not of the form threads=value\n", optarg);
+          exit(EXIT_FAILURE);
+        }
+        s.threads = std::stoi(param.substr(separator + 1));
+        break;
+      }
+      case 'c':
+        s.validate = true;
+        break;
+      case 'i':
+        s.name = std::string(optarg);
+        break;
+      case 'P':
+        s.placement = std::string(optarg);
+        break;
+      case 'h':
+        print_usage(argv[0]);
+        exit(EXIT_SUCCESS);
+      default: /* '?' */
+        print_usage(argv[0]);
+        exit(EXIT_FAILURE);
+    }
+  }
+
+  if (optind < argc) {
+    fprintf(stderr, "Unexpected argument '%s'\n", argv[optind]);
+    exit(EXIT_FAILURE);
+  }
+
+  if (s.N <= 0 || s.M <= 0 || s.name.empty() || s.num_iterations <= 0 || s.repetition < 0) {
+    print_usage(argv[0]);
+    exit(EXIT_FAILURE);
+  }
+
+  if (s.threads < 1) {
+    fprintf(stderr, "Invalid value %d for parameter 'threads'\n", s.threads);
+    exit(EXIT_FAILURE);
+  }
+
+  return s;
+}
+
+static std::string current_timestamp() {
+  auto itt = std::chrono::system_clock::to_time_t(std::chrono::system_clock::now());
+  std::ostringstream ss;
+  ss << std::put_time(localtime(&itt), "%FT%TZ%z");
+  return ss.str();
+}
+
+static double squared_norm(const std::vector<double>& x) {
+  double norm = 0;
+  for (double v : x) {
+    norm += v * v;
+  }
+
+  return norm;
+}
+
+int main(int argc, char* argv[]) {
+  const settings s = parse_cmdline(argc, argv);
+  const std::string timestamp = current_timestamp();
+
+  kernels::kernel kernel;
+  try {
+    if (s.name.rfind(PREFIX, 0) != 0) {
+      throw std::runtime_error("Kernel names start with " + PREFIX);
+    }
+    kernel = kernels::get(s.name.substr(PREFIX.size()));
+  } catch (const std::runtime_error& e) {
+    fprintf(stderr, "%s\n", e.what());
+    exit(EXIT_FAILURE);
+  }
+
+  MPI_Init(&argc, &argv);
+  int numprocs, rank;
+  MPI_Comm_size(MPI_COMM_WORLD, &numprocs);
+  MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+
+  MPI_Comm node_comm;
+  int node_size, ranks_per_node;
+  MPI_Comm_split_type(MPI_COMM_WORLD, MPI_COMM_TYPE_SHARED, rank, MPI_INFO_NULL, &node_comm);
+  MPI_Comm_size(node_comm, &node_size);
+  MPI_Comm_free(&node_comm);
+  MPI_Allreduce(&node_size, &ranks_per_node, 1, MPI_INT, MPI_MAX, MPI_COMM_WORLD);
+
+  // The inputs of rank i in main (seed 0 for A, 1 for B)
+  const auto a = get_random_vector(0, s.N, rank);
+  const auto b = get_random_vector(1, s.M, rank);
+  std::vector<double> result(static_cast<size_t>(s.N) * s.M);
+
+  // Errors are squared norms of the differences, accepted relative to the norm of the reference like in `main`
+  std::vector<double> reference;
+  double max_error = 0;
+  if (s.validate) {
+    reference.assign(result.size(), 0);
+    kernels::naive(reference.data(), a.data(), s.N, b.data(), s.M);
+    const double tolerance = TOLERANCE_EPSILONS * std::numeric_limits<double>::epsilon();
+    const double norm = squared_norm(reference);
+    max_error = tolerance * tolerance * (norm > 0 ? norm : 1);
+  }
+
+  for (int iter = 0; iter < s.num_iterations; iter++) {
+    std::fill(result.begin(), result.end(), 0);
+
+    MPI_Barrier(MPI_COMM_WORLD);
+    int64_t t = timer_run([&]() { kernels::run(kernel, s.threads, result.data(), a.data(), s.N, b.data(), s.M); });
+
+    std::vector<int64_t> runtimes(rank == ROOT ? numprocs : 0);
+    MPI_Gather(&t, 1, MPI_INT64_T, runtimes.data(), 1, MPI_INT64_T, ROOT, MPI_COMM_WORLD);
+
+    std::vector<double> errors(rank == ROOT ? numprocs : 0);
+    if (s.validate) {
+      for (size_t i = 0; i < result.size(); i++) {
+        result[i] -= reference[i];
+      }
+      const double error = squared_norm(result);
+      if (!(error <= max_error)) {
+        fprintf(stderr, "Result of rank %d does not match the naive kernel: error=%g\n", rank, error);
+        MPI_Abort(MPI_COMM_WORLD, EXIT_FAILURE);
+      }
+      MPI_Gather(&error, 1, MPI_DOUBLE, errors.data(), 1, MPI_DOUBLE, ROOT, MPI_COMM_WORLD);
+    }
+
+    if (rank != ROOT) {
+      continue;
+    }
+
+    const int64_t runtime = *std::max_element(runtimes.begin(), runtimes.end());
+    json dump = {
+        {"timestamp", timestamp},
+        {"name", s.name},
+        {"N", s.N},
+        {"M", s.M},
+        {"density", 1.0},
+        {"dtype", "float64"},
+        {"numprocs", numprocs},
+        {"num_iterations", s.num_iterations},
+        {"iteration", iter},
+        {"repetition", s.repetition},
+        {"placement", s.placement},
+        {"ranks_per_node", ranks_per_node},
+        {"params", {{"threads", s.threads}}},
+        {"runtime", runtime},
+        {"runtime_mpi", 0},
+        {"runtime_compute", runtime},
+        {"runtimes", runtimes},
+        {"runtimes_mpi", std::vector<int64_t>(numprocs, 0)},
+        {"runtimes_compute", runtimes},
+        {"phases", json::object()},
+    };
+    if (s.validate) {
+      dump["errors"] = errors;
+    }
+
+    std::cout << dump << std::endl;
+  }
+
+  MPI_Finalize();
+  return 0;
+}
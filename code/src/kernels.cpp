@@ -0,0 +1,121 @@
+#include "kernels.hpp"
+
+#include <immintrin.h>
+
+#include <algorithm>
+#include <map>
+#include <stdexcept>
+#include <thread>
+
+#ifdef DSOP_BLAS
+// Fortran interface, such that any BLAS works without a cblas header
+extern "C" void dger_(const int* m, const int* n, const double* alpha, const double* x, const int* incx,
+    const double* y, const int* incy, double* a, const int* lda);
+#endif
+
+namespace kernels {
+
+void naive(double* c, const double* a, size_t n, const double* b, size_t m) {
+  for (size_t i = 0; i < n; i++) {
+    for (size_t j = 0; j < m; j++) {
+      c[i * m + j] += a[i] * b[j];
+    }
+  }
+}
+
+void blocked(double* c, const double* a, size_t n, const double* b, size_t m) {
+  for (size_t start = 0; start < m; start += BLOCK_COLUMNS) {
+    const size_t end = std::min(start + BLOCK_COLUMNS, m);
+    for (size_t i = 0; i < n; i++) {
+      double* row = c + i * m;
+      for (size_t j = start; j < end; j++) {
+        row[j] += a[i] * b[j];
+      }
+    }
+  }
+}
+
+void avx2(double* c, const double* a, size_t n, const double* b, size_t m) {
+#ifdef __AVX2__
+  const size_t vectorized = m - m % 4;
+  for (size_t i = 0; i < n; i++) {
+    double* row = c + i * m;
+    const __m256d a_i = _mm256_set1_pd(a[i]);
+
+    for (size_t j = 0; j < vectorized; j += 4) {
+      _mm256_storeu_pd(row + j, _mm256_fmadd_pd(a_i, _mm256_loadu_pd(b + j), _mm256_loadu_pd(row + j)));
+    }
+    for (size_t j = vectorized; j < m; j++) {
+      row[j] += a[i] * b[j];
+    }
+  }
+#else
+  naive(c, a, n, b, m);
+#endif
+}
+
+#ifdef DSOP_BLAS
+void blas(double* c, const double* a, size_t n, const double* b, size_t m) {
+  // The row-major n x m matrix is the column-major m x n matrix c^T += b a^T
+  const int rows = static_cast<int>(m);
+  const int columns = static_cast<int>(n);
+  const double alpha = 1;
+  const int inc = 1;
+  dger_(&rows, &columns, &alpha, b, &inc, a, &inc, c, &rows);
+}
+#endif
+
+static const std::map<std::string, kernel>& all() {
+  static const std::map<std::string, kernel> kernels = {
+      {"naive", naive},
+      {"blocked", blocked},
+      {"avx2", avx2},
+#ifdef DSOP_BLAS
+      {"blas", blas},
+#endif
+  };
+
+  return kernels;
+}
+
+std::vector<std::string> names() {
+  std::vector<std::string> out;
+  for (const auto& [name, _] : all()) {
+    out.push_back(name);
+  }
+
+  return out;
+}
+
+kernel get(const std::string& name) {
+  const auto it = all().find(name);
+  if (it == all().end()) {
+    std::string known;
+    for (const auto& n : names()) {
+      known += (known.empty() ? "" : ", ") + n;
+    }
+    throw std::runtime_error("Unknown kernel " + name + " (available: " + known + ")");
+  }
+
+  return it->second;
+}
+
+void run(kernel k, int threads, double* c, const double* a, size_t n, const double* b, size_t m) {
+  if (threads <= 1) {
+    k(c, a, n, b, m);
+    return;
+  }
+
+  std::vector<std::thread> workers;
+  const size_t rows = (n + threads - 1) / threads;
+  for (size_t start = 0; start < n; start += rows) {
+    const size_t count = std::min(rows, n - start);
+    workers.emplace_back(k, c + start * m, a + start, count, b, m);
+  }
+
+  for (auto& worker : workers) {
+    worker.join();
+  }
+}
+
+} // namespace kernels
@@ -1,3 +1,4 @@
+#include <getopt.h>
 #include <mpi.h>
 #include <unistd.h>
 
@@ -5,17 +6,23 @@
 #include <cassert>
 #include <chrono>
 #include <cmath>
+#include <fstream>
 #include <iomanip>
 #include <iostream>
 #include <iterator>
+#include <limits>
+#include <map>
 #include <memory>
 #include <nlohmann/json.hpp>
 #include <sstream>
+#include <string>
+#include <tuple>
 #include <type_traits>
 #include <vector>
 
 #include "allgather/impl.hpp"
 #include "allgather_async/impl.hpp"
+#include "allgather_sparse/impl.hpp"
 #include "allreduce/impl.hpp"
 #include "allreduce_butterfly/impl.hpp"
 #include "allreduce_butterfly_segmented/impl.hpp"
@@ -23,55 +30,164 @@
 #include "allreduce_ring/impl.hpp"
 #include "allreduce_ring_pipeline/impl.hpp"
 #include "bruck_async/impl.hpp"
+#include "checksum.hpp"
+#include "dsop.h"
 #include "dsop_single.h"
 #include "grabenseifner_allgather/impl.hpp"
 #include "grabenseifner_allgather_segmented/impl.hpp"
 #include "grabenseifner_subgroup/impl.hpp"
+#include "input.hpp"
+#include "npy.hpp"
+#ifdef DSOP_PROFILER
+#include "profiler.hpp"
+#endif
 #include "rabenseifner_gather/impl.hpp"
 #include "util.hpp"
 #include "vector.h"
 
 struct settings {
   std::string name;
-  int N;
-  int M;
+  int N{0};
+  int M{0};
+  double density{1.0};
   std::string timestamp;
   bool verbose{false};
   bool validate{false};
+  bool checksum{false}; // distributed validation with checksums instead of the full matrices
   int rank;
   bool is_root;
   int numprocs;
   MPI_Comm COMM;
   int num_iterations{1};
-  int repetition; // when running the entire binary multiple times
+  int repetition{0}; // when running the entire binary multiple times
+  std::string output_format{"json"};
+  std::string output_file; // only used for binary output formats
+  bool trace{false};
+  std::string placement;               // label of the process placement, only echoed in the output
+  int ranks_per_node{1};               // largest number of processes sharing a node
+  int64_t clock_offset{0};             // added to local timestamps to get the time on root, only measured in trace mode
+  std::map<std::string, int> params;   // tunable parameters of the implementation
+  std::string batch_file;              // configurations to run in the same MPI session, `-` for stdin
+  std::string input_a;                 // .npy file with the vectors A of all processes instead of random ones
+  std::string input_b;                 // .npy file with the vectors B of all processes instead of random ones
+  precision dtype{precision::float64}; // precision the implementation communicates and accumulates in
 };
 
 using json = nlohmann::json;
 
-#define EPS 1e-5
+// Accepted relative error of a validated result in multiples of the machine epsilon of its precision
+#define TOLERANCE_EPSILONS 1e4
+
+// Seed of the projection vector of the first iteration in checksum mode, incremented for every iteration
+#define CHECKSUM_SEED 2
+
+// Number of ping-pongs with root to estimate the clock offset of a process in trace mode
+#define CLOCK_SYNC_ROUNDS 20
+
+// Per-rank resource usage of an iteration, in the order of the fields of `resource_usage`
+static const char* const RESOURCE_KEYS[] = {"max_rss", "cpu_user", "cpu_system", "ctx_voluntary", "ctx_involuntary"};
+
+// Per-rank counters of an MPI function in profiled builds, in the order of the fields of `profiler::call_stats`
+static const char* const COMM_KEYS[] = {"calls", "bytes", "time"};
+
+// Per-rank timings of an iteration, in the order they are stored in binary output files
+static const char* const TIMING_KEYS[] = {"runtimes", "runtimes_mpi", "runtimes_compute"};
 
 static void print_usage(const char* exec) {
-  fprintf(stderr, "Usage: %s -n N -m M [-hvc] [-t iterations] -i name\n", exec);
+  fprintf(stderr,
+      "Usage: %s -n N -m M [-hvcCT] [-d density] [-t iterations] [-f format -o file] [-P placement] [-p "
+      "param=value]... "
+      "[-D dtype] -i name\n"
+      "       %s [options]... -b file\n",
+      exec, exec);
   fprintf(stderr, "\n");
   fprintf(stderr, "  -h        Display this help and exit\n");
   fprintf(stderr, "  -v        Verbose mode\n");
   fprintf(stderr, "  -c        Check results against sequential implementation\n");
+  fprintf(stderr, "  -C, --checksum\n");
+  fprintf(stderr, "            Check results with per-process checksums, without gathering the full matrices\n");
   fprintf(stderr, "  -n        Size of vector A\n");
   fprintf(stderr, "  -m        Size of vector B\n");
+  fprintf(stderr, "  -d        Fraction of non-zero entries in A and B, in (0, 1] (default: 1)\n");
   fprintf(stderr, "  -i        Name of implementation to run\n");
   fprintf(stderr, "  -t        Number of iterations (default: 1)\n");
   fprintf(stderr, "  -r        Repetition number (default: 0)\n");
+  fprintf(stderr, "  -p        Set a tunable parameter of the implementation, can be repeated\n");
+  fprintf(
+      stderr, "            (n_groups for g-rabenseifner-subgroup, seg_size in bytes for segmented implementations)\n");
+  fprintf(stderr, "  -f, --output-format\n");
+  fprintf(stderr, "            Output format of the per-rank timings, one of {json, npy} (default: json)\n");
+  fprintf(stderr, "  -o, --output-file\n");
+  fprintf(stderr, "            File the per-rank timings are written to (required for npy)\n");
+  fprintf(stderr, "  -D, --dtype\n");
+  fprintf(stderr, "            Precision of the communication and accumulation, one of {float64, float32, mixed}\n");
+  fprintf(stderr, "            (mixed communicates float32 and accumulates float64, default: float64)\n");
+  fprintf(stderr, "  -T, --trace\n");
+  fprintf(stderr, "            Record clock-synchronized timestamps of every process\n");
+  fprintf(stderr, "  -P, --placement\n");
+  fprintf(stderr, "            Label of the process placement (e.g. mpirun mapping), echoed in the output\n");
+  fprintf(stderr, "  --input-a, --input-b\n");
+  fprintf(stderr, "            Read the vectors A or B of all processes from a .npy file (float64, one row per\n");
+  fprintf(stderr, "            process) instead of generating them, -n or -m default to the size of its rows\n");
+  fprintf(stderr, "  -b, --batch\n");
+  fprintf(
+      stderr, "            Run the configurations in this file (- for stdin) in the same MPI session, one line of\n");
+  fprintf(stderr, "            options per configuration, the other options are the defaults of every line\n");
+}
+
+/**
+ * Tunable parameter `param` of the implementation `name`, or nullptr if it has no such parameter.
+ */
+static int* get_param(const std::string& name, const std::string& param) {
+  // g-rabenseifner-subgroup-<n> fixes the number of groups by its name
+  if (name == "g-rabenseifner-subgroup" && param == "n_groups") {
+    return &impls::grabenseifner_subgroup::SUBGROUP_N_GROUPS;
+  } else if (name == "g-rabenseifner-allgather-segmented" && param == "seg_size") {
+    return &impls::grabenseifner_allgather_segmented::SEGMENTED_SEG_SIZE;
+  } else if (name == "allreduce-butterfly-segmented" && param == "seg_size") {
+    return &impls::allreduce_butterfly_segmented::BUTTERFLY_SEG_SIZE;
+  } else if (name == "allreduce-ring-pipeline" && param == "seg_size") {
+    return &impls::allreduce::RING_PIPELINE_SEG_SIZE;
+  }
+
+  return nullptr;
 }
 
-static settings parse_cmdline(int argc, char** argv) {
-  settings s;
+// All tunable parameters of `get_param`, including the number of groups set by the name of the subgroup implementation
+static int* const TUNABLE_PARAMS[] = {
+    &impls::grabenseifner_subgroup::SUBGROUP_N_GROUPS,
+    &impls::grabenseifner_allgather_segmented::SEGMENTED_SEG_SIZE,
+    &impls::allreduce_butterfly_segmented::BUTTERFLY_SEG_SIZE,
+    &impls::allreduce::RING_PIPELINE_SEG_SIZE,
+};
+
+/**
+ * Parses the options in `argv` on top of the settings `s`, the defaults of every configuration in batch mode.
+ */
+static settings parse_cmdline(int argc, char** argv, settings s = settings{}) {
+  bool has_N = s.N > 0;
+  bool has_M = s.M > 0;
 
-  bool has_N = false;
-  bool has_M = false;
+  bool has_impl = !s.name.empty();
+
+  static const option long_options[] = {
+      {"output-format", required_argument, nullptr, 'f'},
+      {"output-file", required_argument, nullptr, 'o'},
+      {"trace", no_argument, nullptr, 'T'},
+      {"checksum", no_argument, nullptr, 'C'},
+      {"placement", required_argument, nullptr, 'P'},
+      {"batch", required_argument, nullptr, 'b'},
+      {"input-a", required_argument, nullptr, 'A'},
+      {"input-b", required_argument, nullptr, 'B'},
+      {"dtype", required_argument, nullptr, 'D'},
+      {nullptr, 0, nullptr, 0},
+  };
+
+  // Parsed once per configuration in batch mode, resets the state of getopt
+  optind = 0;
 
-  bool has_impl = false;
   int opt;
-  while ((opt = getopt(argc, argv, "hn:m:vi:ct:r:")) != -1) {
+  while ((opt = getopt_long(argc, argv, "hn:m:d:vi:cCt:r:p:f:o:TP:b:D:", long_options, nullptr)) != -1) {
     switch (opt) {
       case 'n':
         has_N = true;
@@ -83,6 +199,10 @@ static settings parse_cmdline(int argc, char** argv) {
         s.M = std::stoi(optarg);
         assert(s.M > 0);
         break;
+      case 'd':
+        s.density = std::stod(optarg);
+        assert(s.density > 0 && s.density <= 1);
+        break;
       case 't':
         s.num_iterations = std::stoi(optarg);
         assert(s.num_iterations > 0);
@@ -91,9 +211,22 @@ static settings parse_cmdline(int argc, char** argv) {
         s.repetition = std::stoi(optarg);
         assert(s.repetition >= 0);
         break;
+      case 'p': {
+        std::string param(optarg);
+        auto separator = param.find('=');
+        if (separator == std::string::npos) {
+          fprintf(stderr, "Parameter '%s' is not of the form name=value\n", optarg);
+          exit(EXIT_FAILURE);
+        }
+        s.params[param.substr(0, separator)] = std::stoi(param.substr(separator + 1));
+        break;
+      }
       case 'c':
         s.validate = true;
         break;
+      case 'C':
+        s.checksum = true;
+        break;
       case 'i':
         has_impl = true;
         s.name = std::string(optarg);
@@ -101,6 +234,35 @@ static settings parse_cmdline(int argc, char** argv) {
       case 'v':
         s.verbose = true;
         break;
+      case 'f':
+        s.output_format = std::string(optarg);
+        break;
+      case 'o':
+        s.output_file = std::string(optarg);
+        break;
+      case 'T':
+        s.trace = true;
+        break;
+      case 'P':
+        s.placement = std::string(optarg);
+        break;
+      case 'b':
+        s.batch_file = std::string(optarg);
+        break;
+      case 'A':
+        s.input_a = std::string(optarg);
+        break;
+      case 'D':
+        try {
+          s.dtype = parse_precision(optarg);
+        } catch (const std::runtime_error& e) {
+          fprintf(stderr, "%s\n", e.what());
+          exit(EXIT_FAILURE);
+        }
+        break;
+      case 'B':
+        s.input_b = std::string(optarg);
+        break;
       case 'h':
         print_usage(argv[0]);
         exit(EXIT_SUCCESS);
@@ -110,21 +272,72 @@ static settings parse_cmdline(int argc, char** argv) {
     }
   }
 
+  if (optind < argc) {
+    fprintf(stderr, "Unexpected argument '%s'\n", argv[optind]);
+    exit(EXIT_FAILURE);
+  }
+
+  // The configurations of a batch are checked once they are read
+  if (!s.batch_file.empty()) {
+    return s;
+  }
+
+  for (auto [file, size, option] : {std::tuple{s.input_a, &s.N, 'n'}, std::tuple{s.input_b, &s.M, 'm'}}) {
+    if (file.empty()) {
+      continue;
+    }
+
+    const int columns = input_source(file).size();
+    if (*size > 0 && *size != columns) {
+      fprintf(stderr, "Input file '%s' has vectors of size %d, not %d (-%c)\n", file.c_str(), columns, *size, option);
+      exit(EXIT_FAILURE);
+    }
+    *size = columns;
+  }
+  has_N = has_N || s.N > 0;
+  has_M = has_M || s.M > 0;
+
   if (!has_N || !has_M || !has_impl) {
     print_usage(argv[0]);
     exit(EXIT_FAILURE);
   }
 
+  if (s.output_format != "json" && s.output_format != "npy") {
+    fprintf(stderr, "Unknown output format '%s'\n", s.output_format.c_str());
+    exit(EXIT_FAILURE);
+  }
+
+  if (s.output_format == "npy" && s.output_file.empty()) {
+    fprintf(stderr, "Output format '%s' requires an output file (-o)\n", s.output_format.c_str());
+    exit(EXIT_FAILURE);
+  }
+
+  for (const auto& [param, value] : s.params) {
+    if (get_param(s.name, param) == nullptr) {
+      fprintf(stderr, "Implementation '%s' has no parameter '%s'\n", s.name.c_str(), param.c_str());
+      exit(EXIT_FAILURE);
+    }
+
+    if (value < 1 || (param == "seg_size" && value % sizeof(double) != 0)) {
+      fprintf(stderr, "Invalid value %d for parameter '%s'\n", value, param.c_str());
+      exit(EXIT_FAILURE);
+    }
+  }
+
   return s;
 }
 
-settings prepare(int argc, char** argv) {
-  settings s = parse_cmdline(argc, argv);
-
+static std::string current_timestamp() {
   auto itt = std::chrono::system_clock::to_time_t(std::chrono::system_clock::now());
   std::ostringstream ss;
   ss << std::put_time(localtime(&itt), "%FT%TZ%z");
-  s.timestamp = ss.str();
+  return ss.str();
+}
+
+settings prepare(int argc, char** argv) {
+  settings s = parse_cmdline(argc, argv);
+
+  s.timestamp = current_timestamp();
   s.COMM = MPI_COMM_WORLD;
 
   MPI_Init(&argc, &argv);
@@ -133,9 +346,118 @@ settings prepare(int argc, char** argv) {
 
   s.is_root = s.rank == ROOT;
 
+  // Processes on the same node share memory, the largest such group is the effective number of ranks per node
+  MPI_Comm node_comm;
+  int node_size;
+  MPI_Comm_split_type(s.COMM, MPI_COMM_TYPE_SHARED, s.rank, MPI_INFO_NULL, &node_comm);
+  MPI_Comm_size(node_comm, &node_size);
+  MPI_Comm_free(&node_comm);
+  MPI_Allreduce(&node_size, &s.ranks_per_node, 1, MPI_INT, MPI_MAX, s.COMM);
+
   return s;
 }
 
+/**
+ * Reads the configurations of the batch file of `s` on root and broadcasts them, such that stdin only has to be
+ * forwarded to root. Every non-empty line not starting with `#` holds the options of a configuration, parsed on top of
+ * the options passed on the command line.
+ */
+static std::vector<settings> read_batch(const settings& s, const char* exec) {
+  std::string content;
+  if (s.is_root) {
+    std::ifstream file;
+    if (s.batch_file != "-") {
+      file.open(s.batch_file);
+      if (!file) {
+        fprintf(stderr, "Cannot open batch file '%s'\n", s.batch_file.c_str());
+        MPI_Abort(s.COMM, EXIT_FAILURE);
+      }
+    }
+
+    std::istream& in = s.batch_file == "-" ? std::cin : file;
+    content.assign(std::istreambuf_iterator<char>(in), std::istreambuf_iterator<char>());
+  }
+
+  int64_t size = content.size();
+  MPI_Bcast(&size, 1, MPI_INT64_T, ROOT, s.COMM);
+  content.resize(size);
+  MPI_Bcast(&content[0], static_cast<int>(size), MPI_CHAR, ROOT, s.COMM);
+
+  settings defaults = s;
+  defaults.batch_file.clear();
+
+  std::vector<settings> configs;
+  std::istringstream lines(content);
+  std::string line;
+  while (std::getline(lines, line)) {
+    std::istringstream words(line);
+    std::vector<std::string> args{exec};
+    std::copy(
+        std::istream_iterator<std::string>(words), std::istream_iterator<std::string>(), std::back_inserter(args));
+
+    if (args.size() == 1 || args[1][0] == '#') {
+      continue;
+    }
+
+    std::vector<char*> argv;
+    for (auto& arg : args) {
+      argv.push_back(&arg[0]);
+    }
+    argv.push_back(nullptr);
+
+    // Invalid configurations fail on all processes before anything runs
+    configs.push_back(parse_cmdline(static_cast<int>(args.size()), argv.data(), defaults));
+    if (!configs.back().batch_file.empty()) {
+      fprintf(stderr, "Batch files cannot be nested\n");
+      exit(EXIT_FAILURE);
+    }
+  }
+
+  return configs;
+}
+
+/**
+ * Estimates the offset (in microseconds) that has to be added to the local clock to get the time on root.
+ *
+ * Every process exchanges CLOCK_SYNC_ROUNDS ping-pongs with root and assumes root answered halfway through the
+ * round trip. The round with the shortest round-trip time is used, as it bounds the error the tightest.
+ */
+static int64_t estimate_clock_offset(MPI_Comm COMM) {
+  int numprocs, rank;
+  MPI_Comm_size(COMM, &numprocs);
+  MPI_Comm_rank(COMM, &rank);
+
+  int64_t offset = 0;
+  int64_t best_rtt = std::numeric_limits<int64_t>::max();
+
+  for (int i = 0; i < numprocs; i++) {
+    if (i == ROOT) {
+      continue;
+    }
+
+    for (int round = 0; round < CLOCK_SYNC_ROUNDS; round++) {
+      if (rank == ROOT) {
+        MPI_Recv(nullptr, 0, MPI_BYTE, i, TAG_CLOCK_SYNC, COMM, MPI_STATUS_IGNORE);
+        int64_t now = wtime_us();
+        MPI_Send(&now, 1, MPI_INT64_T, i, TAG_CLOCK_SYNC, COMM);
+      } else if (rank == i) {
+        int64_t root_time;
+        timer t;
+        MPI_Send(nullptr, 0, MPI_BYTE, ROOT, TAG_CLOCK_SYNC, COMM);
+        MPI_Recv(&root_time, 1, MPI_INT64_T, ROOT, TAG_CLOCK_SYNC, COMM, MPI_STATUS_IGNORE);
+        int64_t rtt = t.finish();
+
+        if (rtt < best_rtt) {
+          best_rtt = rtt;
+          offset = root_time - (t.started() + rtt / 2);
+        }
+      }
+    }
+  }
+
+  return offset;
+}
+
 template <typename... Args>
 static std::unique_ptr<dsop> get_impl(const std::string& name, Args&&... args) {
   if (name == "allreduce") {
@@ -153,6 +475,8 @@ static std::unique_ptr<dsop> get_impl(const std::string& name, Args&&... args) {
     return std::make_unique<impls::allgather::allgather>(std::forward<Args>(args)...);
   } else if (name == "allgather-async") {
     return std::make_unique<impls::allgather_async::allgather_async>(std::forward<Args>(args)...);
+  } else if (name == "allgather-sparse") {
+    return std::make_unique<impls::allgather_sparse::allgather_sparse>(std::forward<Args>(args)...);
   } else if (name.rfind("allreduce-native-", 0) == 0) {
     return std::make_unique<impls::allreduce::allreduce>(std::forward<Args>(args)...);
   } else if (name.rfind("allgather-native-", 0) == 0) {
@@ -181,64 +505,257 @@ static std::unique_ptr<dsop> get_impl(const std::string& name, Args&&... args) {
 }
 
 static json prepare_json_dump(const settings& s, int iteration) {
-  return {
+  json dump = {
       {"timestamp", s.timestamp},
       {"name", s.name},
       {"N", s.N},
       {"M", s.M},
+      {"density", s.density},
+      {"dtype", precision_name(s.dtype)},
       {"numprocs", s.numprocs},
       {"num_iterations", s.num_iterations},
       {"iteration", iteration},
       {"repetition", s.repetition},
+      {"placement", s.placement},
+      {"ranks_per_node", s.ranks_per_node},
+      {"params", s.params},
   };
+
+  if (!s.input_a.empty()) {
+    dump["input_a"] = s.input_a;
+  }
+  if (!s.input_b.empty()) {
+    dump["input_b"] = s.input_b;
+  }
+
+  return dump;
 }
 
-static void run_iteration(std::unique_ptr<dsop> impl, matrix& result, MPI_Comm COMM, const std::vector<vector>& a_vec,
-    const std::vector<vector>& b_vec, json& result_dump) {
+/**
+ * Sends a json value of every process to root.
+ *
+ * On root, returns the values ordered by rank, on all other processes an empty list.
+ */
+static std::vector<json> gather_json(const json& local, MPI_Comm COMM) {
   int numprocs, rank;
   MPI_Comm_size(COMM, &numprocs);
   MPI_Comm_rank(COMM, &rank);
-  bool is_root = rank == ROOT;
+
+  std::vector<json> values;
+
+  if (rank != ROOT) {
+    const auto serialized = local.dump();
+    MPI_Send(serialized.data(), static_cast<int>(serialized.size()), MPI_CHAR, ROOT, TAG_TIMING, COMM);
+    return values;
+  }
+
+  for (int i = 0; i < numprocs; i++) {
+    if (i == rank) {
+      values.push_back(local);
+      continue;
+    }
+
+    MPI_Status status;
+    int count;
+    MPI_Probe(i, TAG_TIMING, COMM, &status);
+    MPI_Get_count(&status, MPI_CHAR, &count);
+
+    std::string serialized(count, '\0');
+    MPI_Recv(&serialized[0], count, MPI_CHAR, i, TAG_TIMING, COMM, MPI_STATUS_IGNORE);
+    values.push_back(json::parse(serialized));
+  }
+
+  return values;
+}
+
+/**
+ * Merges the trace timestamps of all processes into per-rank arrays. Phase entries are null for processes that never
+ * entered the phase.
+ */
+static json collect_trace(const std::vector<json>& all, int numprocs) {
+  json trace = json::object();
+  json phase_entries = json::object();
+
+  for (const auto* key : {"barrier_enter", "barrier_exit", "end", "clock_offset"}) {
+    trace[key] = json::array();
+  }
+
+  for (int i = 0; i < numprocs; i++) {
+    for (const auto* key : {"barrier_enter", "barrier_exit", "end", "clock_offset"}) {
+      trace[key].push_back(all[i]["trace"][key]);
+    }
+
+    for (const auto& p : all[i]["trace"]["phase_entries"].items()) {
+      if (!phase_entries.contains(p.key())) {
+        phase_entries[p.key()] = json::array();
+        for (int j = 0; j < numprocs; j++) {
+          phase_entries[p.key()].push_back(nullptr);
+        }
+      }
+      phase_entries[p.key()][i] = p.value();
+    }
+  }
+
+  trace["phase_entries"] = phase_entries;
+  return trace;
+}
+
+static void run_iteration(const settings& s, std::unique_ptr<dsop> impl, matrix& result,
+    const std::vector<vector>& a_vec, const std::vector<vector>& b_vec, json& result_dump) {
+  const auto COMM = s.COMM;
+  const int numprocs = s.numprocs;
 
   // Synchronize all processes before running the implementation
+  int64_t barrier_enter = wtime_us();
   MPI_Barrier(COMM);
-  int64_t t = timer_run([&]() { return impl->compute(a_vec, b_vec, result); });
-  int64_t mpi_time = impl->get_mpi_time();
+  int64_t barrier_exit = wtime_us();
+  const auto usage_start = resource_usage::now();
+#ifdef DSOP_PROFILER
+  profiler::reset();
+#endif
+  int64_t t = timer_run([&]() {
+    impl->compute(a_vec, b_vec, result);
+    impl->end_phase();
+  });
+  int64_t end = wtime_us();
+  const auto usage = resource_usage::now() - usage_start;
+#ifdef DSOP_PROFILER
+  const auto comm_stats = profiler::snapshot();
+#endif
+
+  json local = {
+      {"runtime", t},
+      {"runtime_mpi", impl->get_mpi_time()},
+      {"phases", json::object()},
+      {"rusage",
+          {usage.max_rss_kib, usage.user_us, usage.system_us, usage.voluntary_switches, usage.involuntary_switches}},
+  };
+  for (const auto& p : impl->get_phase_times()) {
+    local["phases"][p.name] = p.duration;
+  }
+
+#ifdef DSOP_PROFILER
+  local["comm"] = json::object();
+  for (const auto& [call, stats] : comm_stats) {
+    local["comm"][call] = {stats.calls, stats.bytes, stats.time_us};
+  }
+#endif
+
+  if (s.trace) {
+    // Timestamps on the clock of root
+    local["trace"] = {
+        {"barrier_enter", barrier_enter + s.clock_offset},
+        {"barrier_exit", barrier_exit + s.clock_offset},
+        {"end", end + s.clock_offset},
+        {"clock_offset", s.clock_offset},
+        {"phase_entries", json::object()},
+    };
+    for (const auto& p : impl->get_phase_times()) {
+      json entries = json::array();
+      for (const auto& e : p.entries) {
+        entries.push_back({e.start + s.clock_offset, e.duration});
+      }
+      local["trace"]["phase_entries"][p.name] = entries;
+    }
+  }
 
   // Collect all runtimes in root
-  if (is_root) {
-    std::vector<int64_t> timings(numprocs);
-    std::vector<int64_t> timings_mpi(numprocs);
-    std::vector<int64_t> timings_compute(numprocs);
+  auto all = gather_json(local, COMM);
+  if (all.empty()) {
+    return;
+  }
 
-    for (int i = 0; i < numprocs; i++) {
-      if (i == rank) {
-        timings[i] = t;
-        timings_mpi[i] = mpi_time;
-      } else {
-        MPI_Recv(&timings[i], 1, MPI_INT64_T, i, TAG_TIMING, COMM, MPI_STATUS_IGNORE);
-        MPI_Recv(&timings_mpi[i], 1, MPI_INT64_T, i, TAG_TIMING, COMM, MPI_STATUS_IGNORE);
+  std::vector<int64_t> timings(numprocs);
+  std::vector<int64_t> timings_mpi(numprocs);
+  std::vector<int64_t> timings_compute(numprocs);
+  json phases = json::object();
+  json rusage = json::object();
+  json comm = json::object();
+  for (const auto* key : RESOURCE_KEYS) {
+    rusage[key] = std::vector<int64_t>(numprocs, 0);
+  }
+
+  for (int i = 0; i < numprocs; i++) {
+    timings[i] = all[i]["runtime"].get<int64_t>();
+    timings_mpi[i] = all[i]["runtime_mpi"].get<int64_t>();
+    timings_compute[i] = timings[i] - timings_mpi[i];
+
+    // Processes may not enter every phase, those are reported with a duration of 0
+    for (const auto& p : all[i]["phases"].items()) {
+      if (!phases.contains(p.key())) {
+        phases[p.key()] = std::vector<int64_t>(numprocs, 0);
       }
+      phases[p.key()][i] = p.value();
+    }
 
-      timings_compute[i] = timings[i] - timings_mpi[i];
+    for (size_t k = 0; k < std::size(RESOURCE_KEYS); k++) {
+      rusage[RESOURCE_KEYS[k]][i] = all[i]["rusage"][k];
     }
 
-    fprintf(stderr, "time: %fs\n", t / 1e6);
+    // Processes may not call every MPI function, those are reported with 0
+    if (all[i].contains("comm")) {
+      for (const auto& c : all[i]["comm"].items()) {
+        if (!comm.contains(c.key())) {
+          for (const auto* key : COMM_KEYS) {
+            comm[c.key()][key] = std::vector<int64_t>(numprocs, 0);
+          }
+        }
+        for (size_t k = 0; k < std::size(COMM_KEYS); k++) {
+          comm[c.key()][COMM_KEYS[k]][i] = c.value()[k];
+        }
+      }
+    }
+  }
 
-    result_dump["runtimes"] = timings;
-    result_dump["runtimes_mpi"] = timings_mpi;
-    result_dump["runtimes_compute"] = timings_compute;
+  fprintf(stderr, "time: %fs\n", t / 1e6);
 
-    // Index of the slowest process
-    auto slowest = std::max_element(timings.begin(), timings.end()) - timings.begin();
+  result_dump["runtimes"] = timings;
+  result_dump["runtimes_mpi"] = timings_mpi;
+  result_dump["runtimes_compute"] = timings_compute;
+  result_dump["phases"] = phases;
+  result_dump["rusage"] = rusage;
+  if (!comm.empty()) {
+    result_dump["comm"] = comm;
+  }
 
-    result_dump["runtime"] = timings[slowest];
-    result_dump["runtime_mpi"] = timings_mpi[slowest];
-    result_dump["runtime_compute"] = timings_compute[slowest];
-  } else {
-    MPI_Send(&t, 1, MPI_INT64_T, ROOT, TAG_TIMING, COMM);
-    MPI_Send(&mpi_time, 1, MPI_INT64_T, ROOT, TAG_TIMING, COMM);
+  if (s.trace) {
+    result_dump["trace"] = collect_trace(all, numprocs);
   }
+
+  // Index of the slowest process
+  auto slowest = std::max_element(timings.begin(), timings.end()) - timings.begin();
+
+  result_dump["runtime"] = timings[slowest];
+  result_dump["runtime_mpi"] = timings_mpi[slowest];
+  result_dump["runtime_compute"] = timings_compute[slowest];
+}
+
+/**
+ * Moves the per-rank timings of an iteration from the json dump into the binary output file. The json dump keeps the
+ * runtimes of the slowest process and a reference to the file.
+ */
+static void dump_timings_npy(const settings& s, npy_writer& output, json& result_dump) {
+  std::vector<int64_t> row;
+  row.reserve(std::size(TIMING_KEYS) * s.numprocs);
+
+  for (const auto* key : TIMING_KEYS) {
+    const auto timings = result_dump[key].get<std::vector<int64_t>>();
+    row.insert(row.end(), timings.begin(), timings.end());
+    result_dump.erase(key);
+  }
+
+  output.write(row);
+  result_dump["runtimes_file"] = s.output_file;
+}
+
+/**
+ * Largest accepted relative error of a result computed in precision p. It is compared to the sequential result in
+ * float64, such that reduced precision adds its rounding errors to those of a different order of summation.
+ */
+static double tolerance(precision p) {
+  const double epsilon =
+      p == precision::float64 ? std::numeric_limits<double>::epsilon() : std::numeric_limits<float>::epsilon();
+  return TOLERANCE_EPSILONS * epsilon;
 }
 
 /**
@@ -251,6 +768,13 @@ static std::vector<double> run_validate_root(const settings& s, const matrix& re
 
   std::vector<double> errors;
 
+  // The errors are squared norms, accepted relative to the norm of the reference (or absolutely if it vanishes)
+  double reference_norm = 0;
+  for (size_t i = 0; i < reference_result.dimension(); i++) {
+    reference_norm += reference_result.get_ptr()[i] * reference_result.get_ptr()[i];
+  }
+  const double max_error = std::pow(tolerance(s.dtype), 2) * (reference_norm > 0 ? reference_norm : 1);
+
   for (int i = 0; i < s.numprocs; i++) {
     if (i != s.rank) {
       MPI_Recv(result.get_ptr(), result.dimension(), MPI_DOUBLE, i, TAG_VALIDATE, s.COMM, MPI_STATUS_IGNORE);
@@ -263,7 +787,7 @@ static std::vector<double> run_validate_root(const settings& s, const matrix& re
 
     double diff = nrm_sqr_diff(result.get_ptr(), reference_result.get_ptr(), reference_result.dimension());
 
-    if (diff > EPS) {
+    if (!(diff <= max_error)) {
       throw std::runtime_error("Result does not match sequential result: error=" + std::to_string(diff));
     }
 
@@ -278,9 +802,117 @@ static void run_validate_non_root(const settings& s, matrix& result) {
   MPI_Send(result.get_ptr(), result.dimension(), MPI_DOUBLE, ROOT, TAG_VALIDATE, s.COMM);
 }
 
-int main(int argc, char* argv[]) {
-  settings s = prepare(argc, argv);
+/**
+ * Compares the projection of the local result onto `x` to the expected projection and gathers the largest relative
+ * block error of every process on root, such that only a single double per process is communicated.
+ *
+ * On root, returns the errors of all processes
+ */
+static std::vector<double> run_validate_checksum(
+    const settings& s, const matrix& result, const vector& x, const std::vector<double>& expected) {
+  double error = checksum::max_block_error(checksum::actual(result, x), expected);
+
+  std::vector<double> errors(s.is_root ? s.numprocs : 0);
+  MPI_Gather(&error, 1, MPI_DOUBLE, errors.data(), 1, MPI_DOUBLE, ROOT, s.COMM);
+
+  if (s.is_root) {
+    for (int i = 0; i < s.numprocs; i++) {
+      // Comparisons do not reliably reject NaN with -ffast-math
+      if (!checksum::is_finite(errors[i]) || errors[i] > tolerance(s.dtype)) {
+        throw std::runtime_error(
+            "Checksum of rank " + std::to_string(i) + " does not match: error=" + std::to_string(errors[i]));
+      }
+    }
+
+    std::cerr << "Checksum validation successful! error=" << *std::max_element(errors.begin(), errors.end())
+              << std::endl;
+  }
+
+  return errors;
+}
+
+/**
+ * Input vectors A (`which` = 0) or B (1) of the processes of a configuration, from its input file or generated.
+ */
+static input_source open_input(const settings& s, int which) {
+  const auto& file = which == 0 ? s.input_a : s.input_b;
+  if (!file.empty()) {
+    input_source source(file);
+    if (source.count() != s.numprocs) {
+      throw std::runtime_error("Input file '" + file + "' has " + std::to_string(source.count()) +
+                               " vectors, one per process (" + std::to_string(s.numprocs) + ") is required");
+    }
+    return source;
+  }
+
+  return input_source(which, which == 0 ? s.N : s.M, s.density);
+}
+
+/**
+ * Inputs of the current configuration and buffers for its results, reused by the following configurations of a batch
+ * as long as their inputs do not change.
+ *
+ * Every process only holds its own input vectors, the other entries are empty. Root holds all vectors if the result
+ * is validated against the sequential implementation.
+ */
+struct buffers {
+  std::string a_key;
+  std::string b_key;
+  std::vector<vector> a_vec;
+  std::vector<vector> b_vec;
+
+  std::unique_ptr<matrix> result;
+  std::unique_ptr<matrix> reference_result; // only computed on root if validation is turned on
+
+  void prepare(const settings& s) {
+    const bool all = s.is_root && s.validate;
+
+    if (!result || result->rows != static_cast<size_t>(s.N) || result->columns != static_cast<size_t>(s.M)) {
+      result = std::make_unique<matrix>(s.N, s.M);
+    }
+
+    for (int which = 0; which < 2; which++) {
+      const auto& file = which == 0 ? s.input_a : s.input_b;
+      const int n = which == 0 ? s.N : s.M;
+      auto& key = which == 0 ? a_key : b_key;
+      auto& vecs = which == 0 ? a_vec : b_vec;
+
+      const auto current = file + ":" + std::to_string(n) + ":" + std::to_string(s.density) + (all ? ":all" : "");
+      if (current == key) {
+        continue;
+      }
 
+      auto source = open_input(s, which);
+      vecs.assign(s.numprocs, vector());
+      for (int i = 0; i < s.numprocs; i++) {
+        if (all || i == s.rank) {
+          vecs[i] = source.get(i);
+        }
+      }
+
+      key = current;
+      reference_result.reset();
+    }
+  }
+};
+
+/**
+ * Expected projection of the result onto `x` (see `checksum::expected`), from the inputs of all processes without
+ * holding more than one pair of them at a time.
+ */
+static std::vector<double> expected_checksum(const settings& s, const vector& x) {
+  auto a = open_input(s, 0);
+  auto b = open_input(s, 1);
+
+  std::vector<double> y(s.N, 0);
+  for (int i = 0; i < s.numprocs; i++) {
+    checksum::accumulate(y, a.get(i), b.get(i), x);
+  }
+
+  return y;
+}
+
+static void run_configuration(settings& s, buffers& b) {
   const std::string& name = s.name;
   int N = s.N;
   int M = s.M;
@@ -292,11 +924,16 @@ int main(int argc, char* argv[]) {
   const auto COMM = s.COMM;
   int num_iterations = s.num_iterations;
 
-  auto a_vec = get_random_vectors(0, N, numprocs);
-  auto b_vec = get_random_vectors(1, M, numprocs);
+  b.prepare(s);
+  const auto& a_vec = b.a_vec;
+  const auto& b_vec = b.b_vec;
 
   if (is_root && verbose) {
     for (int i = 0; i < numprocs; i++) {
+      if (a_vec[i].empty() || b_vec[i].empty()) {
+        continue;
+      }
+
       fprintf(stderr, "A_%d", i);
       a_vec[i].print();
       fprintf(stderr, "\n");
@@ -306,23 +943,39 @@ int main(int argc, char* argv[]) {
     }
   }
 
-  /*
-   * Result of the reference implementation, only set on root if validation is turned on.
-   */
-  std::unique_ptr<matrix> reference_result{nullptr};
-
-  if (is_root && validate) {
+  if (is_root && validate && !b.reference_result) {
     auto sequential = dsop_single(COMM, rank, numprocs, N, M);
-    reference_result = std::make_unique<matrix>(N, M);
-    sequential.compute(a_vec, b_vec, *reference_result);
+    b.reference_result = std::make_unique<matrix>(N, M);
+    sequential.compute(a_vec, b_vec, *b.reference_result);
   }
 
   /*
    * Stores a result. At first for actual implementation, afterwards for other processes' result for verification.
-   *
-   * Initialized here to avoid re-allocation of memory.
    */
-  matrix result(N, M);
+  matrix& result = *b.result;
+
+  /*
+   * Binary output of the per-rank timings, with shape (iterations, timing keys, processes). Only used on root.
+   */
+  std::unique_ptr<npy_writer> output{nullptr};
+  if (is_root && s.output_format == "npy") {
+    output = std::make_unique<npy_writer>(
+        s.output_file, std::vector<size_t>{std::size(TIMING_KEYS), static_cast<size_t>(numprocs)});
+  }
+
+  if (s.trace) {
+    s.clock_offset = estimate_clock_offset(COMM);
+  }
+
+  // Parameters are global, the following configurations of a batch start from the defaults again
+  std::vector<int> defaults;
+  for (auto* param : TUNABLE_PARAMS) {
+    defaults.push_back(*param);
+  }
+
+  for (const auto& [param, value] : s.params) {
+    *get_param(name, param) = value;
+  }
 
   fprintf(stderr, "%d: Starting numprocs=%d N=%d, M=%d impl=%s\n", rank, numprocs, N, M, name.c_str());
 
@@ -333,20 +986,29 @@ int main(int argc, char* argv[]) {
 
     json iter_dump = prepare_json_dump(s, iter);
     auto impl = get_impl(name, COMM, rank, numprocs, N, M);
+    impl->set_precision(s.dtype);
 
     // Reset matrix content
     memset(result.get_ptr(), 0, result.dimension() * sizeof(*result.get_ptr()));
 
-    run_iteration(std::move(impl), result, COMM, a_vec, b_vec, iter_dump);
+    run_iteration(s, std::move(impl), result, a_vec, b_vec, iter_dump);
 
     if (is_root && verbose) {
       fprintf(stderr, "result:\n");
       result.print();
     }
 
+    if (s.checksum) {
+      const auto x = checksum::projection(CHECKSUM_SEED + iter, M);
+      const auto errors = run_validate_checksum(s, result, x, expected_checksum(s, x));
+      if (is_root) {
+        iter_dump["checksum_errors"] = errors;
+      }
+    }
+
     if (validate) {
       if (is_root) {
-        const auto errors = run_validate_root(s, *reference_result, result);
+        const auto errors = run_validate_root(s, *b.reference_result, result);
         iter_dump["errors"] = errors;
       } else {
         run_validate_non_root(s, result);
@@ -354,10 +1016,41 @@ int main(int argc, char* argv[]) {
     }
 
     if (is_root) {
+      if (output) {
+        dump_timings_npy(s, *output, iter_dump);
+      }
+
       std::cout << iter_dump << std::endl;
     }
   }
 
+  for (size_t i = 0; i < std::size(TUNABLE_PARAMS); i++) {
+    *TUNABLE_PARAMS[i] = defaults[i];
+  }
+
+  // Finalize the header of the binary output
+  output.reset();
+}
+
+int main(int argc, char* argv[]) {
+  settings s = prepare(argc, argv);
+
+  buffers b;
+
+  if (s.batch_file.empty()) {
+    run_configuration(s, b);
+  } else {
+    auto configs = read_batch(s, argv[0]);
+    if (s.is_root) {
+      fprintf(stderr, "Running %zu configurations\n", configs.size());
+    }
+
+    for (auto& config : configs) {
+      config.timestamp = current_timestamp();
+      run_configuration(config, b);
+    }
+  }
+
   MPI_Finalize();
 
   return EXIT_SUCCESS;
@@ -0,0 +1,155 @@
+#include "npy.hpp"
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include <cstring>
+#include <regex>
+#include <stdexcept>
+
+npy_writer::npy_writer(const std::string& path, std::vector<size_t> row_shape)
+    : out(path, std::ios::binary | std::ios::trunc), row_shape(std::move(row_shape)) {
+  if (!out) {
+    throw std::runtime_error("Could not open '" + path + "' for writing");
+  }
+
+  for (auto dim : this->row_shape) {
+    row_size *= dim;
+  }
+
+  write_preamble();
+}
+
+npy_writer::~npy_writer() {
+  // Update the number of rows in the header
+  out.seekp(0);
+  write_preamble();
+}
+
+void npy_writer::write(const std::vector<int64_t>& row) {
+  if (row.size() != row_size) {
+    throw std::runtime_error(
+        "npy_writer: expected row of size " + std::to_string(row_size) + ", got " + std::to_string(row.size()));
+  }
+
+  out.seekp(0, std::ios::end);
+  out.write(reinterpret_cast<const char*>(row.data()), static_cast<std::streamsize>(row.size() * sizeof(int64_t)));
+  out.flush();
+  num_rows++;
+}
+
+std::string npy_writer::preamble(const std::vector<size_t>& shape, const std::string& descr) {
+  std::string dims;
+  for (auto dim : shape) {
+    dims.append(std::to_string(dim));
+    dims.append(", ");
+  }
+  if (shape.size() > 1) {
+    // Only 1-tuples need the trailing comma
+    dims.resize(dims.size() - 2);
+  } else if (!shape.empty()) {
+    dims.resize(dims.size() - 1);
+  }
+
+  std::string header = "{'descr': '" + descr + "', 'fortran_order': False, 'shape': (" + dims + "), }";
+
+  // magic string (6), version (2), header length (2)
+  const size_t header_size = PREAMBLE_SIZE - 10;
+  if (header.size() + 1 > header_size) {
+    throw std::runtime_error("npy_writer: shape does not fit into header");
+  }
+  header.append(header_size - header.size() - 1, ' ');
+  header.push_back('\n');
+
+  std::string out("\x93NUMPY\x01\x00", 8);
+  out.push_back(static_cast<char>(header_size & 0xff));
+  out.push_back(static_cast<char>(header_size >> 8));
+  out.append(header);
+
+  return out;
+}
+
+void npy_writer::write_preamble() {
+  std::vector<size_t> shape{num_rows};
+  shape.insert(shape.end(), row_shape.begin(), row_shape.end());
+
+  const auto p = preamble(shape);
+  out.write(p.data(), static_cast<std::streamsize>(p.size()));
+  out.flush();
+}
+
+npy_reader::npy_reader(const std::string& path) : path(path) {
+  int fd = open(path.c_str(), O_RDONLY);
+  if (fd < 0) {
+    throw std::runtime_error("Could not open '" + path + "' for reading");
+  }
+
+  struct stat st{};
+  fstat(fd, &st);
+  mapped_size = static_cast<size_t>(st.st_size);
+  if (mapped_size > 0) {
+    mapped = mmap(nullptr, mapped_size, PROT_READ, MAP_SHARED, fd, 0);
+  }
+  close(fd);
+
+  if (mapped == nullptr || mapped == MAP_FAILED) {
+    mapped = nullptr;
+    throw std::runtime_error("Could not map '" + path + "'");
+  }
+
+  try {
+    parse_header();
+  } catch (...) {
+    munmap(mapped, mapped_size);
+    throw;
+  }
+}
+
+void npy_reader::parse_header() {
+  const auto* bytes = static_cast<const unsigned char*>(mapped);
+  if (mapped_size < 10 || memcmp(bytes, "\x93NUMPY", 6) != 0) {
+    throw std::runtime_error("'" + path + "' is not a .npy file");
+  }
+
+  // Version 1 has a 2 byte header length, versions 2 and 3 a 4 byte one
+  size_t header_start = bytes[6] == 1 ? 10 : 12;
+  size_t header_size = bytes[8] | bytes[9] << 8;
+  if (bytes[6] != 1) {
+    header_size |= static_cast<size_t>(bytes[10]) << 16 | static_cast<size_t>(bytes[11]) << 24;
+  }
+  if (header_start + header_size > mapped_size) {
+    throw std::runtime_error("'" + path + "' has a truncated header");
+  }
+
+  const std::string header(reinterpret_cast<const char*>(bytes + header_start), header_size);
+  std::smatch shape;
+  if (header.find("'descr': '<f8'") == std::string::npos ||
+      header.find("'fortran_order': False") == std::string::npos ||
+      !std::regex_search(header, shape, std::regex(R"('shape': \((\d+), (\d+)\))"))) {
+    throw std::runtime_error("'" + path + "' is not a C-contiguous two-dimensional float64 array: " + header);
+  }
+
+  num_rows = std::stoul(shape[1]);
+  num_columns = std::stoul(shape[2]);
+  if (header_start + header_size + num_rows * num_columns * sizeof(double) > mapped_size) {
+    throw std::runtime_error("'" + path + "' is truncated");
+  }
+
+  values = reinterpret_cast<const double*>(bytes + header_start + header_size);
+}
+
+npy_reader::~npy_reader() {
+  if (mapped != nullptr) {
+    munmap(mapped, mapped_size);
+  }
+}
+
+const double* npy_reader::row(size_t i) const {
+  if (i >= num_rows) {
+    throw std::runtime_error("'" + path + "' has no row " + std::to_string(i));
+  }
+
+  return values + i * num_columns;
+}
@@ -0,0 +1,154 @@
+#include <mpi.h>
+
+#include <iterator>
+#include <map>
+#include <string>
+#include <utility>
+
+#include "profiler.hpp"
+
+namespace {
+
+enum call {
+  SEND,
+  SSEND,
+  ISEND,
+  RECV,
+  IRECV,
+  SENDRECV,
+  WAIT,
+  WAITALL,
+  WAITANY,
+  BCAST,
+  ALLREDUCE,
+  ALLGATHER,
+  ALLGATHERV,
+  IALLGATHER,
+  NUM_CALLS,
+};
+
+const char* const CALL_NAMES[] = {"MPI_Send", "MPI_Ssend", "MPI_Isend", "MPI_Recv", "MPI_Irecv", "MPI_Sendrecv",
+    "MPI_Wait", "MPI_Waitall", "MPI_Waitany", "MPI_Bcast", "MPI_Allreduce", "MPI_Allgather", "MPI_Allgatherv",
+    "MPI_Iallgather"};
+static_assert(std::size(CALL_NAMES) == NUM_CALLS, "every call needs a name");
+
+// Counters by call and communicator size, the size is 0 for point-to-point calls and communicators of the world size
+std::map<std::pair<call, int>, profiler::call_stats> stats;
+
+// Communicator size a collective on `comm` is counted with
+int comm_key(MPI_Comm comm) {
+  int size, world_size;
+  PMPI_Comm_size(comm, &size);
+  PMPI_Comm_size(MPI_COMM_WORLD, &world_size);
+  return size == world_size ? 0 : size;
+}
+
+int64_t payload(int count, MPI_Datatype type) {
+  int size;
+  PMPI_Type_size(type, &size);
+  return static_cast<int64_t>(count) * size;
+}
+
+// Records a call of `c` with the given payload around the forwarded PMPI call, `comm_size` as returned by `comm_key`
+template <typename F>
+int record(call c, int comm_size, int64_t bytes, F&& forward) {
+  const double start = PMPI_Wtime();
+  const int ret = forward();
+  auto& s = stats[{c, comm_size}];
+  s.calls++;
+  s.bytes += bytes;
+  s.time_us += static_cast<int64_t>((PMPI_Wtime() - start) * 1e6);
+  return ret;
+}
+
+} // namespace
+
+namespace profiler {
+
+void reset() {
+  stats.clear();
+}
+
+std::map<std::string, call_stats> snapshot() {
+  std::map<std::string, call_stats> out;
+  for (const auto& [key, s] : stats) {
+    const auto& [c, comm_size] = key;
+    out[comm_size == 0 ? CALL_NAMES[c] : std::string(CALL_NAMES[c]) + "@" + std::to_string(comm_size)] = s;
+  }
+
+  return out;
+}
+
+} // namespace profiler
+
+extern "C" {
+
+int MPI_Send(const void* buf, int count, MPI_Datatype type, int dest, int tag, MPI_Comm comm) {
+  return record(SEND, 0, payload(count, type), [&] { return PMPI_Send(buf, count, type, dest, tag, comm); });
+}
+
+int MPI_Ssend(const void* buf, int count, MPI_Datatype type, int dest, int tag, MPI_Comm comm) {
+  return record(SSEND, 0, payload(count, type), [&] { return PMPI_Ssend(buf, count, type, dest, tag, comm); });
+}
+
+int MPI_Isend(const void* buf, int count, MPI_Datatype type, int dest, int tag, MPI_Comm comm, MPI_Request* request) {
+  return record(ISEND, 0, payload(count, type), [&] { return PMPI_Isend(buf, count, type, dest, tag, comm, request); });
+}
+
+int MPI_Recv(void* buf, int count, MPI_Datatype type, int source, int tag, MPI_Comm comm, MPI_Status* status) {
+  return record(RECV, 0, payload(count, type), [&] { return PMPI_Recv(buf, count, type, source, tag, comm, status); });
+}
+
+int MPI_Irecv(void* buf, int count, MPI_Datatype type, int source, int tag, MPI_Comm comm, MPI_Request* request) {
+  return record(
+      IRECV, 0, payload(count, type), [&] { return PMPI_Irecv(buf, count, type, source, tag, comm, request); });
+}
+
+int MPI_Sendrecv(const void* sendbuf, int sendcount, MPI_Datatype sendtype, int dest, int sendtag, void* recvbuf,
+    int recvcount, MPI_Datatype recvtype, int source, int recvtag, MPI_Comm comm, MPI_Status* status) {
+  return record(SENDRECV, 0, payload(sendcount, sendtype), [&] {
+    return PMPI_Sendrecv(
+        sendbuf, sendcount, sendtype, dest, sendtag, recvbuf, recvcount, recvtype, source, recvtag, comm, status);
+  });
+}
+
+int MPI_Wait(MPI_Request* request, MPI_Status* status) {
+  return record(WAIT, 0, 0, [&] { return PMPI_Wait(request, status); });
+}
+
+int MPI_Waitall(int count, MPI_Request requests[], MPI_Status statuses[]) {
+  return record(WAITALL, 0, 0, [&] { return PMPI_Waitall(count, requests, statuses); });
+}
+
+int MPI_Waitany(int count, MPI_Request requests[], int* index, MPI_Status* status) {
+  return record(WAITANY, 0, 0, [&] { return PMPI_Waitany(count, requests, index, status); });
+}
+
+int MPI_Bcast(void* buf, int count, MPI_Datatype type, int root, MPI_Comm comm) {
+  return record(BCAST, comm_key(comm), payload(count, type), [&] { return PMPI_Bcast(buf, count, type, root, comm); });
+}
+
+int MPI_Allreduce(const void* sendbuf, void* recvbuf, int count, MPI_Datatype type, MPI_Op op, MPI_Comm comm) {
+  return record(ALLREDUCE, comm_key(comm), payload(count, type),
+      [&] { return PMPI_Allreduce(sendbuf, recvbuf, count, type, op, comm); });
+}
+
+int MPI_Allgather(const void* sendbuf, int sendcount, MPI_Datatype sendtype, void* recvbuf, int recvcount,
+    MPI_Datatype recvtype, MPI_Comm comm) {
+  return record(ALLGATHER, comm_key(comm), payload(sendcount, sendtype),
+      [&] { return PMPI_Allgather(sendbuf, sendcount, sendtype, recvbuf, recvcount, recvtype, comm); });
+}
+
+int MPI_Allgatherv(const void* sendbuf, int sendcount, MPI_Datatype sendtype, void* recvbuf, const int recvcounts[],
+    const int displs[], MPI_Datatype recvtype, MPI_Comm comm) {
+  return record(ALLGATHERV, comm_key(comm), payload(sendcount, sendtype),
+      [&] { return PMPI_Allgatherv(sendbuf, sendcount, sendtype, recvbuf, recvcounts, displs, recvtype, comm); });
+}
+
+int MPI_Iallgather(const void* sendbuf, int sendcount, MPI_Datatype sendtype, void* recvbuf, int recvcount,
+    MPI_Datatype recvtype, MPI_Comm comm, MPI_Request* request) {
+  return record(IALLGATHER, comm_key(comm), payload(sendcount, sendtype),
+      [&] { return PMPI_Iallgather(sendbuf, sendcount, sendtype, recvbuf, recvcount, recvtype, comm, request); });
+}
+
+} // extern "C"
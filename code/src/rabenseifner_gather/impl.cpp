@@ -72,6 +72,7 @@ void rabenseifner_gather::compute(const std::vector<vector>& a_in, const std::ve
 
   // [VECTOR-GATHER STAGE]
   // Send vectors
+  phase("scatter");
   int send_n_rows = my_n_rows;
   for (int i = 0; i < power_2_ranks; i++) {
     if (i == rank) {
@@ -101,12 +102,14 @@ void rabenseifner_gather::compute(const std::vector<vector>& a_in, const std::ve
       for (int j = 0; j < recv_n_rows; j++) {
         a_subvec[j] = a[rank * my_n_rows + j];
       }
+      phase("outer-product");
       result.add_submatrix_outer_product(my_result_row_offset, 0, a_subvec, b);
       continue;
     }
     recv_vec_A.resize(recv_n_rows, 0.0);
     recv_vec_A_ptr = recv_vec_A.data();
     // receive both vectors
+    phase("scatter");
     mpi_timer(MPI_Recv, recv_vec_A_ptr, recv_n_rows, MPI_DOUBLE, i, TAG_RABENSEIFNER_GATHER_VEC_A, comm, &status);
     mpi_timer(MPI_Recv, recv_vec_B_ptr, n_cols, MPI_DOUBLE, i, TAG_RABENSEIFNER_GATHER_VEC_B, comm, &status);
 
@@ -114,11 +117,13 @@ void rabenseifner_gather::compute(const std::vector<vector>& a_in, const std::ve
     vector received_B(recv_vec_B_ptr, recv_vec_B_ptr + n_cols);
 
     // add the outer product to the current result matrix
+    phase("outer-product");
     result.add_submatrix_outer_product(my_result_row_offset, 0, recv_vec_A, recv_vec_B);
   }
 
   // TODO: Cleanup index computation
   // [BUTTERFLY-SCATTER]
+  phase("allgather-result");
   // Construct Indices for Butterfly-Scatter
   // Indices list: Represents a partition of the N*M matrix in terms of indices. Upper index is always exclusive.
   std::vector<int> all_indices(power_2_ranks + 1, 0);
@@ -1,27 +1,80 @@
 #include "util.hpp"
 
 #include <mpi.h>
+#include <sys/resource.h>
 
 #include <iostream>
 #include <random>
 
 #include "vector.h"
 
-std::vector<vector> get_random_vectors(uint64_t seed, int n, int p) {
-  std::mt19937_64 gen{seed};
-  std::uniform_real_distribution<double> dist(-1, 1);
-
-  std::vector<vector> out(p);
+std::vector<vector> get_random_vectors(uint64_t seed, int n, int p, double density) {
+  random_vectors gen(seed, n, density);
 
+  std::vector<vector> out;
+  out.reserve(p);
   for (int i = 0; i < p; i++) {
-    for (int j = 0; j < n; j++) {
-      out[i].push_back(dist(gen));
+    out.push_back(gen.next());
+  }
+
+  return out;
+}
+
+vector get_random_vector(uint64_t seed, int n, int i, double density) {
+  random_vectors gen(seed, n, density);
+  gen.skip(i);
+  return gen.next();
+}
+
+random_vectors::random_vectors(uint64_t seed, int n, double density)
+    : gen(seed), non_zero(density), n(n), density(density) {}
+
+vector random_vectors::next() {
+  vector out(n);
+
+  for (int j = 0; j < n; j++) {
+    if (density >= 1 || non_zero(gen)) {
+      out[j] = dist(gen);
     }
   }
 
+  index++;
   return out;
 }
 
+void random_vectors::skip(int count) {
+  if (density >= 1) {
+    // A uniform double takes a single number of the 64 bit engine
+    gen.discard(static_cast<unsigned long long>(count) * n);
+    index += count;
+    return;
+  }
+
+  // Same draws as `next`, the number of draws per sparse entry depends on the outcome of the first one
+  for (int64_t j = 0; j < static_cast<int64_t>(count) * n; j++) {
+    if (non_zero(gen)) {
+      dist(gen);
+    }
+  }
+
+  index += count;
+}
+
+resource_usage resource_usage::now() {
+  rusage usage{};
+  getrusage(RUSAGE_SELF, &usage);
+
+  const auto us = [](const timeval& t) { return static_cast<int64_t>(t.tv_sec) * 1000000 + t.tv_usec; };
+
+  return {
+      usage.ru_maxrss, // KiB on Linux
+      us(usage.ru_utime),
+      us(usage.ru_stime),
+      usage.ru_nvcsw,
+      usage.ru_nivcsw,
+  };
+}
+
 int64_t timer_run(std::function<void(void)> fun) {
   timer t;
   fun();
@@ -0,0 +1,24 @@
+#include "allgather_sparse/impl.hpp"
+#include "test.h"
+
+using namespace impls::allgather_sparse;
+
+TEST(SparseVectorsTest, BasicAssertions) {
+  sparse_vectors v;
+  v.append(vector{0, 1.5, 0, -2}.data(), 4);
+  v.append(vector{0, 0, 0, 0}.data(), 4);
+  v.append(vector{3, 0, 0, 0}.data(), 4);
+
+  EXPECT_EQ(v.size(), 3);
+  EXPECT_EQ(v.offsets, (std::vector<int>{0, 2, 2, 3}));
+  EXPECT_EQ(v.indices, (std::vector<int>{1, 3, 0}));
+  EXPECT_EQ(v.values, (std::vector<double>{1.5, -2, 3}));
+}
+
+TEST(UseCompressedTest, BasicAssertions) {
+  // 5% dense
+  EXPECT_TRUE(use_compressed({50, 50, 50, 50}, 1000));
+  // An (index, value) pair is 1.5 times the size of a dense entry
+  EXPECT_FALSE(use_compressed({700, 700}, 1000));
+  EXPECT_TRUE(use_compressed({600, 700}, 1000));
+}
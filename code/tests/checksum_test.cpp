@@ -0,0 +1,55 @@
+#include "checksum.hpp"
+
+#include <cmath>
+#include <limits>
+
+#include "dsop_single.h"
+#include "test.h"
+#include "util.hpp"
+
+class ChecksumTest : public ::testing::Test {
+ protected:
+  static constexpr int N = 50;
+  static constexpr int M = 40;
+  static constexpr int P = 3;
+
+  std::vector<vector> a = get_random_vectors(0, N, P);
+  std::vector<vector> b = get_random_vectors(1, M, P);
+  vector x = checksum::projection(2, M);
+
+  matrix reference() {
+    matrix result(N, M);
+    dsop_single(nullptr, 0, 1, N, M).compute(a, b, result);
+    return result;
+  }
+};
+
+TEST_F(ChecksumTest, MatchesReference) {
+  auto result = reference();
+
+  EXPECT_LT(checksum::max_block_error(checksum::actual(result, x), checksum::expected(a, b, x)), 1e-12);
+}
+
+TEST_F(ChecksumTest, DetectsSingleWrongEntry) {
+  auto result = reference();
+  result.get(N - 1, 7) += 1e-3;
+
+  EXPECT_GT(checksum::max_block_error(checksum::actual(result, x), checksum::expected(a, b, x)), 1e-5);
+}
+
+TEST_F(ChecksumTest, DetectsNaN) {
+  auto result = reference();
+  result.get(0, 0) = std::nan("");
+
+  const double error = checksum::max_block_error(checksum::actual(result, x), checksum::expected(a, b, x));
+  EXPECT_FALSE(checksum::is_finite(error));
+}
+
+TEST(ChecksumFiniteTest, BitPattern) {
+  EXPECT_TRUE(checksum::is_finite(0.0));
+  EXPECT_TRUE(checksum::is_finite(-std::numeric_limits<double>::max()));
+  EXPECT_TRUE(checksum::is_finite(std::numeric_limits<double>::denorm_min()));
+  EXPECT_FALSE(checksum::is_finite(std::numeric_limits<double>::infinity()));
+  EXPECT_FALSE(checksum::is_finite(-std::numeric_limits<double>::infinity()));
+  EXPECT_FALSE(checksum::is_finite(std::nan("")));
+}
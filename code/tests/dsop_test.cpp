@@ -27,3 +27,42 @@ TEST(DSOP_SingleTest, BasicAssertions) {
 
   EXPECT_EQ(result, expected);
 }
+
+// Enters the phases in the given order and records nothing else
+class phased : public dsop {
+ public:
+  using dsop::dsop;
+
+  std::vector<std::string> order;
+
+  void compute(const std::vector<vector>&, const std::vector<vector>&, matrix&) override {
+    for (const auto& name : order) {
+      phase(name);
+    }
+  }
+};
+
+TEST(DSOP_PhaseTest, BasicAssertions) {
+  auto impl = phased(nullptr, 0, 1, 1, 1);
+  impl.order = {"first", "second", "first"};
+
+  auto result = matrix(1, 1);
+  impl.compute({}, {}, result);
+  impl.end_phase();
+
+  const auto& phases = impl.get_phase_times();
+  ASSERT_EQ(phases.size(), 2);
+  EXPECT_EQ(phases[0].name, "first");
+  EXPECT_EQ(phases[1].name, "second");
+  ASSERT_EQ(phases[0].entries.size(), 2);
+  ASSERT_EQ(phases[1].entries.size(), 1);
+  EXPECT_LE(phases[0].entries[0].start, phases[1].entries[0].start);
+  EXPECT_LE(phases[1].entries[0].start, phases[0].entries[1].start);
+  EXPECT_EQ(phases[0].duration, phases[0].entries[0].duration + phases[0].entries[1].duration);
+  EXPECT_GE(phases[0].duration, 0);
+
+  // Ending again has no effect
+  auto duration = phases[0].duration;
+  impl.end_phase();
+  EXPECT_EQ(impl.get_phase_times()[0].duration, duration);
+}
@@ -0,0 +1,36 @@
+#include "input.hpp"
+
+#include <cstdio>
+#include <fstream>
+
+#include "test.h"
+
+TEST(InputSourceTest, Generated) {
+  auto vecs = get_random_vectors(1, 20, 4, 0.5);
+  input_source source(1, 20, 0.5);
+
+  EXPECT_EQ(source.size(), 20);
+  EXPECT_EQ(source.get(2), vecs[2]);
+  EXPECT_EQ(source.get(3), vecs[3]);
+  // Rewinds the random stream
+  EXPECT_EQ(source.get(0), vecs[0]);
+  EXPECT_EQ(source.get(0), vecs[0]);
+}
+
+TEST(InputSourceTest, File) {
+  const std::string path = testing::TempDir() + "input_test.npy";
+  const std::vector<double> values{1, 2, 3, 4, 5, 6};
+  {
+    std::ofstream out(path, std::ios::binary | std::ios::trunc);
+    out << npy_writer::preamble({3, 2}, "<f8");
+    out.write(reinterpret_cast<const char*>(values.data()), values.size() * sizeof(double));
+  }
+
+  input_source source(path);
+  EXPECT_EQ(source.size(), 2);
+  EXPECT_EQ(source.count(), 3);
+  EXPECT_EQ(source.get(1), vector({3, 4}));
+  EXPECT_THROW(source.get(3), std::runtime_error);
+
+  std::remove(path.c_str());
+}
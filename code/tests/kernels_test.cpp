@@ -0,0 +1,54 @@
+#include "kernels.hpp"
+
+#include <stdexcept>
+
+#include "gtest/gtest.h"
+#include "util.hpp"
+
+// Sizes that are not multiples of the vector width or the block size
+static constexpr size_t N = 37;
+static constexpr size_t M = kernels::BLOCK_COLUMNS + 5;
+
+static std::vector<double> reference(const vector& a, const vector& b) {
+  std::vector<double> c(N * M, 1);
+  kernels::naive(c.data(), a.data(), N, b.data(), M);
+  return c;
+}
+
+TEST(KernelsTest, MatchNaive) {
+  const auto a = get_random_vector(0, N, 0);
+  const auto b = get_random_vector(1, M, 0);
+  const auto expected = reference(a, b);
+
+  EXPECT_DOUBLE_EQ(expected[3 * M + 7], 1 + a[3] * b[7]);
+
+  for (const auto& name : kernels::names()) {
+    // Accumulates onto the existing content
+    std::vector<double> c(N * M, 1);
+    kernels::get(name)(c.data(), a.data(), N, b.data(), M);
+
+    for (size_t i = 0; i < c.size(); i++) {
+      ASSERT_NEAR(c[i], expected[i], 1e-12) << name << " at " << i;
+    }
+  }
+}
+
+TEST(KernelsTest, Threads) {
+  const auto a = get_random_vector(0, N, 0);
+  const auto b = get_random_vector(1, M, 0);
+  const auto expected = reference(a, b);
+
+  for (int threads : {2, 3, 64}) {
+    std::vector<double> c(N * M, 1);
+    kernels::run(kernels::avx2, threads, c.data(), a.data(), N, b.data(), M);
+
+    for (size_t i = 0; i < c.size(); i++) {
+      ASSERT_NEAR(c[i], expected[i], 1e-12) << threads << " threads at " << i;
+    }
+  }
+}
+
+TEST(KernelsTest, Unknown) {
+  EXPECT_THROW(kernels::get("unknown"), std::runtime_error);
+  EXPECT_NO_THROW(kernels::get("naive"));
+}
@@ -0,0 +1,83 @@
+#include "npy.hpp"
+
+#include <cstdio>
+#include <cstring>
+#include <fstream>
+#include <iterator>
+
+#include "test.h"
+
+static std::string read_file(const std::string& path) {
+  std::ifstream in(path, std::ios::binary);
+  return std::string(std::istreambuf_iterator<char>(in), std::istreambuf_iterator<char>());
+}
+
+TEST(NpyPreambleTest, BasicAssertions) {
+  auto p = npy_writer::preamble({2, 3, 4});
+
+  EXPECT_EQ(p.size(), npy_writer::PREAMBLE_SIZE);
+  EXPECT_EQ(p.substr(0, 8), std::string("\x93NUMPY\x01\x00", 8));
+  EXPECT_EQ(p.back(), '\n');
+  EXPECT_NE(p.find("'shape': (2, 3, 4)"), std::string::npos);
+
+  EXPECT_NE(npy_writer::preamble({5}).find("'shape': (5,)"), std::string::npos);
+}
+
+TEST(NpyWriterTest, BasicAssertions) {
+  const std::string path = testing::TempDir() + "npy_writer_test.npy";
+
+  {
+    npy_writer writer(path, {2, 3});
+    writer.write({1, 2, 3, 4, 5, 6});
+    writer.write({7, 8, 9, 10, 11, 12});
+    EXPECT_EQ(writer.rows(), 2);
+    EXPECT_THROW(writer.write({1, 2}), std::runtime_error);
+  }
+
+  auto content = read_file(path);
+  ASSERT_EQ(content.size(), npy_writer::PREAMBLE_SIZE + 12 * sizeof(int64_t));
+  EXPECT_EQ(content.substr(0, npy_writer::PREAMBLE_SIZE), npy_writer::preamble({2, 2, 3}));
+
+  int64_t last;
+  memcpy(&last, content.data() + content.size() - sizeof(int64_t), sizeof(int64_t));
+  EXPECT_EQ(last, 12);
+
+  std::remove(path.c_str());
+}
+
+static void write_doubles(
+    const std::string& path, const std::vector<size_t>& shape, const std::vector<double>& values) {
+  std::ofstream out(path, std::ios::binary | std::ios::trunc);
+  out << npy_writer::preamble(shape, "<f8");
+  out.write(reinterpret_cast<const char*>(values.data()), static_cast<std::streamsize>(values.size() * sizeof(double)));
+}
+
+TEST(NpyReaderTest, BasicAssertions) {
+  const std::string path = testing::TempDir() + "npy_reader_test.npy";
+  write_doubles(path, {2, 3}, {1, 2, 3, 4, 5, 6});
+
+  {
+    npy_reader reader(path);
+    EXPECT_EQ(reader.rows(), 2);
+    EXPECT_EQ(reader.columns(), 3);
+    EXPECT_EQ(reader.row(1)[0], 4);
+    EXPECT_EQ(reader.row(1)[2], 6);
+    EXPECT_THROW(reader.row(2), std::runtime_error);
+  }
+
+  // Wrong dtype and dimensions, truncated data
+  const std::string other = testing::TempDir() + "npy_reader_invalid.npy";
+  {
+    npy_writer writer(other, {3});
+    writer.write({1, 2, 3});
+  }
+  EXPECT_THROW(npy_reader{other}, std::runtime_error);
+  write_doubles(other, {6}, {1, 2, 3, 4, 5, 6});
+  EXPECT_THROW(npy_reader{other}, std::runtime_error);
+  write_doubles(other, {2, 4}, {1, 2, 3, 4, 5, 6});
+  EXPECT_THROW(npy_reader{other}, std::runtime_error);
+  EXPECT_THROW(npy_reader{testing::TempDir() + "missing.npy"}, std::runtime_error);
+
+  std::remove(path.c_str());
+  std::remove(other.c_str());
+}
@@ -0,0 +1,67 @@
+#include "util.hpp"
+
+#include <algorithm>
+
+#include "gtest/gtest.h"
+
+static size_t count_non_zero(const std::vector<vector>& vecs) {
+  size_t count = 0;
+  for (const auto& v : vecs) {
+    count += std::count_if(v.begin(), v.end(), [](double x) { return x != 0; });
+  }
+
+  return count;
+}
+
+TEST(RandomVectorsTest, Dense) {
+  auto vecs = get_random_vectors(0, 100, 3);
+
+  ASSERT_EQ(vecs.size(), 3);
+  EXPECT_EQ(vecs[0].size(), 100);
+  EXPECT_EQ(count_non_zero(vecs), 300);
+  EXPECT_EQ(vecs, get_random_vectors(0, 100, 3, 1.0));
+}
+
+TEST(RandomVectorsTest, Sparse) {
+  auto vecs = get_random_vectors(0, 10000, 2, 0.05);
+
+  ASSERT_EQ(vecs.size(), 2);
+  EXPECT_EQ(vecs[1].size(), 10000);
+
+  // 1000 expected non-zeros, with a standard deviation of roughly 22
+  auto count = count_non_zero(vecs);
+  EXPECT_GT(count, 850);
+  EXPECT_LT(count, 1150);
+
+  // Seeded
+  EXPECT_EQ(vecs, get_random_vectors(0, 10000, 2, 0.05));
+  EXPECT_NE(vecs, get_random_vectors(1, 10000, 2, 0.05));
+}
+
+TEST(RandomVectorsTest, Stable) {
+  // Values of the original implementation, which generated all vectors at once
+  auto dense = get_random_vectors(0, 100, 3);
+  EXPECT_DOUBLE_EQ(dense[0][0], -0.6804132732590783);
+  EXPECT_DOUBLE_EQ(dense[2][99], -0.13581089444444017);
+
+  auto sparse = get_random_vector(1, 1000, 2, 0.05);
+  auto first = std::find_if(sparse.begin(), sparse.end(), [](double x) { return x != 0; });
+  ASSERT_EQ(first - sparse.begin(), 6);
+  EXPECT_DOUBLE_EQ(*first, -0.94584939450658589);
+}
+
+TEST(RandomVectorsTest, Single) {
+  for (double density : {1.0, 0.3}) {
+    auto vecs = get_random_vectors(4, 50, 5, density);
+
+    for (int i = 0; i < 5; i++) {
+      EXPECT_EQ(get_random_vector(4, 50, i, density), vecs[i]);
+    }
+
+    random_vectors gen(4, 50, density);
+    gen.skip(2);
+    EXPECT_EQ(gen.position(), 2);
+    EXPECT_EQ(gen.next(), vecs[2]);
+    EXPECT_EQ(gen.next(), vecs[3]);
+  }
+}
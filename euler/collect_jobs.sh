@@ -8,4 +8,6 @@ set -e # Exit on first failure
 # If not finished:  exit
 # If finished:      collect files and copy to local machine
 ssh -t euler < ./euler/wrapper/run_verify_completed.sh
+# Pack the reports of finished jobs into a single archive, such that only few files have to be copied
+ssh -t euler < ./euler/wrapper/run_pack.sh
 rsync -r euler:~/dphpc/results/tmp results
\ No newline at end of file
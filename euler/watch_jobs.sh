@@ -0,0 +1,10 @@
+#!/bin/bash
+
+set -e # Exit on first failure
+
+# Executed on LOCAL machine.
+# Parses the reports of the running campaign as its jobs finish and prints the progress after every poll.
+
+# Make sure you prepared ssh according to the preparations in the readme file.
+
+ssh -t euler < ./euler/wrapper/run_watch.sh
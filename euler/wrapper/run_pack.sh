@@ -0,0 +1,9 @@
+#!/bin/bash
+
+# This script packs the outputs of finished jobs for collect_jobs.sh
+
+set -e
+
+cd ~/dphpc
+source ./euler/init.sh
+python ./benchmarks/archive.py --remove results/tmp/raw
@@ -0,0 +1,9 @@
+#!/bin/bash
+
+# This script runs watch.py for watch_jobs.sh
+
+set -e
+
+cd ~/dphpc
+source ./euler/init.sh
+python ./benchmarks/watch.py